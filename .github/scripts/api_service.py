@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Local query service over the generated API.
+
+Serves the site built by generate_json.py as a small query API, for agents
+and tools that would otherwise fetch the static files from GitHub Pages:
+
+    GET /guides                           the guides listed in api.json
+    GET /guides/NAME                      a guide
+    GET /guides/NAME/sections             a guide's section index
+    GET /guides/NAME/sections/ANCHOR      a section
+    GET /search?q=QUERY&limit=N           search results from the search index
+    GET /metrics                          cache hit and miss counts
+
+api.json is loaded once, and again whenever it is rewritten. Guides, section
+indexes and sections are loaded on first use into an LRU cache bounded by the
+size of the files it holds, so repeated reads are served from memory. Cached
+documents and the search index are checked against the modification time of
+their files, so a rebuilt site is served without restarting. The same
+operations are available as a library through ApiService:
+
+    service = ApiService("./site")
+    service.get_section("python", "python")
+
+The service only listens on localhost unless another host is given.
+
+Usage: python api_service.py SITE_DIR [--host HOST] [--port PORT] [--cache-size MB]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from search_index import SEARCH_DIR, SearchIndex
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9091
+DEFAULT_CACHE_SIZE = 32 * 1024 * 1024  # bytes
+
+# The name the main guide is listed under
+MAIN_GUIDE_NAME = "guide"
+
+class SearchUnavailableError(Exception):
+    """The site has no search index to query, for example while it is being rebuilt."""
+
+class GuideCache:
+    """
+    A thread-safe LRU cache bounded by the total size of the values it holds.
+
+    Each value is stored with its size in bytes, and the least recently used
+    values are evicted once the total exceeds max_size. A value larger than
+    max_size is returned but never cached.
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self.entries = OrderedDict()  # key -> (value, size)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, load):
+        """
+        Get a value from the cache, calling load() to load it on a miss.
+
+        load() returns a tuple of the value and its size. It is called outside
+        the lock, so a slow load doesn't block reads of other keys; two threads
+        that miss the same key at once may both load it.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value, size = load()
+        if size > self.max_size:
+            return value
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+        return value
+
+    def discard(self, key):
+        """Remove a value from the cache, if it is cached."""
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[1]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def metrics(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "sizeBytes": self.size,
+                "maxSizeBytes": self.max_size
+            }
+
+class CachedDocument:
+    """
+    A JSON document from the site, with its encoded body so it can be served
+    without re-encoding, and the modification time of its file.
+    """
+
+    __slots__ = ("data", "body", "mtime")
+
+    def __init__(self, data, body, mtime):
+        self.data = data
+        self.body = body
+        self.mtime = mtime
+
+class ApiService:
+    """
+    Queries the generated API in a site directory.
+
+    Documents returned by the get methods are shared with the cache, and
+    must be treated as read-only. Call reload_if_changed() before a query to
+    pick up guides added or removed by a rebuild of the site.
+    """
+
+    def __init__(self, site_dir, cache_size=DEFAULT_CACHE_SIZE):
+        self.site_dir = os.path.abspath(site_dir)
+        self.api_path = os.path.join(self.site_dir, "api.json")
+        self.cache = GuideCache(cache_size)
+        self.reload_lock = threading.Lock()
+        self.search_lock = threading.Lock()
+        self.search_index = None
+        self.search_mtime = None
+        self.reload()
+
+    def reload(self):
+        """Reload api.json and empty the cache, after the site has been rebuilt."""
+        self.api_mtime = os.stat(self.api_path).st_mtime_ns
+        with open(self.api_path, 'r', encoding='utf-8') as f:
+            self.api = json.load(f)
+        guides = {}
+        main_guide = self.api["endpoints"]["main_guide"]
+        guides[MAIN_GUIDE_NAME] = dict(main_guide, name=MAIN_GUIDE_NAME, type="main")
+        for group, endpoints in self.api["endpoints"].items():
+            if not group.endswith("_guides"):
+                continue
+            guide_type = group[:-len("_guides")]
+            for name, endpoint in endpoints.items():
+                guides[name] = dict(endpoint, name=name, type=guide_type)
+        self.guides = guides
+        self.cache.clear()
+        with self.search_lock:
+            self.search_index = None
+
+    def reload_if_changed(self):
+        """Reload api.json if it has been rewritten since it was loaded, returning True if it was."""
+        try:
+            mtime = os.stat(self.api_path).st_mtime_ns
+        except FileNotFoundError:
+            # The site is being rebuilt, so the guides already loaded are served
+            return False
+        if mtime == self.api_mtime:
+            return False
+        with self.reload_lock:
+            if mtime != self.api_mtime:
+                self.reload()
+        return True
+
+    def load_document(self, path):
+        """Load a JSON document by its API path, through the cache, reloading it if its file has changed."""
+        key = path.lstrip('/')
+        file_path = os.path.join(self.site_dir, key)
+        mtime = os.stat(file_path).st_mtime_ns
+
+        def load():
+            with open(file_path, 'rb') as f:
+                body = f.read()
+            return CachedDocument(json.loads(body), body, mtime), len(body)
+
+        document = self.cache.get(key, load)
+        if document.mtime != mtime:
+            self.cache.discard(key)
+            document = self.cache.get(key, load)
+        return document
+
+    def find_guide(self, name):
+        if name not in self.guides:
+            raise KeyError(f"Unknown guide '{name}'")
+        return self.guides[name]
+
+    def list_guides(self):
+        """The guides listed in api.json, each with its name, type, description and paths."""
+        return list(self.guides.values())
+
+    def get_guide_document(self, name):
+        return self.load_document(self.find_guide(name)["path"])
+
+    def get_guide(self, name):
+        """A guide, as written to its JSON endpoint."""
+        return self.get_guide_document(name).data
+
+    def get_sections_document(self, name):
+        return self.load_document(self.find_guide(name)["sections"])
+
+    def get_sections(self, name):
+        """A guide's section index."""
+        return self.get_sections_document(name).data
+
+    def get_section_document(self, name, anchor):
+        # Sections are found through the section index, so only the paths it
+        # lists are ever read
+        for section in self.get_sections(name)["sections"]:
+            if section["anchor"] == anchor:
+                return self.load_document(section["path"])
+        raise KeyError(f"Unknown section '{anchor}' in guide '{name}'")
+
+    def get_section(self, name, anchor):
+        """A section of a guide, by its anchor."""
+        return self.get_section_document(name, anchor).data
+
+    def search(self, query, limit=10):
+        """Search the guide sections, returning the best matches first."""
+        if limit < 1:
+            raise ValueError("The limit must be at least 1")
+        try:
+            mtime = os.stat(os.path.join(self.site_dir, SEARCH_DIR, "index.json")).st_mtime_ns
+            with self.search_lock:
+                if self.search_index is None or self.search_mtime != mtime:
+                    self.search_index = SearchIndex(self.site_dir)
+                    self.search_mtime = mtime
+                search_index = self.search_index
+            # Shards are loaded as terms are looked up, so can also be missing
+            return search_index.search(query, limit)
+        except OSError as e:
+            raise SearchUnavailableError(f"The search index could not be read ({e.strerror or e})") from e
+
+    def metrics(self):
+        return {"guides": len(self.guides), "cache": self.cache.metrics()}
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """Routes requests to the ApiService set on the server."""
+
+    # Keep connections open between requests, and send each response as soon
+    # as it is written rather than waiting for the client to acknowledge the headers
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+        service = self.server.service
+        try:
+            service.reload_if_changed()
+            if parts == ["guides"]:
+                self.send_json(service.list_guides())
+            elif len(parts) == 2 and parts[0] == "guides":
+                self.send_body(service.get_guide_document(parts[1]).body)
+            elif len(parts) == 3 and parts[0] == "guides" and parts[2] == "sections":
+                self.send_body(service.get_sections_document(parts[1]).body)
+            elif len(parts) == 4 and parts[0] == "guides" and parts[2] == "sections":
+                self.send_body(service.get_section_document(parts[1], parts[3]).body)
+            elif parts == ["search"]:
+                query = parse_qs(url.query)
+                limit = query.get("limit", ["10"])[0]
+                if not limit.isdigit():
+                    raise ValueError(f"Invalid limit '{limit}', it must be a whole number")
+                limit = int(limit)
+                self.send_json(service.search(query.get("q", [""])[0], limit))
+            elif parts == ["metrics"]:
+                self.send_json(dict(service.metrics(), requests=self.server.request_count))
+            else:
+                self.send_json({"error": f"Not found: {url.path}"}, 404)
+        except KeyError as e:
+            self.send_json({"error": e.args[0]}, 404)
+        except ValueError as e:
+            self.send_json({"error": str(e)}, 400)
+        except SearchUnavailableError as e:
+            self.send_json({"error": str(e)}, 503)
+        except FileNotFoundError:
+            # An output listed in the site which has been removed, such as
+            # while the site is being rebuilt
+            self.send_json({"error": f"Not found: {url.path}"}, 404)
+        except OSError as e:
+            self.send_json({"error": f"Could not read {url.path} ({e.strerror or e})"}, 503)
+        self.server.count_request()
+
+    def send_json(self, data, status=200):
+        self.send_body(json.dumps(data).encode('utf-8'), status)
+
+    def send_body(self, body, status=200):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_request(self, code='-', size='-'):
+        # Only log errors, as agents make a lot of requests
+        if str(code).startswith(('4', '5')):
+            super().log_request(code, size)
+
+class ApiHTTPServer(ThreadingHTTPServer):
+    """A threaded HTTP server for an ApiService."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, service):
+        super().__init__(address, ApiRequestHandler)
+        self.service = service
+        self.request_count = 0
+        self.request_lock = threading.Lock()
+
+    def count_request(self):
+        with self.request_lock:
+            self.request_count += 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a query API over a generated site.")
+    parser.add_argument("site_dir", metavar="SITE_DIR", help="directory the site was generated into")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help=f"address to listen on, such as 0.0.0.0 for every interface (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--cache-size", type=float, default=DEFAULT_CACHE_SIZE / 1024 / 1024, metavar="MB",
+                        help=f"size of the guide cache in MiB (default: {DEFAULT_CACHE_SIZE // 1024 // 1024})")
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.site_dir, "api.json")):
+        print(f"❌ No api.json in {args.site_dir}, build the site with generate_json.py first.")
+        sys.exit(1)
+
+    service = ApiService(args.site_dir, int(args.cache_size * 1024 * 1024))
+    server = ApiHTTPServer((args.host, args.port), service)
+    print(f"🌐 Serving the API for {len(service.guides)} guides at http://{args.host}:{args.port}")
+    print("Press Ctrl+C to stop the server")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping server...")
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Benchmark the site generator against synthetic guide corpora.
+
+Synthesizes corpora of realistic markdown guides (headings, paragraphs, code
+blocks, HTML comments and links between guides), then times each stage of the
+generator and records its peak memory. Results are written as JSON so that
+runs can be compared between commits:
+
+    python .github/scripts/benchmark.py --sizes 10,1000 --output before.json
+    python .github/scripts/benchmark.py --sizes 10,1000 --compare before.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import generate_json  # noqa: E402
+from corpus import Corpus  # noqa: E402
+
+DEFAULT_SIZES = "10,1000,50000"
+
+# Keywords in the guide filenames, so that the corpus covers every guide type
+GUIDE_KEYWORDS = ["python", "shell", "make", "cicd", "cli", "documentation", "open-source", "postgresql", "other"]
+
+WORDS = (
+    "agent code review test build deploy guide pattern module function error handling "
+    "commit branch lint format document release version dependency container cluster "
+    "query index schema migration script pipeline cache latency token context prompt"
+).split()
+
+def random_paragraph(rng, sentences=4):
+    """A paragraph of plausible prose."""
+    return " ".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 16))).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+def guide_filename(index):
+    return f"{GUIDE_KEYWORDS[index % len(GUIDE_KEYWORDS)]}-{index:05d}.md"
+
+def synthesize_guide(rng, index, guide_count):
+    """Create the markdown for a synthetic guide."""
+    lines = [f"<!-- Synthetic guide {index} -->", f"# Guide {index}", "", random_paragraph(rng), ""]
+    for section in range(rng.randint(3, 8)):
+        lines += [f"## Section {section}", "", random_paragraph(rng, rng.randint(2, 6)), ""]
+        if rng.random() < 0.5:
+            lines += ["```bash", f"make test-{section}", "echo 'done' # ## not a heading", "```", ""]
+        for _ in range(rng.randint(0, 3)):
+            target = guide_filename(rng.randrange(guide_count))
+            lines.append(f"- See the [related guide]({target}) for details.")
+        lines.append("")
+    return "\n".join(lines)
+
+def synthesize_corpus(project_dir, guide_count, seed=0):
+    """Write a README, version.txt and guide_count guides into a project directory."""
+    rng = random.Random(seed)
+    guides_dir = os.path.join(project_dir, "guides")
+    os.makedirs(guides_dir, exist_ok=True)
+
+    for index in range(guide_count):
+        with open(os.path.join(guides_dir, guide_filename(index)), 'w', encoding='utf-8') as f:
+            f.write(synthesize_guide(rng, index, guide_count))
+
+    links = "\n".join(f"- [Guide {index}](./guides/{guide_filename(index)})" for index in range(guide_count))
+    readme = "\n".join([
+        "<!-- Synthetic README -->", "# Synthetic Developer Guide", "", random_paragraph(rng), "",
+        "## The Golden Rules", "", random_paragraph(rng, 8), "",
+        "## Guides", "", links, ""
+    ])
+    with open(os.path.join(project_dir, "README.md"), 'w', encoding='utf-8') as f:
+        f.write(readme)
+    with open(os.path.join(project_dir, "version.txt"), 'w', encoding='utf-8') as f:
+        f.write("0.0.0\n")
+
+def measure(stage, trace_memory):
+    """
+    Run a stage, returning its wall time or its peak traced memory.
+
+    Memory is measured in a separate run, as tracing allocations slows the
+    stage down and would distort its timing.
+    """
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if trace_memory:
+            tracemalloc.start()
+            stage()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return peak
+        start = time.perf_counter()
+        stage()
+        return time.perf_counter() - start
+
+def benchmark_corpus(guide_count, work_dir):
+    """Synthesize a corpus and benchmark each stage of the generator against it."""
+    project_dir = os.path.join(work_dir, f"corpus-{guide_count}")
+    output_dir = os.path.join(work_dir, f"site-{guide_count}")
+    readme_path = os.path.join(project_dir, "README.md")
+
+    start = time.perf_counter()
+    synthesize_corpus(project_dir, guide_count)
+    print(f"📝 Synthesized {guide_count} guides in {time.perf_counter() - start:.2f}s")
+
+    guide_files = generate_json.find_guide_files(os.path.join(project_dir, "guides"))
+    context = generate_json.BuildContext(readme_path)
+    with open(readme_path, 'r', encoding='utf-8') as f:
+        readme = f.read()
+    corpus = generate_json.create_corpus(())
+
+    def build_all():
+        # Each guide is streamed from its source to its JSON and sections, as in a build
+        for guide_file in guide_files:
+            generate_json.build_guide(guide_file, output_dir, context.version, context.last_updated(guide_file))
+
+    def full_build():
+        generate_json.create_guide_json(readme_path, output_dir)
+        # The manifest holds the guides of the corpus that the later stages need
+        nonlocal corpus
+        manifest = generate_json.load_manifest(output_dir)
+        corpus = Corpus.from_entries(manifest["guides"].values(), generate_json.GUIDE_TYPE_ORDER)
+
+    # Stages run in order, as the later ones depend on the output of the full build
+    stages = [
+        ("extract_references", lambda: generate_json.extract_references(readme)),
+        ("build_guide", build_all),
+        ("create_guide_json", full_build),
+        ("create_guide_json_incremental_noop",
+         lambda: generate_json.create_guide_json(readme_path, output_dir, incremental=True)),
+        ("create_index_html", lambda: generate_json.create_index_html(output_dir, corpus, context)),
+        ("generate_api_index", lambda: generate_json.generate_api_index(context, output_dir, corpus)),
+        ("create_search_index", lambda: generate_json.create_search_index(output_dir, corpus)),
+        ("create_reference_graph", lambda: generate_json.create_reference_graph(output_dir, corpus)),
+        ("create_related_guides", lambda: generate_json.create_related_guides(output_dir, corpus)),
+        ("create_context_packs", lambda: generate_json.create_context_packs(output_dir, corpus)),
+        ("create_change_feed", lambda: generate_json.create_change_feed(output_dir, corpus, context)),
+    ]
+
+    results = {}
+    for name, stage in stages:
+        seconds = measure(stage, trace_memory=False)
+        peak_bytes = measure(stage, trace_memory=True)
+        results[name] = {"seconds": round(seconds, 6), "peakBytes": peak_bytes}
+        print(f"   {name:<36} {seconds:10.4f}s {peak_bytes / 1024 / 1024:10.1f} MiB")
+    return results
+
+def git_commit():
+    """The current commit, if this is a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare_results(baseline, results):
+    """Print the change in time and memory of each stage against a baseline run."""
+    print(f"\n📈 Compared with {baseline.get('commit') or 'baseline'}:")
+    for size, stages in results["corpora"].items():
+        baseline_stages = baseline.get("corpora", {}).get(size, {})
+        for name, result in stages.items():
+            if name not in baseline_stages:
+                continue
+            before = baseline_stages[name]
+            time_change = (result["seconds"] / before["seconds"] - 1) * 100 if before["seconds"] else 0
+            memory_change = (result["peakBytes"] / before["peakBytes"] - 1) * 100 if before["peakBytes"] else 0
+            print(f"   {size:>6} {name:<36} time {time_change:+7.1f}%  memory {memory_change:+7.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the site generator against synthetic corpora.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"comma separated numbers of guides to synthesize (default: {DEFAULT_SIZES})")
+    parser.add_argument("--output", default="benchmark-results.json", metavar="PATH",
+                        help="where to write the results (default: benchmark-results.json)")
+    parser.add_argument("--compare", metavar="PATH", help="results from a previous run to compare against")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpora": {}
+    }
+
+    with tempfile.TemporaryDirectory(prefix="ai-developer-guide-benchmark-") as work_dir:
+        for size in sizes:
+            print(f"\n⏱️  Benchmarking {size} guides")
+            results["corpora"][str(size)] = benchmark_corpus(size, work_dir)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare_results(json.load(f), results)
+
+if __name__ == "__main__":
+    main()
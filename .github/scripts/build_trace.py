@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Timing spans for the site build.
+
+Stages of the build are wrapped in span() calls. When a BuildTrace is active
+each span is recorded as a Chrome trace event ('X' complete events, with
+microsecond timestamps), so a trace can be opened in chrome://tracing or
+https://ui.perfetto.dev. When no trace is active span() does nothing.
+
+Spans recorded in worker processes are collected with traced_call() and
+merged into the parent's trace. Timestamps come from the monotonic clock,
+which is shared between processes on Linux and macOS.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+_active_trace = None
+
+class BuildTrace:
+    """Collects timing spans as Chrome trace events."""
+
+    def __init__(self):
+        self.events = []
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            # Both ends are truncated to microseconds, so nested spans stay nested
+            self.events.append({
+                "name": name,
+                "ph": "X",
+                "ts": start // 1000,
+                "dur": end // 1000 - start // 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": args
+            })
+
+    def summary(self):
+        """Total time and count for each span name, slowest first."""
+        totals = {}
+        for event in self.events:
+            total, count = totals.get(event["name"], (0, 0))
+            totals[event["name"]] = (total + event["dur"], count + 1)
+        return sorted(totals.items(), key=lambda item: -item[1][0])
+
+    def write(self, trace_path):
+        """Write the trace as a Chrome trace event file."""
+        with open(trace_path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+@contextlib.contextmanager
+def activate(trace):
+    """Make a trace the active trace for span() calls."""
+    global _active_trace
+    previous = _active_trace
+    _active_trace = trace
+    try:
+        yield trace
+    finally:
+        _active_trace = previous
+
+def is_active():
+    return _active_trace is not None
+
+def span(name, **args):
+    """Time a stage of the build, if a trace is active."""
+    if _active_trace is None:
+        return contextlib.nullcontext()
+    return _active_trace.span(name, **args)
+
+def merge_events(events):
+    """Add events recorded elsewhere, such as in a worker process, to the active trace."""
+    if _active_trace is not None:
+        _active_trace.events.extend(events)
+
+def traced_call(function, *args):
+    """
+    Call a function with its own trace active, returning its result and the trace events.
+
+    This is used to run a function in a worker process and merge its spans
+    into the parent's trace.
+    """
+    trace = BuildTrace()
+    with activate(trace):
+        result = function(*args)
+    return result, trace.events
+
+def profile_call(function, profile_dir, top=30):
+    """
+    Call a function under cProfile and tracemalloc, writing the reports to a directory.
+
+    Writes profile.prof (for pstats or snakeviz), profile.txt (the functions
+    with the highest cumulative time) and memory.txt (peak traced memory and
+    the largest allocation sites). Work done in worker processes is not
+    included.
+    """
+    import cProfile
+    import io
+    import pstats
+    import tracemalloc
+
+    os.makedirs(profile_dir, exist_ok=True)
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    try:
+        result = profiler.runcall(function)
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    profiler.dump_stats(os.path.join(profile_dir, "profile.prof"))
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(top)
+    with open(os.path.join(profile_dir, "profile.txt"), 'w', encoding='utf-8') as f:
+        f.write(report.getvalue())
+
+    with open(os.path.join(profile_dir, "memory.txt"), 'w', encoding='utf-8') as f:
+        f.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB\n\n")
+        for statistic in snapshot.statistics("lineno")[:top]:
+            f.write(f"{statistic}\n")
+
+    return result
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Single-file bundle of the generated API.
+
+The bundle holds the API index, the main guide and every specific guide as
+length-prefixed records, with an offset table at the start of the file. A
+consumer can mmap the bundle and read a single guide without parsing the rest.
+
+Layout (all integers are little-endian):
+
+    magic           8 bytes, b"ADGBNDL1"
+    record count    u32
+    offset table    for each record:
+                        key length  u16
+                        key         UTF-8, the path of the output (e.g. "api/guide.json")
+                        offset      u64, absolute offset of the record
+    records         for each record:
+                        length      u32
+                        data        the JSON output, as written by the generator
+
+Usage: python bundle.py BUNDLE_PATH [KEY]
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+
+from output_writer import read_chunks, write_output
+
+BUNDLE_MAGIC = b"ADGBNDL1"
+HEADER = struct.Struct("<8sI")
+KEY_LENGTH = struct.Struct("<H")
+OFFSET = struct.Struct("<Q")
+RECORD_LENGTH = struct.Struct("<I")
+
+def write_bundle(bundle_path, records):
+    """
+    Write a bundle file.
+
+    Args:
+        bundle_path: Path of the bundle to write
+        records: List of (key, path) tuples, where path is the file holding
+            the record's data, which is copied into the bundle in chunks
+    """
+    encoded_keys = [key.encode('utf-8') for key, _ in records]
+    table_size = sum(KEY_LENGTH.size + len(key) + OFFSET.size for key in encoded_keys)
+
+    # Records follow the header and the offset table
+    offset = HEADER.size + table_size
+    offsets = []
+    lengths = []
+    for _, path in records:
+        offsets.append(offset)
+        lengths.append(os.path.getsize(path))
+        offset += RECORD_LENGTH.size + lengths[-1]
+
+    with write_output(bundle_path, 'wb') as f:
+        f.write(HEADER.pack(BUNDLE_MAGIC, len(records)))
+        for key, record_offset in zip(encoded_keys, offsets):
+            f.write(KEY_LENGTH.pack(len(key)))
+            f.write(key)
+            f.write(OFFSET.pack(record_offset))
+        for (_, path), length in zip(records, lengths):
+            f.write(RECORD_LENGTH.pack(length))
+            for chunk in read_chunks(path):
+                f.write(chunk)
+
+class BundleReader:
+    """Reads records from a bundle file via mmap, parsing only the offset table up front."""
+
+    def __init__(self, bundle_path):
+        with open(bundle_path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = HEADER.unpack_from(self.data, 0)
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f"{bundle_path} is not a guide bundle")
+
+        self.offsets = {}
+        position = HEADER.size
+        for _ in range(count):
+            (key_length,) = KEY_LENGTH.unpack_from(self.data, position)
+            position += KEY_LENGTH.size
+            key = self.data[position:position + key_length].decode('utf-8')
+            position += key_length
+            (self.offsets[key],) = OFFSET.unpack_from(self.data, position)
+            position += OFFSET.size
+
+    def keys(self):
+        """The keys of the records in the bundle, in bundle order."""
+        return list(self.offsets)
+
+    def get(self, key):
+        """Return the raw bytes of a record."""
+        offset = self.offsets[key]
+        (length,) = RECORD_LENGTH.unpack_from(self.data, offset)
+        start = offset + RECORD_LENGTH.size
+        return self.data[start:start + length]
+
+    def get_json(self, key):
+        """Return a record parsed as JSON."""
+        return json.loads(self.get(key))
+
+    def close(self):
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python bundle.py BUNDLE_PATH [KEY]")
+        sys.exit(1)
+
+    with BundleReader(sys.argv[1]) as reader:
+        if len(sys.argv) == 2:
+            for key in reader.keys():
+                print(key)
+        else:
+            sys.stdout.write(reader.get(sys.argv[2]).decode('utf-8'))
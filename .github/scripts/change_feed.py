@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Change feed of the guides and sections added, modified and removed in each version.
+
+Consumers that keep a copy of the API can stay current by fetching the feed
+and the diffs since the version they have, rather than every guide:
+
+    api/changes.json                 the feed, newest version first
+    api/changes/FROM..TO.json        the sections to replace and remove to
+                                     update a copy of FROM to TO
+    api/changes/snapshot.json        the content hashes of the current version
+
+Changes are found by comparing content hashes, not dates, so a rebuild that
+only changes 'lastUpdated' reports no changes. The snapshot written by the
+previous build is the history the next build compares against; CI downloads
+it from the published site before building (see seed_change_feed.py). Each
+entry in the feed compares a version with the last build of the version
+before it, so rebuilding the same version replaces its entry rather than
+adding another. The snapshot is always written compactly, as it is not meant
+to be read by people.
+"""
+
+import hashlib
+import json
+import os
+
+from corpus import section_path_for
+from output_writer import remove_output, write_output
+
+CHANGES_PATH = "api/changes.json"
+CHANGES_DIR = "api/changes"
+SNAPSHOT_PATH = f"{CHANGES_DIR}/snapshot.json"
+
+# The number of versions kept in the feed, older diffs are removed
+FEED_LIMIT = 50
+
+def diff_path(from_version, to_version):
+    return f"{CHANGES_DIR}/{from_version}..{to_version}.json"
+
+def content_hash(parts):
+    """A short hash of a sequence of strings."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8') + b'\n')
+    return digest.hexdigest()[:16]
+
+def write_json(path, data, minify=False):
+    with write_output(path) as f:
+        if minify:
+            json.dump(data, f, separators=(',', ':'))
+        else:
+            json.dump(data, f, indent=2)
+
+def load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return default
+
+def compare_snapshots(before, after):
+    """
+    Compare the guides of two snapshots.
+
+    Returns:
+        The guides added, modified and removed, and for each of those guides
+        the anchors of the sections added, modified and removed
+    """
+    changes = {"added": [], "modified": [], "removed": [], "sections": {}}
+    for guide_path in sorted(before.keys() | after.keys()):
+        old = before.get(guide_path, {"sections": {}})
+        new = after.get(guide_path, {"sections": {}})
+        if old.get("hash") == new.get("hash"):
+            continue
+        if guide_path not in before:
+            changes["added"].append(guide_path)
+        elif guide_path not in after:
+            changes["removed"].append(guide_path)
+        else:
+            changes["modified"].append(guide_path)
+        old_sections, new_sections = old["sections"], new["sections"]
+        changes["sections"][guide_path] = {
+            "added": [anchor for anchor in new_sections if anchor not in old_sections],
+            "modified": [anchor for anchor in new_sections
+                         if anchor in old_sections and old_sections[anchor] != new_sections[anchor]],
+            "removed": [anchor for anchor in old_sections if anchor not in new_sections]
+        }
+    return changes
+
+def build_change_feed(output_dir, version, date, guides, minify=False):
+    """
+    Update the change feed and write the diff for a version.
+
+    Args:
+        output_dir: Directory to output the generated files
+        version: The version being built
+        date: The date the version was last updated
+        guides: Snapshot of the guides being built, mapping each guide's path
+            to its name, content hash, sections directory and the hash of
+            each section by anchor
+        minify: Write the feed and diff without indentation or whitespace
+
+    Returns:
+        The feed entry for the version
+    """
+    previous = load_json(os.path.join(output_dir, SNAPSHOT_PATH), None)
+    feed = load_json(os.path.join(output_dir, CHANGES_PATH), {"versions": []})
+
+    # The version is compared with the last build of the version before it
+    if previous is None:
+        base = None
+    elif previous["version"] == version:
+        base = previous.get("base")
+    else:
+        base = {"version": previous["version"], "guides": previous["guides"]}
+
+    # The hash of the whole corpus lets consumers spot changes made without a new version
+    entry = {"version": version, "date": date, "from": base["version"] if base else None,
+             "hash": content_hash(f"{path}:{guides[path]['hash']}" for path in sorted(guides))}
+    if base:
+        changes = compare_snapshots(base["guides"], guides)
+        entry.update(changes, diff=diff_path(base["version"], version))
+        write_diff(output_dir, entry, guides, minify)
+    else:
+        # With no history every guide is new, and consumers need the whole API
+        entry.update(added=sorted(guides), modified=[], removed=[], sections={}, diff=None)
+
+    versions = [entry] + [existing for existing in feed["versions"] if existing["version"] != version]
+    feed = {"latest": version, "versions": versions[:FEED_LIMIT]}
+    write_json(os.path.join(output_dir, CHANGES_PATH), feed, minify)
+    write_json(os.path.join(output_dir, SNAPSHOT_PATH), {"version": version, "guides": guides, "base": base},
+               minify=True)
+
+    # Remove the diffs of versions which have dropped out of the feed
+    kept = {os.path.basename(existing["diff"]) for existing in feed["versions"] if existing["diff"]}
+    kept.add(os.path.basename(SNAPSHOT_PATH))
+    for filename in os.listdir(os.path.join(output_dir, CHANGES_DIR)):
+        source = filename.rsplit('.', 1)[0] if filename.endswith(('.gz', '.br')) else filename
+        if source not in kept and not filename.startswith('.'):
+            remove_output(os.path.join(output_dir, CHANGES_DIR, filename))
+    return entry
+
+def write_diff(output_dir, entry, guides, minify=False):
+    """
+    Write the diff for a feed entry: the content of each added or modified section and the anchors removed.
+
+    Guides which were removed are listed so their copies can be deleted,
+    and each changed guide's new section index path is given so the copy of
+    the index can be refreshed.
+    """
+    diff = {"from": entry["from"], "to": entry["version"], "removed": entry["removed"], "guides": {}}
+    for guide_path, sections in entry["sections"].items():
+        if guide_path in entry["removed"]:
+            continue
+        upserts = []
+        for anchor in sections["added"] + sections["modified"]:
+            section_path = section_path_for(guides[guide_path]['sectionsDir'], anchor)
+            with open(os.path.join(output_dir, section_path), 'r', encoding='utf-8') as f:
+                upserts.append(dict(json.load(f), path=section_path))
+        diff["guides"][guide_path] = {
+            "name": guides[guide_path]["name"],
+            "sectionIndex": f"{guides[guide_path]['sectionsDir']}/sections.json",
+            "sections": upserts,
+            "removedSections": sections["removed"]
+        }
+    write_json(os.path.join(output_dir, entry["diff"]), diff, minify)
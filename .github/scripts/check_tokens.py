@@ -1,74 +1,271 @@
 #!/usr/bin/env python3
 """
-Script to check token lengths of documentation files using HuggingFace tokenizers.
+Script to check token lengths of documentation files.
+
+Token counts are reported for each model configured in token-models.json,
+side by side. Each model uses a tokenizer backend from the registry below:
+backends load vocabularies from local files only, and if a backend cannot be
+loaded (for example the vocabulary file or the 'tokenizers' package is not
+available) the approximate estimator is used instead, so no network access is
+needed. Per-file token budgets in the same config fail the check if exceeded.
+
+Vocabulary paths are relative to the config file. The default config counts
+GPT-2 tokens exactly, from .github/tokenizers/gpt2.json, which is the
+'tokenizer.json' file of the gpt2 model on the HuggingFace Hub. It is not
+kept in the repository: 'make fetch-tokenizers' downloads it, which CI does
+(and caches) before the check, along with installing 'tokenizers'. Without
+them the GPT-2 column shows approximate counts, marked as such.
+
+The report is drawn with 'tabulate' if it is installed, and with a built-in
+grid otherwise, so nothing needs to be installed to run the check.
 """
 
-import os
+import argparse
+import fnmatch
 import glob
-import subprocess
+import hashlib
+import json
+import os
 import sys
-from tabulate import tabulate
 
-def install_dependencies():
-    """Install required dependencies if not present."""
+# The site generator's section splitting and token estimator are reused so
+# that the sections counted here match the generated section endpoints
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from generate_json import estimate_tokens, split_sections  # noqa: E402
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The models to report on and the token budgets for each file
+DEFAULT_CONFIG_PATH = os.path.join(BASE_DIR, ".github", "token-models.json")
+
+# Token counts are cached by content hash, so unchanged files are never
+# re-tokenized. Counts not used by a run are dropped when the cache is saved.
+DEFAULT_CACHE_FILENAME = ".token-cache.json"
+
+# Tokenizer backends, by name. Each is a function which takes the model's
+# config (and the directory paths in it are relative to) and returns a
+# tokenizer object with an 'id' (which changes if the vocabulary changes) and
+# a 'count_batch' method.
+TOKENIZER_BACKENDS = {}
+
+def register_backend(name):
+    """Register a tokenizer backend loader under a name."""
+    def decorator(loader):
+        TOKENIZER_BACKENDS[name] = loader
+        return loader
+    return decorator
+
+def file_hash(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+class ApproximateTokenizer:
+    """Estimates token counts with a regular expression, optionally scaled to calibrate against a model."""
+
+    def __init__(self, scale=1.0):
+        self.scale = scale
+        self.id = f"approximate:{scale}"
+
+    def count_batch(self, contents):
+        return [round(estimate_tokens(content) * self.scale) for content in contents]
+
+class HuggingFaceTokenizer:
+    """Counts tokens with a HuggingFace tokenizer loaded from a local tokenizer.json file."""
+
+    def __init__(self, path):
+        from tokenizers import Tokenizer
+
+        self.tokenizer = Tokenizer.from_file(path)
+        self.id = f"huggingface:{file_hash(path)[:16]}"
+
+    def count_batch(self, contents):
+        return [len(encoding.ids) for encoding in self.tokenizer.encode_batch(contents)]
+
+@register_backend("approximate")
+def load_approximate(model_config, config_dir):
+    return ApproximateTokenizer(model_config.get("scale", 1.0))
+
+@register_backend("huggingface")
+def load_huggingface(model_config, config_dir):
+    return HuggingFaceTokenizer(os.path.join(config_dir, model_config["path"]))
+
+def load_tokenizer(name, model_config, config_dir):
+    """
+    Load the tokenizer for a model, falling back to the approximate estimator.
+
+    Returns:
+        A tuple of the tokenizer and whether it is the fallback estimator
+    """
+    backend = model_config.get("backend", "approximate")
+    if backend not in TOKENIZER_BACKENDS:
+        raise ValueError(f"Unknown tokenizer backend '{backend}' for model '{name}', "
+                         f"available backends are: {', '.join(sorted(TOKENIZER_BACKENDS))}")
     try:
-        import tokenizers
-        import tabulate
+        return TOKENIZER_BACKENDS[backend](model_config, config_dir), False
+    except Exception as e:
+        print(f"⚠️  Could not load the {backend} tokenizer for {name} ({e}), using the approximate estimator.")
+        return ApproximateTokenizer(model_config.get("scale", 1.0)), True
+
+def load_config(config_path):
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_token_cache(cache_path):
+    """Load cached token counts, keyed by tokenizer id and then content hash."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_token_cache(cache_path, cache):
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+def prune_token_cache(cache, tokenizer_ids, hashes):
+    """Keep only the counts for the given tokenizers and content hashes."""
+    return {tokenizer_id: {digest: count for digest, count in cache.get(tokenizer_id, {}).items()
+                           if digest in hashes}
+            for tokenizer_id in tokenizer_ids}
+
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def count_tokens(tokenizer, contents, cache):
+    """
+    Count tokens in each of a list of strings.
+
+    Counts are looked up in the cache by content hash first. Anything not in
+    the cache is tokenized in a single batch, and the cache is updated.
+
+    Returns:
+        A tuple of the counts and the number of strings that were tokenized
+    """
+    hashes = [content_hash(content) for content in contents]
+    counts = cache.setdefault(tokenizer.id, {})
+    missing = {digest: content for digest, content in zip(hashes, contents) if digest not in counts}
+    if missing:
+        for digest, count in zip(missing, tokenizer.count_batch(list(missing.values()))):
+            counts[digest] = count
+    return [counts[digest] for digest in hashes], len(missing)
+
+def find_budget(budgets, relative_path):
+    """Find the token budget for a file, from the first matching pattern."""
+    for pattern, budget in budgets.items():
+        if fnmatch.fnmatch(relative_path, pattern):
+            return budget
+    return None
+
+def format_table(rows, headers):
+    """Format rows as a grid, using tabulate if it happens to be installed."""
+    try:
+        from tabulate import tabulate
+        return tabulate(rows, headers=headers, tablefmt="grid")
     except ImportError:
-        print("📦 Installing required dependencies...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "tokenizers", "tabulate"])
-        print("✅ Dependencies installed successfully.")
-
-def count_tokens(file_path):
-    """Count tokens in a file using HuggingFace tokenizers."""
-    from tokenizers import Tokenizer
-    from tokenizers.models import BPE
-    
-    # Load GPT-2 tokenizer (commonly used baseline for many models)
-    tokenizer = Tokenizer.from_pretrained("gpt2")
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-        
-    encoded = tokenizer.encode(content)
-    return len(encoded.ids)
+        cells = [headers] + [["" if cell is None else str(cell) for cell in row] for row in rows]
+        widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+        separator = "+" + "+".join("-" * (width + 2) for width in widths) + "+"
+        lines = [separator]
+        for index, row in enumerate(cells):
+            lines.append("| " + " | ".join(cell.ljust(width) for cell, width in zip(row, widths)) + " |")
+            if index == 0:
+                lines.append(separator.replace("-", "="))
+        lines.append(separator)
+        return "\n".join(lines)
 
 def format_file_path(file_path):
     """Format file path to be more readable."""
-    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    relative_path = os.path.relpath(file_path, base_dir)
+    relative_path = os.path.relpath(file_path, BASE_DIR)
     return relative_path
 
 def main():
-    """Check token lengths of README.md and docs/*.md files."""
-    install_dependencies()
-    
-    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    
+    """Check token lengths of README.md, docs/*.md and guides/*.md files."""
+    parser = argparse.ArgumentParser(description="Check the token lengths of documentation files.")
+    parser.add_argument("--sections", action="store_true",
+                        help="also report each section, as split by the site generator")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, metavar="PATH",
+                        help="models and token budgets config (default: .github/token-models.json)")
+    parser.add_argument("--cache", default=None, metavar="PATH",
+                        help=f"token count cache file (default: {DEFAULT_CACHE_FILENAME} in the project root)")
+    args = parser.parse_args()
+
+    cache_path = args.cache or os.path.join(BASE_DIR, DEFAULT_CACHE_FILENAME)
+    config = load_config(args.config)
+    config_dir = os.path.dirname(os.path.abspath(args.config))
+    budgets = config.get("budgets", {})
+
     files_to_check = [
-        os.path.join(base_dir, "README.md"),
+        os.path.join(BASE_DIR, "README.md"),
     ]
-    
-    # Add all markdown files in docs directory
-    docs_pattern = os.path.join(base_dir, "docs", "**", "*.md")
-    files_to_check.extend(glob.glob(docs_pattern, recursive=True))
-    
-    results = []
-    total_tokens = 0
-    
+
+    # Add all markdown files in the docs and guides directories
+    for directory in ("docs", "guides"):
+        pattern = os.path.join(BASE_DIR, directory, "**", "*.md")
+        files_to_check.extend(sorted(glob.glob(pattern, recursive=True)))
+
+    # Collect the files, and optionally their sections, to count. Budgets only
+    # apply to whole files.
+    labels = []
+    contents = []
+    file_budgets = []
     for file_path in files_to_check:
-        if os.path.exists(file_path):
-            token_count = count_tokens(file_path)
-            total_tokens += token_count
-            results.append([format_file_path(file_path), token_count])
-    
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        relative_path = format_file_path(file_path)
+        labels.append(relative_path)
+        contents.append(content)
+        file_budgets.append(find_budget(budgets, relative_path))
+        if args.sections:
+            title = os.path.basename(file_path).replace('.md', '')
+            for section in split_sections(content, title):
+                labels.append(f"  {relative_path}#{section['anchor']}")
+                contents.append(section["content"])
+                file_budgets.append(False)
+
+    # Count the tokens for each model
+    cache = load_token_cache(cache_path)
+    model_names = []
+    model_counts = []
+    tokenizer_ids = set()
+    for name, model_config in config["models"].items():
+        tokenizer, is_fallback = load_tokenizer(name, model_config, config_dir)
+        tokenizer_ids.add(tokenizer.id)
+        counts, tokenized = count_tokens(tokenizer, contents, cache)
+        print(f"🔢 {name}: tokenized {tokenized} of {len(contents)} file(s) and section(s), the rest were cached.")
+        model_names.append(f"{name} (approx)" if is_fallback and model_config.get("backend") != "approximate"
+                           else name)
+        model_counts.append(counts)
+    hashes = {content_hash(content) for content in contents}
+    save_token_cache(cache_path, prune_token_cache(cache, tokenizer_ids, hashes))
+
+    # Build the report, checking each file against its budget
+    results = []
+    over_budget = []
+    for index, label in enumerate(labels):
+        counts = [model[index] for model in model_counts]
+        budget = file_budgets[index]
+        results.append([label] + counts + [budget or None])
+        if budget and max(counts) > budget:
+            over_budget.append(f"{label}: {max(counts)} tokens, budget is {budget}")
+
     # Add total row
-    results.append(["TOTAL", total_tokens])
-    
+    totals = [sum(count for count, budget in zip(model, file_budgets) if budget is not False)
+              for model in model_counts]
+    results.append(["TOTAL"] + totals + [None])
+
     # Print results as a table
     print("\n📊 Token Count Summary:")
-    print(tabulate(results, headers=["File", "Token Count"], tablefmt="grid"))
-    print("\nNote: Token counts are based on the GPT-2 tokenizer and may vary for different models.")
+    print(format_table(results, ["File"] + model_names + ["Budget"]))
+    print("\nNote: Token counts vary between models; approximate counts are estimates only.")
+
+    if over_budget:
+        print("\n❌ Files over their token budget:")
+        for line in over_budget:
+            print(f"   {line}")
+        sys.exit(1)
+    print("\n✅ All files are within their token budgets.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Context packs: the most relevant guidance that fits in a token budget.
+
+Packs are built for each guide and each guide type at each budget, so an
+agent can fetch a single file and use it as it is, rather than fetching whole
+guides and truncating them:
+
+    api/packs/8k/guides/languages/python.json    the pack for a guide
+    api/packs/8k/languages.json                  the pack for a guide type
+
+Every pack starts with the Golden Rules from the main guide, even if they
+would not fit in the budget on their own. Sections are then added in order
+of relevance, skipping any section that would take the pack over its budget:
+
+    for a guide        its own sections, the main guide, then the sections of
+                       its related guides, most related first
+    for a guide type   the sections of each guide of the type, then the main
+                       guide
+
+Token counts are the estimates in the section indexes. Sections are joined
+at line breaks, so the tokens in a pack are the sum of its sections' tokens.
+"""
+
+import json
+import os
+from functools import lru_cache
+
+from corpus import load_sections
+from output_writer import remove_output, write_output
+
+PACKS_DIR = "api/packs"
+
+# The token budgets packs are built for
+PACK_BUDGETS = (2000, 8000, 32000)
+
+# The anchor of the section every pack starts with, in the main guide
+GOLDEN_RULES_ANCHOR = "the-golden-rules"
+
+def budget_label(budget):
+    """The label of a budget in pack paths, e.g. '8k'."""
+    return f"{budget // 1000}k"
+
+def guide_pack_path(guide_path, budget):
+    """The path of a guide's pack, e.g. api/packs/8k/guides/languages/python.json."""
+    return f"{PACKS_DIR}/{budget_label(budget)}/{guide_path[len('api/'):]}"
+
+def type_pack_path(guide_type, budget):
+    """The path of a guide type's pack, e.g. api/packs/8k/languages.json."""
+    return f"{PACKS_DIR}/{budget_label(budget)}/{guide_type}s.json"
+
+def fill_packs(required, candidates, budgets):
+    """
+    Choose the sections for a pack at each budget.
+
+    Args:
+        required: Sections which are always included
+        candidates: Iterable of sections in order of relevance
+        budgets: The token budgets to fill
+
+    Returns:
+        For each budget, the list of sections chosen
+    """
+    chosen = [list(required) for _ in budgets]
+    remaining = [budget - sum(section.tokens for section in required) for budget in budgets]
+    seen = {section.path for section in required}
+    for section in candidates:
+        if section.path in seen:
+            continue
+        seen.add(section.path)
+        for index, tokens in enumerate(remaining):
+            if section.tokens <= tokens:
+                chosen[index].append(section)
+                remaining[index] -= section.tokens
+        if max(remaining) <= 0:
+            break
+    return chosen
+
+def build_context_packs(output_dir, corpus, related, minify=False):
+    """
+    Write the context packs for every guide and guide type at each budget.
+
+    Args:
+        output_dir: Directory to output the generated files
+        corpus: The Corpus of guides
+        related: The related guides of each guide, by path, as returned by
+            similarity.load_related_guides
+        minify: Write the packs without indentation or whitespace
+
+    Returns:
+        The number of packs written
+    """
+    # Section indexes and content are read as they are needed. The main
+    # guide's sections are in every pack, so recently read ones are kept.
+    @lru_cache(maxsize=1024)
+    def guide_sections(guide):
+        return load_sections(output_dir, guide)
+
+    @lru_cache(maxsize=1024)
+    def load_content(section_path):
+        with open(os.path.join(output_dir, section_path), 'r', encoding='utf-8') as f:
+            return json.load(f)["content"]
+
+    def sections_of(guides):
+        for guide in guides:
+            yield from guide_sections(guide)
+
+    main_guide = corpus.main_guide
+    golden_rules = [section for section in guide_sections(main_guide) if section.anchor == GOLDEN_RULES_ANCHOR]
+
+    written = set()
+
+    def write_packs(name, chosen_by_budget, pack_path):
+        for budget, chosen in zip(PACK_BUDGETS, chosen_by_budget):
+            path = pack_path(budget)
+            pack = {
+                "name": name,
+                "budget": budget,
+                "tokens": sum(section.tokens for section in chosen),
+                "sections": [{"guide": section.guide, "title": section.title, "anchor": section.anchor,
+                              "tokens": section.tokens, "path": section.path} for section in chosen],
+                "content": "\n".join(load_content(section.path) for section in chosen)
+            }
+            with write_output(os.path.join(output_dir, path)) as f:
+                if minify:
+                    f.write(json.dumps(pack, separators=(',', ':')))
+                else:
+                    f.write(json.dumps(pack, indent=2))
+            written.add(path)
+
+    for guide in corpus:
+        related_guides = [corpus.by_path[entry["path"]] for entry in related.get(guide.path, [])
+                          if entry["path"] in corpus.by_path]
+        candidates = sections_of([guide, main_guide] + related_guides)
+        write_packs(guide.name, fill_packs(golden_rules, candidates, PACK_BUDGETS),
+                    lambda budget: guide_pack_path(guide.path, budget))
+
+    for guide_type in sorted(corpus.by_type):
+        candidates = sections_of(corpus.by_type[guide_type] + (main_guide,))
+        write_packs(f"{guide_type.capitalize()} guides", fill_packs(golden_rules, candidates, PACK_BUDGETS),
+                    lambda budget: type_pack_path(guide_type, budget))
+
+    # Remove the packs of guides, types and budgets which no longer exist
+    for root, _, files in os.walk(os.path.join(output_dir, PACKS_DIR)):
+        for filename in files:
+            relative_path = os.path.relpath(os.path.join(root, filename), output_dir).replace(os.sep, '/')
+            source_path = relative_path.rsplit('.', 1)[0] if filename.endswith(('.gz', '.br')) else relative_path
+            if source_path not in written and not filename.startswith('.'):
+                remove_output(os.path.join(root, filename))
+
+    return len(written)
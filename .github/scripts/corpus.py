@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+The in-memory model of the guides in a build.
+
+The corpus is built once per run, from the guides in source order, and every
+output stage reads from it rather than regrouping the guide listing itself:
+
+    corpus.guides        the guides, in source order
+    corpus.main_guide    the main guide, built from the README
+    corpus.by_path       the guides by the path of their JSON
+    corpus.by_name       the guides by name, as they are keyed in api.json
+    corpus.by_type       the guides of each type, in source order
+    corpus.index_order   the guides in the order of the site index
+
+Guides and sections are records with __slots__, and guide types are
+interned, so the memory used by each guide is a small fixed overhead on top
+of its strings. Sections are only loaded from a guide's section index when a
+stage needs them, so the corpus never holds every section at once.
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+MAIN_GUIDE_NAME = "AI Developer Guide"
+MAIN_GUIDE_PATH = "api/guide.json"
+
+# Section endpoints are named after their anchors, which are as long as their
+# headings. Longer anchors are truncated to this many bytes, including a hash
+# of the whole anchor, so that the endpoints, their compressed siblings and
+# the temporary files they are written to stay within the 255 byte limit on
+# filenames.
+MAX_SECTION_FILENAME_BYTES = 200
+
+def sections_dir_for(guide_path):
+    """The directory holding a guide's section index and endpoints, e.g. api/guides/patterns/make."""
+    return os.path.splitext(guide_path)[0]
+
+def section_path_for(sections_dir, anchor):
+    """The path of a section's endpoint, e.g. api/guides/patterns/make/sections/help.json."""
+    encoded = anchor.encode('utf-8')
+    if len(encoded) > MAX_SECTION_FILENAME_BYTES:
+        digest = hashlib.sha256(encoded).hexdigest()[:16]
+        # Cut at a character boundary, so the filename is still valid UTF-8
+        prefix = encoded[:MAX_SECTION_FILENAME_BYTES - len(digest) - 1].decode('utf-8', 'ignore')
+        anchor = f"{prefix}-{digest}"
+    return f"{sections_dir}/sections/{anchor}.json"
+
+class Guide:
+    """A guide in the corpus: its name, type and the path of its JSON, relative to the output directory."""
+
+    __slots__ = ("name", "type", "path")
+
+    def __init__(self, name, guide_type, path):
+        self.name = name
+        self.type = sys.intern(guide_type)
+        self.path = path
+
+    @classmethod
+    def from_entry(cls, entry):
+        """Create a guide from its entry in the build manifest."""
+        return cls(entry["name"], entry["type"], entry["path"])
+
+    def to_entry(self):
+        """The guide's entry in the build manifest."""
+        return {"name": self.name, "type": self.type, "path": self.path}
+
+    @property
+    def key(self):
+        """The name the guide is listed under in api.json, e.g. 'python'."""
+        return os.path.basename(self.path).replace(".json", "")
+
+    @property
+    def sections_dir(self):
+        return sections_dir_for(self.path)
+
+    @property
+    def section_index(self):
+        """The path of the guide's section index."""
+        return f"{sections_dir_for(self.path)}/sections.json"
+
+    def __reduce__(self):
+        # Guides built in worker processes are pickled back, and are created
+        # afresh so that their types are interned in this process
+        return Guide, (self.name, self.type, self.path)
+
+    def __eq__(self, other):
+        if not isinstance(other, Guide):
+            return NotImplemented
+        return (self.name, self.type, self.path) == (other.name, other.type, other.path)
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def __repr__(self):
+        return f"Guide({self.name!r}, {self.type!r}, {self.path!r})"
+
+class Section:
+    """A section of a guide, as listed in the guide's section index."""
+
+    __slots__ = ("guide", "title", "anchor", "level", "tokens", "path", "hash")
+
+    def __init__(self, guide, title, anchor, level, tokens, path, content_hash):
+        self.guide = guide
+        self.title = title
+        self.anchor = anchor
+        self.level = level
+        self.tokens = tokens
+        self.path = path
+        self.hash = content_hash
+
+    def __repr__(self):
+        return f"Section({self.path!r})"
+
+def load_sections(output_dir, guide):
+    """Load the sections of a generated guide from its section index, without their content."""
+    with open(os.path.join(output_dir, guide.section_index), 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    return tuple(Section(guide.path, entry["title"], entry["anchor"], entry["level"], entry["tokens"],
+                         entry["path"], entry["hash"]) for entry in index["sections"])
+
+class Corpus:
+    """
+    The guides in a build, with indexes by path, name and type.
+
+    Args:
+        guides: The guides, in source order
+        type_order: The order guide types are shown in the site index, any
+            other types follow in alphabetical order
+    """
+
+    __slots__ = ("guides", "main_guide", "by_path", "by_name", "by_type", "index_order")
+
+    def __init__(self, guides, type_order=()):
+        self.guides = tuple(guides)
+        self.main_guide = Guide(MAIN_GUIDE_NAME, "main", MAIN_GUIDE_PATH)
+        self.by_path = {guide.path: guide for guide in self.guides}
+        self.by_name = {guide.key: guide for guide in self.guides}
+        by_type = {}
+        for guide in self.guides:
+            by_type.setdefault(guide.type, []).append(guide)
+        self.by_type = {guide_type: tuple(guides) for guide_type, guides in by_type.items()}
+        ordered_types = list(dict.fromkeys([guide_type for guide_type in type_order if guide_type in by_type]
+                                           + sorted(by_type)))
+        self.index_order = tuple(guide for guide_type in ordered_types
+                                 for guide in sorted(by_type[guide_type], key=lambda g: g.name))
+
+    @classmethod
+    def from_entries(cls, entries, type_order=()):
+        """Create a corpus from guide entries in the build manifest."""
+        return cls((Guide.from_entry(entry) for entry in entries), type_order)
+
+    @property
+    def all_guides(self):
+        """The main guide, then every guide in source order."""
+        return (self.main_guide,) + self.guides
+
+    def __len__(self):
+        return len(self.guides)
+
+    def __iter__(self):
+        return iter(self.guides)
@@ -2,37 +2,143 @@
 """
 Development server with live reload for the AI Developer Guide site.
 Watches for changes in guides/, README.md, and the generation script.
+
+The generated site is served from memory, and the cache is refreshed by each
+rebuild. Request latency statistics are served at /_dev/stats.
 """
 
+import functools
+import importlib
+import json
+import mimetypes
 import os
+import posixpath
+import re
 import sys
 import time
 import threading
-import subprocess
-from pathlib import Path
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from collections import deque
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+# The generator lives alongside this script and is imported once, rather than
+# being run in a new process for every change.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import generate_json  # noqa: E402
+
+# The stages which cover every guide, in the order they run. The term stages
+# only read the titles, terms and links of each guide.
+AGGREGATE_STAGES = ("search_index", "reference_graph", "related_guides", "context_packs", "change_feed")
+TERM_STAGES = {"search_index", "reference_graph", "related_guides"}
+
 class SiteRegenerator(FileSystemEventHandler):
-    """Handles file change events and regenerates the site."""
+    """
+    Handles file change events and regenerates the site.
     
-    def __init__(self, readme_path, output_dir):
-        self.readme_path = readme_path
-        self.output_dir = output_dir
-        self.last_rebuild = 0
-        self.rebuild_delay = 1  # seconds
+    The generator is imported once and the guides are kept in memory, so
+    a change to a guide only re-processes that guide. The generator and the
+    modules alongside it are only re-imported, followed by a full build, when
+    one of those modules changes.
+    
+    The stages which cover every guide, such as the search index, are slow
+    for a large corpus, so they are deferred until no changes have arrived for
+    the aggregate delay, and the browser is reloaded as soon as the changed
+    guides are rebuilt. The term stages are skipped altogether if the changed
+    guides' titles, terms and links are unchanged.
+    """
+    
+    def __init__(self, readme_path, output_dir, on_rebuilt=None):
+        self.readme_path = os.path.abspath(readme_path)
+        self.output_dir = os.path.abspath(output_dir)
+        self.project_dir = os.path.dirname(self.readme_path)
+        self.guides_dir = os.path.join(self.project_dir, 'guides')
+        self.api_dir = os.path.join(self.output_dir, 'api')
+        self.scripts_dir = os.path.dirname(os.path.abspath(generate_json.__file__))
+        self.generator = generate_json
+        self.guides = {}  # guide source path -> Guide record
+        self.context = None  # the generator's BuildContext for the current rebuild
+        self.site_updated = None  # the date shown in the site index when it was last written
+        self.on_rebuilt = on_rebuilt  # called after each successful rebuild
+        self.written_paths = None  # outputs written by the current rebuild, None for all
+        
+        # Changes are queued by the watchdog thread and rebuilt in batches by a
+        # worker thread, once no new changes have arrived for the debounce delay
+        self.debounce_delay = 0.2  # seconds
+        self.pending_paths = set()
+        self.last_change = 0
+        self.changes = threading.Condition()
+        self.stopping = False
         
+        # Aggregate stages made stale by changes, rebuilt once changes settle
+        self.aggregate_delay = 1.0  # seconds
+        self.stale_stages = set()
+        self.term_signatures = {}  # guide path -> signature of what the term stages read from it
+        self.worker = threading.Thread(target=self.rebuild_worker, daemon=True)
+    
+    def start(self):
+        """Start the background rebuild worker."""
+        self.worker.start()
+    
+    def stop(self):
+        """Stop the background rebuild worker."""
+        with self.changes:
+            self.stopping = True
+            self.changes.notify()
+        self.worker.join()
+    
     def on_modified(self, event):
-        if event.is_directory:
-            return
-            
+        if not event.is_directory:
+            self.queue_change(event.src_path)
+    
+    def on_created(self, event):
+        if not event.is_directory:
+            self.queue_change(event.src_path)
+    
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.queue_change(event.src_path)
+    
+    def on_moved(self, event):
+        # Editors often save by writing a temporary file and renaming it over
+        # the original, so both sides of a move count as changes
+        if not event.is_directory:
+            self.queue_change(event.src_path)
+            self.queue_change(event.dest_path)
+    
+    def queue_change(self, file_path):
+        """Queue a changed path for the next rebuild batch."""
         # Only rebuild for relevant file changes
-        if self.should_rebuild(event.src_path):
-            current_time = time.time()
-            if current_time - self.last_rebuild > self.rebuild_delay:
-                self.rebuild_site()
-                self.last_rebuild = current_time
+        if not self.should_rebuild(file_path):
+            return
+        with self.changes:
+            self.pending_paths.add(os.path.abspath(str(file_path)))
+            self.last_change = time.monotonic()
+            self.changes.notify()
+    
+    def rebuild_worker(self):
+        """Rebuild queued changes once they have settled, as a single batch."""
+        while True:
+            with self.changes:
+                while not self.pending_paths and not self.stale_stages and not self.stopping:
+                    self.changes.wait()
+                if self.stopping:
+                    return
+                # Trailing-edge debounce: keep waiting while changes arrive. Stale
+                # aggregate stages wait longer, and changes are rebuilt first.
+                while True:
+                    delay = self.debounce_delay if self.pending_paths else self.aggregate_delay
+                    remaining = self.last_change + delay - time.monotonic()
+                    if remaining <= 0 or self.stopping:
+                        break
+                    self.changes.wait(remaining)
+                batch = self.pending_paths
+                self.pending_paths = set()
+            if batch:
+                self.rebuild_site(batch)
+            else:
+                self.rebuild_aggregates()
     
     def should_rebuild(self, file_path):
         """Check if the changed file should trigger a rebuild."""
@@ -40,33 +146,400 @@ class SiteRegenerator(FileSystemEventHandler):
         return (
             file_path.endswith('.md') or 
             file_path.endswith('.py') or
+            file_path.endswith('version.txt') or
             'generate_json' in file_path
         )
     
-    def rebuild_site(self):
-        """Regenerate the site."""
+    def rebuild_site(self, changed_paths=None):
+        """
+        Regenerate the site, only re-processing the changed files where possible.
+        
+        Args:
+            changed_paths: Absolute paths of the changed files, or None for a full build
+        """
         print(f"\n🔄 Rebuilding site... ({time.strftime('%H:%M:%S')})")
+        start_time = time.perf_counter()
+        self.written_paths = set()
         try:
-            result = subprocess.run([
-                'python', '.github/scripts/generate_json.py', 
-                self.readme_path, self.output_dir
-            ], capture_output=True, text=True, cwd=os.getcwd())
-            
-            if result.returncode == 0:
-                print("✅ Site rebuilt successfully!")
-                # Extract the file count from output
-                lines = result.stdout.strip().split('\n')
-                for line in lines:
-                    if 'Successfully generated' in line:
-                        print(f"   {line}")
-                        break
+            changed_paths = set(changed_paths) if changed_paths is not None else None
+            guide_files = sorted(
+                path for path in changed_paths or ()
+                if os.path.dirname(path) == self.guides_dir and path.endswith('.md')
+            )
+            changed_modules = sorted(
+                os.path.basename(path) for path in changed_paths or ()
+                if os.path.dirname(path) == self.scripts_dir and path.endswith('.py')
+            )
+            if os.path.basename(__file__) in changed_modules:
+                changed_modules.remove(os.path.basename(__file__))
+                print(f"   Restart the server to use the changes to {os.path.basename(__file__)}")
+            reload_generator = bool(changed_modules)
+            if reload_generator:
+                print(f"   Reloading the generator, {', '.join(changed_modules)} changed")
+                self.reload_generator()
+            # The outputs written here aren't recorded in the build manifest, so
+            # it is removed, and the next incremental build of the site is a full build
+            if self.generator.remove_output(os.path.join(self.output_dir, self.generator.MANIFEST_FILENAME)):
+                print(f"   Removed {self.generator.MANIFEST_FILENAME}, the next site build will be a full build")
+            # The sources have changed since the last rebuild, so their metadata is read afresh
+            self.context = self.generator.BuildContext(self.readme_path)
+            if (reload_generator or changed_paths is None
+                    or any(path.endswith('version.txt') for path in changed_paths)):
+                self.full_build()
+                stale_stages = set(AGGREGATE_STAGES)
+            elif self.readme_path in changed_paths or guide_files:
+                # The context packs and change feed hold the text of each section
+                stale_stages = set(AGGREGATE_STAGES) - TERM_STAGES
+                if self.readme_path in changed_paths:
+                    self.build_main_guide()
+                    stale_stages = set(AGGREGATE_STAGES)
+                if guide_files and self.build_guides(guide_files):
+                    stale_stages = set(AGGREGATE_STAGES)
             else:
-                print(f"❌ Build failed: {result.stderr}")
+                print("   Nothing to rebuild")
+                return
+            # Keep the compressed siblings and ETags served by the dev server current
+            self.generator.precompress_outputs(self.output_dir, self.written_paths)
+            elapsed = (time.perf_counter() - start_time) * 1000
+            scope = f"{len(changed_paths)} file(s)" if changed_paths is not None else "full build"
+            print(f"✅ Site rebuilt successfully! ({scope}, {elapsed:.0f}ms)")
+            if self.on_rebuilt:
+                self.on_rebuilt()
+        except Exception as e:
+            print(f"❌ Build error: {e}")
+            return
+        
+        with self.changes:
+            self.stale_stages |= stale_stages
+            self.changes.notify()
+        # The first build has every output ready before the server starts
+        if changed_paths is None:
+            self.rebuild_aggregates()
+    
+    def rebuild_aggregates(self):
+        """Rebuild the stale stages which cover every guide, in order."""
+        with self.changes:
+            stages = [stage for stage in AGGREGATE_STAGES if stage in self.stale_stages]
+            self.stale_stages = set()
+        if not stages:
+            return
+        start_time = time.perf_counter()
+        self.written_paths = set()
+        try:
+            corpus = self.corpus()
+            if "search_index" in stages:
+                self.generator.create_search_index(self.output_dir, corpus)
+                self.record_written(self.generator.SEARCH_DIR)
+            if "reference_graph" in stages:
+                self.generator.create_reference_graph(self.output_dir, corpus)
+                self.record_written(self.generator.GRAPH_PATH)
+            if "related_guides" in stages:
+                for guide_path in self.generator.create_related_guides(self.output_dir, corpus):
+                    self.record_written(guide_path)
+                self.record_written(self.generator.RELATED_PATH)
+            if "context_packs" in stages:
+                self.generator.create_context_packs(self.output_dir, corpus)
+                self.record_written(self.generator.PACKS_DIR)
+            if "change_feed" in stages:
+                self.generator.create_change_feed(self.output_dir, corpus, self.context)
+                self.record_written(self.generator.CHANGES_PATH)
+                self.record_written(self.generator.CHANGES_DIR)
+            self.generator.precompress_outputs(self.output_dir, self.written_paths)
+            elapsed = (time.perf_counter() - start_time) * 1000
+            print(f"✅ Updated the {', '.join(stage.replace('_', ' ') for stage in stages)} ({elapsed:.0f}ms)")
+            if self.on_rebuilt:
+                self.on_rebuilt()
         except Exception as e:
             print(f"❌ Build error: {e}")
+    
+    def reload_generator(self):
+        """
+        Re-import the generator and every module alongside it.
+        
+        The generator's stages are spread over several modules, and reloading
+        generate_json alone would keep the old versions of the modules it
+        imports, so they are all removed from the module cache and imported
+        afresh, in the order the generator imports them. This server's own
+        module is kept, as it is running.
+        """
+        for name, module in list(sys.modules.items()):
+            path = getattr(module, '__file__', None)
+            if (path and os.path.dirname(os.path.abspath(path)) == self.scripts_dir
+                    and os.path.abspath(path) != os.path.abspath(__file__)):
+                del sys.modules[name]
+        self.generator = importlib.import_module('generate_json')
+    
+    def full_build(self):
+        """Rebuild every output, discarding the guides held in memory."""
+        self.guides = {}
+        self.term_signatures = {}
+        self.written_paths = None  # everything is rewritten
+        os.makedirs(self.api_dir, exist_ok=True)
+        self.build_main_guide()
+        self.build_guides(self.generator.find_guide_files(self.guides_dir))
+        # Guides deleted while the server wasn't running have no change event,
+        # so their outputs are found by comparing the outputs with the corpus
+        for guide_path in self.generator.prune_guide_outputs(self.output_dir, self.corpus()):
+            print(f"✓ Removed {guide_path}")
+    
+    def build_main_guide(self):
+        """Regenerate api/guide.json from the README."""
+        guide_json_path = os.path.join(self.api_dir, 'guide.json')
+        self.generator.create_main_guide_json(self.readme_path, guide_json_path, self.context)
+        self.record_written('api/guide.json')
+        self.record_written(self.generator.MAIN_GUIDE_SECTIONS_DIR)
+    
+    def build_guides(self, guide_files):
+        """
+        Re-process the given guides, then update the index if the guides listed have changed.
+        
+        Returns:
+            True if the guides listed, or the titles, terms or links of any of
+            the guides, have changed
+        """
+        previous_guides = self.corpus().guides
+        terms_changed = False
+        previous_related = self.generator.load_related_guides(self.output_dir)
+        for guide_file in guide_files:
+            if not os.path.exists(guide_file):
+                self.remove_guide(guide_file)
+                continue
+            related = previous_related.get(self.generator.guide_output_path(guide_file))
+            guide = self.generator.build_guide(guide_file, self.output_dir, self.context.version,
+                                               self.context.last_updated(guide_file), related=related)
+            if guide:
+                print(f"✓ Created {guide.path}")
+                previous_guide = self.guides.get(guide_file)
+                if previous_guide and previous_guide.path != guide.path:
+                    self.remove_output(previous_guide)
+                self.guides[guide_file] = guide
+                self.record_written(guide.path)
+                self.record_written(guide.sections_dir)
+                signature = self.generator.guide_term_signature(self.output_dir, guide.path)
+                terms_changed = terms_changed or self.term_signatures.get(guide.path) != signature
+                self.term_signatures[guide.path] = signature
+        corpus = self.corpus()
+        listing_changed = corpus.guides != previous_guides
+        if listing_changed or not previous_guides or self.context.updated != self.site_updated:
+            self.generator.write_site_index(self.output_dir, corpus, self.context)
+            self.site_updated = self.context.updated
+            for path in ('index.html', 'api.json', 'version-badge.json'):
+                self.record_written(path)
+        return terms_changed or listing_changed
+    
+    def remove_guide(self, guide_file):
+        """Forget a guide that has been deleted and remove its output."""
+        guide = self.guides.pop(guide_file, None)
+        if guide:
+            self.term_signatures.pop(guide.path, None)
+            self.remove_output(guide)
+    
+    def remove_output(self, guide):
+        """Remove the generated JSON and sections for a guide."""
+        if self.generator.remove_guide_outputs(self.output_dir, guide.path):
+            print(f"✓ Removed {guide.path}")
+        self.record_written(guide.path)
+        self.record_written(guide.sections_dir)
+    
+    def record_written(self, relative_path):
+        """Record an output that was written or removed by the current rebuild."""
+        if self.written_paths is not None:
+            self.written_paths.add(relative_path)
+    
+    def corpus(self):
+        """The corpus of guides, in the same order as a full build."""
+        return self.generator.create_corpus(self.guides[guide_file] for guide_file in sorted(self.guides))
+
+class ReloadChannel:
+    """
+    Broadcasts the build generation to live reload clients.
+    
+    The generation is incremented after every rebuild, and each connected
+    client's request thread waits on the channel for it to change.
+    """
+    
+    def __init__(self):
+        self.generation = 0
+        self.changed = threading.Condition()
+    
+    def publish(self):
+        """Announce that a new build is available."""
+        with self.changed:
+            self.generation += 1
+            self.changed.notify_all()
+    
+    def wait_for_change(self, generation, timeout):
+        """Wait until the generation differs from the one given, returning the current generation."""
+        with self.changed:
+            self.changed.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+# Injected before the closing body tag of HTML pages. The server sends the
+# current generation on connect, and a new one after each rebuild.
+LIVE_RELOAD_SCRIPT = b"""<script>
+(function () {
+    var generation = null;
+    var source = new EventSource('/live-reload');
+    source.addEventListener('reload', function (event) {
+        if (generation !== null && event.data !== generation) {
+            window.location.reload();
+        }
+        generation = event.data;
+    });
+})();
+</script>
+"""
+
+# The path which serves the request latency statistics.
+STATS_PATH = '/_dev/stats'
+
+# A single byte range, such as 'bytes=0-499', 'bytes=500-' or 'bytes=-500'.
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+def inject_live_reload(body):
+    """Insert the live reload script before the closing body tag of an HTML page."""
+    index = body.rfind(b'</body>')
+    if index == -1:
+        index = len(body)
+    return body[:index] + LIVE_RELOAD_SCRIPT + body[index:]
+
+class CachedAsset:
+    """A generated file held in memory, with its ETag and any precompressed representations."""
+    
+    def __init__(self, body, etag, content_type, encoded):
+        self.body = body
+        self.etag = etag
+        self.content_type = content_type
+        self.encoded = encoded  # content encoding -> body
+
+class AssetCache:
+    """
+    Holds the generated site in memory, so that requests never read the disk.
+    
+    The cache is refreshed by the rebuild step with the outputs it wrote, rather
+    than checked on each request. Each refresh builds a new map of assets and
+    swaps it in, so request threads always see a complete set without locking.
+    Files larger than the maximum size are left on disk.
+    """
+    
+    # Supported content encodings, in order of preference, and the extension
+    # of the precompressed sibling for each
+    encodings = (('br', '.br'), ('gzip', '.gz'))
+    
+    def __init__(self, directory, max_file_size=8 * 1024 * 1024):
+        self.directory = os.path.abspath(directory)
+        self.max_file_size = max_file_size
+        self.assets = {}  # path relative to the directory -> CachedAsset
+    
+    def get(self, relative_path):
+        return self.assets.get(relative_path)
+    
+    def refresh(self, relative_paths=None):
+        """
+        Reload the given outputs (or directories of outputs), or every output if None.
+        
+        Assets for outputs which no longer exist are dropped.
+        """
+        if relative_paths is None:
+            assets = {}
+            relative_paths = ['.']
+        else:
+            assets = dict(self.assets)
+            for relative_path in relative_paths:
+                prefix = relative_path.rstrip('/') + '/'
+                for key in [key for key in assets if key == relative_path or key.startswith(prefix)]:
+                    del assets[key]
+        
+        for relative_path in relative_paths:
+            path = os.path.join(self.directory, relative_path)
+            if os.path.isdir(path):
+                for root, _, files in os.walk(path):
+                    for file in files:
+                        self.load(assets, os.path.relpath(os.path.join(root, file), self.directory))
+            elif os.path.isfile(path):
+                self.load(assets, os.path.relpath(path, self.directory))
+        self.assets = assets
+    
+    def load(self, assets, relative_path):
+        """Read an output and its precompressed siblings into the map of assets."""
+        relative_path = relative_path.replace(os.sep, '/')
+        if (relative_path.endswith(generate_json.COMPRESSED_EXTENSIONS)
+                or os.path.basename(relative_path).startswith('.')):
+            return
+        path = os.path.join(self.directory, relative_path)
+        try:
+            if os.path.getsize(path) > self.max_file_size:
+                return
+            with open(path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            return
+        
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        encoded = {}
+        if relative_path.endswith('.html'):
+            # The compressed siblings don't have the live reload script
+            body = inject_live_reload(body)
+            content_type = 'text/html; charset=utf-8'
+        else:
+            for encoding, extension in self.encodings:
+                try:
+                    with open(path + extension, 'rb') as f:
+                        encoded[encoding] = f.read()
+                except OSError:
+                    pass
+        assets[relative_path] = CachedAsset(body, generate_json.content_etag(body), content_type, encoded)
+
+class RequestStats:
+    """Records request latencies, keeping the most recent samples for percentiles."""
+    
+    def __init__(self, sample_size=10000):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=sample_size)
+        self.started = time.perf_counter()
+    
+    def record(self, seconds):
+        with self.lock:
+            self.count += 1
+            self.total += seconds
+            self.samples.append(seconds)
+    
+    def summary(self):
+        """Request count, rate and latency percentiles in milliseconds."""
+        with self.lock:
+            samples = sorted(self.samples)
+            count, total = self.count, self.total
+        
+        def percentile(fraction):
+            return round(samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000, 3) if samples else 0
+        
+        elapsed = time.perf_counter() - self.started
+        return {
+            "requests": count,
+            "requestsPerSecond": round(count / elapsed, 1) if elapsed else 0,
+            "meanMs": round(total / count * 1000, 3) if count else 0,
+            "p50Ms": percentile(0.5),
+            "p95Ms": percentile(0.95),
+            "p99Ms": percentile(0.99),
+            "maxMs": round(samples[-1] * 1000, 3) if samples else 0
+        }
 
 class LiveReloadHTTPRequestHandler(SimpleHTTPRequestHandler):
-    """HTTP request handler with live reload injection."""
+    """HTTP request handler with live reload injection, serving from the asset cache."""
+    
+    # Keep connections open between requests
+    protocol_version = 'HTTP/1.1'
+    
+    reload_channel = ReloadChannel()
+    request_stats = RequestStats()
+    keep_alive_interval = 15  # seconds
+    
+    def __init__(self, *args, asset_cache=None, **kwargs):
+        # Set before the base class handles the request
+        self.asset_cache = asset_cache
+        super().__init__(*args, **kwargs)
     
     def end_headers(self):
         # Inject live reload script for HTML files
@@ -79,20 +552,179 @@ class LiveReloadHTTPRequestHandler(SimpleHTTPRequestHandler):
     def do_GET(self):
         # Handle live reload endpoint
         if self.path == '/live-reload':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/plain')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(b'ok')
+            self.stream_reload_events()
+            return
+        if self.path == STATS_PATH:
+            self.send_json(self.request_stats.summary())
             return
         
-        # Inject live reload script into HTML files
-        super().do_GET()
+        start = time.perf_counter()
+        if not self.send_cached(include_body=True):
+            super().do_GET()
+        self.request_stats.record(time.perf_counter() - start)
+    
+    def do_HEAD(self):
+        start = time.perf_counter()
+        if not self.send_cached(include_body=False):
+            super().do_HEAD()
+        self.request_stats.record(time.perf_counter() - start)
+    
+    def cache_key(self):
+        """The path of the requested output, relative to the site directory."""
+        path = posixpath.normpath(unquote(urlsplit(self.path).path)).lstrip('/')
+        if path in ('', '.'):
+            return 'index.html'
+        asset = self.asset_cache.get(path) if self.asset_cache else None
+        return path if asset or not self.path.endswith('/') else f'{path}/index.html'
+    
+    def send_cached(self, include_body):
+        """
+        Serve a request from the asset cache.
+        
+        Returns:
+            False if the output is not cached, so should be served from disk
+        """
+        if self.asset_cache is None:
+            return False
+        asset = self.asset_cache.get(self.cache_key())
+        if asset is None:
+            return False
+        
+        # Each encoding is a different representation, so needs its own ETag
+        encoding = self.choose_encoding(asset)
+        body = asset.encoded[encoding] if encoding else asset.body
+        etag = f'{asset.etag[:-1]}-{encoding}"' if encoding else asset.etag
+        
+        if self.etag_matches(etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return True
+        
+        status, content_range, body = self.select_range(body, etag)
+        self.send_response(status)
+        if status != 416:
+            self.send_header('Content-Type', asset.content_type)
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+        if content_range:
+            self.send_header('Content-Range', content_range)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+        return True
+    
+    def choose_encoding(self, asset):
+        """Pick the preferred encoding accepted by the client which the asset has a representation for."""
+        accepted = set()
+        for item in self.headers.get('Accept-Encoding', '').split(','):
+            name, _, params = item.strip().partition(';')
+            if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+                continue
+            accepted.add(name.strip().lower())
+        for encoding, _ in AssetCache.encodings:
+            if (encoding in accepted or '*' in accepted) and encoding in asset.encoded:
+                return encoding
+        return None
+    
+    def etag_matches(self, etag):
+        """Check whether the If-None-Match header matches an ETag."""
+        if_none_match = self.headers.get('If-None-Match')
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+        return any(candidate.removeprefix('W/') == etag for candidate in candidates)
+    
+    def select_range(self, body, etag):
+        """
+        Select the part of a body requested by the Range header.
+        
+        Only single byte ranges are supported; for anything else the whole body
+        is sent, which is always allowed. If-Range is honoured with ETags.
+        
+        Returns:
+            A tuple of the status code, the Content-Range header (or None) and the body to send
+        """
+        range_header = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if not range_header or (if_range and if_range.strip() != etag):
+            return 200, None, body
+        match = RANGE_PATTERN.match(range_header.strip())
+        if not match or not (match.group(1) or match.group(2)):
+            return 200, None, body
+        
+        size = len(body)
+        if match.group(1):
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+        else:
+            start = max(0, size - int(match.group(2)))
+            end = size - 1
+        if start >= size or start > end:
+            return 416, f"bytes */{size}", b""
+        return 206, f"bytes {start}-{end}/{size}", body[start:end + 1]
+    
+    def send_json(self, data):
+        body = json.dumps(data, indent=2).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def stream_reload_events(self):
+        """Stream the build generation to the client as server-sent events."""
+        # The stream has no length, so the connection can't be reused after it
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        generation = self.reload_channel.generation
+        try:
+            self.wfile.write(f"event: reload\ndata: {generation}\n\n".encode())
+            self.wfile.flush()
+            while True:
+                current = self.reload_channel.wait_for_change(generation, self.keep_alive_interval)
+                if current == generation:
+                    # Comments keep the connection open through proxies
+                    self.wfile.write(b": keep-alive\n\n")
+                else:
+                    generation = current
+                    self.wfile.write(f"event: reload\ndata: {generation}\n\n".encode())
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The browser has closed the page
+            pass
+    
+    def log_message(self, format, *args):
+        # The event stream is long-lived, don't log every reconnect
+        if not getattr(self, 'path', '').startswith('/live-reload'):
+            super().log_message(format, *args)
+
+class DevHTTPServer(ThreadingHTTPServer):
+    """A threaded HTTP server with a listen backlog large enough for load tests."""
+    
+    daemon_threads = True
+    request_queue_size = 128
 
-def start_http_server(directory, port):
+def start_http_server(directory, port, asset_cache=None):
     """Start the HTTP server in a separate thread."""
-    os.chdir(directory)
-    server = HTTPServer(('localhost', port), LiveReloadHTTPRequestHandler)
+    # Serve from the directory rather than changing the working directory, as
+    # the site is rebuilt in this process. The server is threaded so that
+    # long-lived live reload streams and slow clients don't block other requests.
+    handler = functools.partial(LiveReloadHTTPRequestHandler, directory=directory, asset_cache=asset_cache)
+    server = DevHTTPServer(('localhost', port), handler)
     print(f"🌐 HTTP server running at http://localhost:{port}")
     server.serve_forever()
 
@@ -114,7 +746,15 @@ def main():
     
     # Initial build
     print("📦 Initial site build...")
-    regenerator = SiteRegenerator(readme_path, output_dir)
+    asset_cache = AssetCache(output_dir)
+    
+    def on_rebuilt():
+        # Serve the new outputs before telling the browser to reload
+        written_paths = regenerator.written_paths
+        asset_cache.refresh(None if written_paths is None else written_paths | {generate_json.ETAGS_FILENAME})
+        LiveReloadHTTPRequestHandler.reload_channel.publish()
+    
+    regenerator = SiteRegenerator(readme_path, output_dir, on_rebuilt=on_rebuilt)
     regenerator.rebuild_site()
     
     # Start file watcher
@@ -137,11 +777,12 @@ def main():
         print(f"👀 Watching: {scripts_dir}")
     
     observer.start()
+    regenerator.start()
     
     # Start HTTP server in background thread
     server_thread = threading.Thread(
         target=start_http_server,
-        args=(output_dir, port),
+        args=(output_dir, port, asset_cache),
         daemon=True
     )
     server_thread.start()
@@ -150,6 +791,7 @@ def main():
     print(f"   📂 Site directory: {output_dir}")
     print(f"   🌐 Local URL: http://localhost:{port}")
     print(f"   🔄 Auto-rebuild: Enabled")
+    print(f"   📈 Request stats: http://localhost:{port}{STATS_PATH}")
     print(f"\n💡 Edit files in guides/ or README.md to see changes")
     print("   Press Ctrl+C to stop\n")
     
@@ -158,8 +800,10 @@ def main():
             time.sleep(1)
     except KeyboardInterrupt:
         print("\n👋 Stopping development server...")
+        print(f"   Requests: {json.dumps(LiveReloadHTTPRequestHandler.request_stats.summary())}")
         observer.stop()
         observer.join()
+        regenerator.stop()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -3,267 +3,105 @@
 Script to convert markdown guide files to JSON for API consumption.
 Generates a main guide.json file and individual guide endpoints.
 Creates a simple API index and shields.io version badge.
+
+With --incremental, a manifest of source hashes is kept in the output directory
+so that only the outputs whose inputs have changed are regenerated. With
+--trace, each stage is timed and written as a Chrome trace event file, and
+--profile writes cProfile and tracemalloc reports.
+
+Everything in the output directory is published with the site, except the
+build manifest (.build-manifest.json), which is removed before deploying.
+Besides the API itself, the published files are:
+
+    api/bundle.bin        the API in a single file, for consumers (--bundle)
+    etags.json            the ETag of each output, so that consumers can
+                          check for changes without fetching every file
+    *.gz, *.br            precompressed copies of the outputs, for servers
+                          which serve them directly (--precompress)
 """
 
+import argparse
+import contextlib
+import glob
+import hashlib
+import html
 import json
 import os
+import posixpath
 import re
+import shutil
+import string
+import subprocess
 import sys
-from datetime import datetime
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import cached_property, lru_cache
+from itertools import repeat
 
-def read_version(project_dir):
-    """Read version from version.txt file."""
-    version_file = os.path.join(project_dir, "version.txt")
-    try:
-        with open(version_file, 'r', encoding='utf-8') as f:
-            return f.read().strip()
-    except Exception as e:
-        print(f"Warning: Could not read version from {version_file}: {e}")
-        return "0.1.0"  # fallback version
+from build_trace import BuildTrace, activate, is_active, merge_events, profile_call, span, traced_call
+from bundle import write_bundle
+from change_feed import CHANGES_DIR, CHANGES_PATH, build_change_feed, content_hash
+from corpus import Corpus, Guide, load_sections, section_path_for, sections_dir_for
+from context_packs import PACK_BUDGETS, PACKS_DIR, budget_label, build_context_packs, guide_pack_path, type_pack_path
+from output_writer import count_outputs, format_counts, output_counts, read_chunks, remove_output, write_output
+from search_index import SEARCH_DIR, build_search_index, tokenize_terms
+from similarity import RELATED_PATH, build_related, load_related_guides
 
-def extract_references(content, base_url="api/guides"):
-    """
-    Extract references to specialized guides and add API URLs.
-    
-    Args:
-        content: The markdown content to extract references from
-        base_url: Base URL for API endpoints (no leading slash for local compatibility)
-    
-    Returns:
-        List of reference objects with name, path, type and apiUrl
-    """
-    references = []
-    
-    # Pattern to match markdown links like [Python Guide](./guides/python.md)
-    link_pattern = r'\[(.*?)\]\((.*?)\)'
-    guide_links = re.finditer(link_pattern, content)
-    
-    for match in guide_links:
-        name = match.group(1)
-        path = match.group(2)
-        
-        # Only include links to guide documents
-        if 'guides' in path and path.endswith('.md'):
-            guide_type = infer_guide_type(path)
-            filename = os.path.basename(path).replace('.md', '.json')
-            api_url = f"{base_url}/{guide_type}s/{filename}"
-            
-            references.append({
-                "name": name,
-                "path": path,
-                "type": guide_type,
-                "apiUrl": api_url
-            })
-    
-    return references
+try:
+    import brotli
+except ImportError:
+    # Brotli is optional, without it only gzip siblings are precompressed
+    brotli = None
 
-def infer_guide_type(path):
-    """Infer the type of guide from its path."""
-    if 'python' in path.lower():
-        return "language"
-    elif 'shell' in path.lower():
-        return "language"
-    elif 'make' in path.lower():
-        return "pattern"
-    elif 'cicd' in path.lower() or 'ci-cd' in path.lower():
-        return "pattern"
-    elif 'cli' in path.lower():
-        return "pattern"
-    elif 'documentation' in path.lower():
-        return "pattern"
-    elif 'open-source' in path.lower():
-        return "pattern"
-    elif 'postgresql' in path.lower() or 'sql' in path.lower():
-        return "platform"
-    else:
-        return "other"
+# The build manifest lives in the output directory and records the hashes of
+# the inputs used for the previous build.
+MANIFEST_FILENAME = ".build-manifest.json"
 
-def process_guide_markdown(file_path):
-    """Read and process a guide markdown file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Skip HTML comments
-        content = re.sub(r'<!--.*?-->', '', content, flags=re.DOTALL)
-        
-        # Extract title from first heading
-        title_match = re.search(r'^# (.*?)$', content, re.MULTILINE)
-        title = title_match.group(1) if title_match else os.path.basename(file_path).replace('.md', '')
-        
-        return {
-            "title": title,
-            "content": content
-        }
-    except Exception as e:
-        print(f"Error processing guide {file_path}: {e}")
-        return None
+# Maps each output's path (relative to the output directory) to a strong ETag
+# derived from its content hash, written when precompressing.
+ETAGS_FILENAME = "etags.json"
 
-def create_guide_json(readme_path, output_dir):
-    """
-    Create guide JSON files from markdown files.
-    
-    Args:
-        readme_path: Path to the main README.md file
-        output_dir: Directory to output the generated files
-    """
-    # Get the project root directory
-    project_dir = os.path.dirname(os.path.abspath(readme_path))
-    guides_dir = os.path.join(project_dir, "guides")
-    print(f"Looking for guides in: {guides_dir}")
-    
-    # Ensure output directories exist
-    api_dir = os.path.join(output_dir, "api")
-    api_guides_dir = os.path.join(api_dir, "guides")
-    os.makedirs(api_dir, exist_ok=True)
-    os.makedirs(api_guides_dir, exist_ok=True)
-    
-    # Create subdirectories for different guide types
-    guide_types = ["languages", "patterns", "platforms", "other"]
-    for guide_type in guide_types:
-        os.makedirs(os.path.join(api_guides_dir, guide_type), exist_ok=True)
-    
-    # Process the main README.md
-    try:
-        with open(readme_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except Exception as e:
-        print(f"Error reading README: {e}")
-        sys.exit(1)
-    
-    # Skip the HTML header and introduction sections
-    content = re.sub(r'<!--.*?-->', '', content, flags=re.DOTALL)
-    
-    # Find where the actual guide begins
-    guide_start_idx = content.find('## The Golden Rules')
-    if guide_start_idx == -1:
-        print("Error: Could not find the beginning of the guide.")
-        sys.exit(1)
-    
-    # Get the main content from the guide start point onwards
-    guide_content = content[guide_start_idx:]
-    
-    # Extract references to guides
-    references = extract_references(guide_content)
-    
-    # Collect specific guide files
-    guide_files = []
-    generated_guides = []
-    
-    # Find all markdown files in the guides directory
-    if os.path.exists(guides_dir):
-        guide_files = [os.path.join(guides_dir, f) for f in os.listdir(guides_dir) 
-                      if f.endswith('.md') and os.path.isfile(os.path.join(guides_dir, f))]
-    
-    # Process each guide file
-    for guide_file in guide_files:
-        filename = os.path.basename(guide_file)
-        guide_data = process_guide_markdown(guide_file)
-        
-        if guide_data:
-            # Determine the guide type and output path
-            guide_type = infer_guide_type(guide_file)
-            output_filename = filename.replace('.md', '.json')
-            output_subdir = f"{guide_type}s"  # pluralize
-            output_path = os.path.join(api_guides_dir, output_subdir, output_filename)
-            
-            # Create guide JSON structure
-            specific_guide = {
-                "metadata": {
-                    "name": guide_data["title"],
-                    "type": guide_type,
-                    "version": read_version(project_dir),
-                    "lastUpdated": datetime.now().strftime("%Y-%m-%d"),
-                    "source": f"https://github.com/dwmkerr/ai-developer-guide/guides/{filename}"
-                },
-                "content": guide_data["content"]
-            }
-            
-            # Write the guide JSON file
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(specific_guide, f, indent=2)
-                relative_path = os.path.relpath(output_path, output_dir)
-                print(f"✓ Created {relative_path}")
-                generated_guides.append({
-                    "name": guide_data["title"],
-                    "type": guide_type,
-                    "path": f"api/guides/{output_subdir}/{output_filename}"  # No leading slash for local compatibility
-                })
-    
-    # Create the main guide.json structure
-    guide_data = {
-        "metadata": {
-            "name": "AI Developer Guide",
-            "version": read_version(project_dir),
-            "lastUpdated": datetime.now().strftime("%Y-%m-%d"),
-            "source": "https://github.com/dwmkerr/ai-developer-guide"
-        },
-        "content": guide_content,
-        "references": references
-    }
-    
-    # Write the main guide.json
-    guide_json_path = os.path.join(api_dir, "guide.json")
-    with open(guide_json_path, 'w', encoding='utf-8') as f:
-        json.dump(guide_data, f, indent=2)
-        print(f"✓ Created api/guide.json")
-    
-    # Create index.html with links to all guides
-    create_index_html(output_dir, generated_guides, project_dir)
-    
-    # Generate API index
-    generate_api_index(project_dir, output_dir, generated_guides)
-    
-    # Create version badge for shields.io
-    create_version_badge(output_dir, project_dir)
-    
-    print("Successfully generated JSON API files.")
-    
-    # List all created files for verification
-    print(f"\nGenerated files in {output_dir}:")
-    for root, dirs, files in os.walk(output_dir):
-        for file in files:
-            print(f"  - {os.path.relpath(os.path.join(root, file), output_dir)}")
+# The extensions of outputs which are precompressed, and the encodings used.
+PRECOMPRESS_EXTENSIONS = (".json", ".html")
+COMPRESSED_EXTENSIONS = (".gz", ".br")
 
-def create_index_html(output_dir, generated_guides, project_dir):
-    """Create a simple index.html file for the AI Developer Guide API."""
-    
-    # Read version for display
-    version = read_version(project_dir)
-    
-    # Group guides by type for the index page
-    guides_by_type = {}
-    for guide in generated_guides:
-        guide_type = guide["type"]
-        if guide_type not in guides_by_type:
-            guides_by_type[guide_type] = []
-        
-        guides_by_type[guide_type].append(guide)
-    
-    # Generate table rows for the sidebar guides
-    sidebar_table_rows = ""
-    
-    # Define the order of guide types
-    guide_type_order = ["language", "pattern", "platform", "other"]
-    
-    # Add all specialized guides to the sidebar table in the specified order
-    for guide_type in guide_type_order:
-        if guide_type in guides_by_type:
-            guides = guides_by_type[guide_type]
-            # Sort guides by name for consistent ordering
-            guides.sort(key=lambda g: g["name"])
-            for guide in guides:
-                sidebar_table_rows += f"""
-    <tr>
-        <td>{guide_type.capitalize()}</td>
-        <td><a href="{guide["path"]}">{guide["name"]}</a></td>
-        <td><a href="{guide["path"]}" class="text-decoration-none"><code>{guide["path"]}</code></a></td>
-    </tr>
-    """
-    
-    # Create the HTML content - updated per requirements
-    index_html = f"""<!DOCTYPE html>
+# The single-file bundle of the API, written with --bundle (see bundle.py).
+BUNDLE_PATH = "api/bundle.bin"
+
+# Guides are split into sections at headings up to this level.
+SECTION_MAX_LEVEL = 3
+HEADING_PATTERN = re.compile(r'^(#{1,6})[ \t]+(.*?)[ \t#]*$')
+FENCE_PATTERN = re.compile(r'^[ ]{0,3}(```|~~~)')
+
+# Approximates tokenizer output: short runs of word characters, or single
+# punctuation characters. Good enough for budgeting, not an exact count.
+TOKEN_ESTIMATE_PATTERN = re.compile(r'\w{1,4}|[^\w\s]')
+
+# The main guide's section index and endpoints, the same as sections_dir_for("api/guide.json").
+MAIN_GUIDE_SECTIONS_DIR = "api/guide"
+
+# Markdown links, scanned in a single pass. Fenced code blocks and inline code
+# spans are matched (and skipped) so that links shown as code are ignored.
+LINK_SCAN_PATTERN = re.compile(
+    r'^[ ]{0,3}(?P<fence>```|~~~).*?^[ ]{0,3}(?P=fence)'
+    r'|`[^`\n]*`'
+    r'|\[(?P<text>[^\]\n]*)\]\((?P<target>[^)\s]*)(?:[ \t]+"[^"\n]*")?\)',
+    re.MULTILINE | re.DOTALL)
+
+# The directory of the generator's modules, which are hashed into the generator version
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The rules used to classify guides by filename, see load_guide_type_rules.
+GUIDE_TYPES_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                       "guide-types.json")
+
+# The cross-reference graph between the main guide and every guide.
+GRAPH_PATH = "api/graph.json"
+
+# The index page, split where the guide rows are written so that the rows can
+# be streamed to the file. The templates are compiled once, on import.
+INDEX_HTML_HEAD, INDEX_HTML_TAIL = (string.Template(part) for part in """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -280,7 +118,7 @@ def create_index_html(output_dir, generated_guides, project_dir):
             </a>
             <div class="d-flex align-items-center">
                 <span class="navbar-text me-3">
-                    Version {version}
+                    Version $version
                 </span>
                 <a class="btn btn-outline-light btn-sm me-2" href="https://github.com/dwmkerr/ai-developer-guide#readme">
                     <i class="bi bi-file-text"></i> Documentation
@@ -302,14 +140,14 @@ def create_index_html(output_dir, generated_guides, project_dir):
                     <h5><i class="bi bi-rocket-takeoff"></i> Quickstart</h5>
                     <p class="mb-2">Add this JSON structure to your AI assistant (Claude Desktop, Cursor, VS Code, etc.):</p>
                     <div class="bg-dark p-3 rounded">
-                        <pre class="text-light mb-0"><code>{{
-  "mcpServers": {{
-    "ai-developer-guide": {{
+                        <pre class="text-light mb-0"><code>{
+  "mcpServers": {
+    "ai-developer-guide": {
       "command": "npx",
       "args": ["@dwmkerr/ai-developer-guide-mcp"]
-    }}
-  }}
-}}</code></pre>
+    }
+  }
+}</code></pre>
                     </div>
                     <p class="mt-2 mb-2">
                         <a href="https://github.com/dwmkerr/ai-developer-guide/tree/main/mcp" class="alert-link">
@@ -347,8 +185,8 @@ def create_index_html(output_dir, generated_guides, project_dir):
                                 <p class="card-text small">
                                     <strong>Base URL:</strong> Current domain<br>
                                     <strong>Format:</strong> JSON<br>
-                                    <strong>Version:</strong> {version}<br>
-                                    <strong>Updated:</strong> {datetime.now().strftime("%Y-%m-%d")}
+                                    <strong>Version:</strong> $version<br>
+                                    <strong>Updated:</strong> $updated
                                 </p>
                             </div>
                         </div>
@@ -371,90 +209,1431 @@ def create_index_html(output_dir, generated_guides, project_dir):
                                 <td><a href="api/guide.json"><strong>AI Developer Guide</strong></a></td>
                                 <td><a href="api/guide.json" class="text-decoration-none"><code>api/guide.json</code></a></td>
                             </tr>
-                            {sidebar_table_rows}
+                            $rows
                         </tbody>
                     </table>
                 </div>
-            </div>
+$pagination            </div>
         </div>
     </div>
 </body>
-</html>"""
+</html>""".split("$rows"))
 
-    index_html_path = os.path.join(output_dir, "index.html")
-    with open(index_html_path, 'w', encoding='utf-8') as f:
-        f.write(index_html)
-        print(f"✓ Created index.html")
+# Rendered once per guide, so this uses str.format which is much faster than string.Template.
+GUIDE_ROW_TEMPLATE = """
+    <tr>
+        <td>{type}</td>
+        <td><a href="{path}">{name}</a></td>
+        <td><a href="{path}" class="text-decoration-none"><code>{path}</code></a></td>
+    </tr>
+    """.format
 
-def create_version_badge(output_dir, project_dir):
-    """Create a shields.io compatible version badge JSON file."""
-    version = read_version(project_dir)
+PAGINATION_TEMPLATE = string.Template("""                <nav aria-label="Guide pages">
+                    <ul class="pagination justify-content-center">
+                        $previous
+                        <li class="page-item disabled"><span class="page-link">Page $page of $pages</span></li>
+                        $next
+                    </ul>
+                </nav>
+""")
+
+HTML_SPECIAL_PATTERN = re.compile(r'[&<>"\']')
+
+# The pages of the index after the first, written when paginating.
+INDEX_PAGE_PATTERN = re.compile(r'^index-\d+\.html$')
+
+# Guides are read and written in chunks of this many characters, so that the
+# memory used does not grow with the size of a guide.
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# The characters str.splitlines() splits on.
+LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+def dump_json(data, f, minify=False):
+    """Write JSON to a file, either indented or minified with no whitespace."""
+    with span("serialize"):
+        if minify:
+            text = json.dumps(data, separators=(',', ':'))
+        else:
+            text = json.dumps(data, indent=2)
+    with span("write"):
+        f.write(text)
+
+def split_json(data, field, minify=False):
+    """
+    Serialize JSON as dump_json would, split around the value of one string field.
     
-    badge_data = {
-        "schemaVersion": 1,
-        "label": "version",
-        "message": version,
-        "color": "blue"
-    }
+    Returns:
+        A tuple of the text before the field's value (up to and including
+        its opening quote) and the text after it (from its closing quote)
+    """
+    placeholder = "\x00stream\x00"
+    if minify:
+        text = json.dumps(dict(data, **{field: placeholder}), separators=(',', ':'))
+    else:
+        text = json.dumps(dict(data, **{field: placeholder}), indent=2)
+    prefix, suffix = text.split(json.dumps(placeholder), 1)
+    return prefix + '"', '"' + suffix
+
+@contextlib.contextmanager
+def stream_json(f, data, field, minify=False):
+    """
+    Write JSON to a file with the value of one string field streamed in chunks.
     
-    badge_path = os.path.join(output_dir, "version-badge.json")
-    with open(badge_path, 'w', encoding='utf-8') as f:
-        json.dump(badge_data, f, indent=2)
-        print(f"✓ Created version-badge.json")
+    The rest of the data is written as dump_json would. The field is written
+    by calling the function this yields with each chunk of its value, so the
+    whole value never needs to be held in memory.
+    
+    Args:
+        f: The file to write to
+        data: The data to write, which must have the field (its value is ignored)
+        field: The key of the string field to stream
+        minify: Write JSON without indentation or whitespace
+    """
+    prefix, suffix = split_json(data, field, minify)
+    f.write(prefix)
+    
+    def write_chunk(chunk):
+        # Escaping is done per character, so escaped chunks join to the escaped whole
+        with span("serialize"):
+            text = json.dumps(chunk)[1:-1]
+        with span("write"):
+            f.write(text)
+    
+    yield write_chunk
+    f.write(suffix)
 
-def generate_api_index(project_dir, output_dir, generated_guides):
-    """Generate a simple API index file."""
-    output_path = os.path.join(output_dir, "api.json")
+def compute_generator_version():
+    """
+    Hash the source of the generator and its guide type rules, so that changes
+    to either force a full rebuild.
     
+    The generator's stages are spread over the modules alongside this script,
+    so every module in the scripts directory is hashed, in name order.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(SCRIPTS_DIR, "*.py"))):
+        digest.update(f"{os.path.basename(path)}:{file_hash(path)}\n".encode('utf-8'))
+    if os.path.exists(GUIDE_TYPES_CONFIG_PATH):
+        digest.update(file_hash(GUIDE_TYPES_CONFIG_PATH).encode('ascii'))
+    return digest.hexdigest()
+
+def file_hash(file_path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(output_dir):
+    """Load the build manifest from a previous build, or None if there isn't one."""
+    manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
     try:
-        # Read version
-        version = read_version(project_dir)
-        
-        # Create a simple API index
-        api_index = {
-            "name": "AI Developer Guide API",
-            "description": "JSON API providing standards, patterns and principles for effective AI-assisted development",
-            "version": version,
-            "source": "https://github.com/dwmkerr/ai-developer-guide",
-            "lastUpdated": datetime.now().strftime("%Y-%m-%d"),
-            "endpoints": {
-                "main_guide": {
-                    "path": "/api/guide.json",
-                    "description": "Complete AI Developer Guide with core rules and Plan/Implement/Review approach"
-                }
-            }
-        }
-        
-        # Group guides by type
-        guides_by_type = {}
-        for guide in generated_guides:
-            guide_type = guide["type"]
-            if guide_type not in guides_by_type:
-                guides_by_type[guide_type] = {}
-            
-            guide_name = guide["path"].split("/")[-1].replace(".json", "")
-            guides_by_type[guide_type][guide_name] = {
-                "path": f"/{guide['path']}",
-                "description": f"{guide['name']} guide"
-            }
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: Could not read build manifest {manifest_path}: {e}")
+        return None
+
+def save_manifest(output_dir, manifest):
+    """Write the build manifest for the next incremental build."""
+    manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+    with write_output(manifest_path) as f:
+        json.dump(manifest, f, indent=2)
+
+def read_version(project_dir):
+    """Read version from version.txt file."""
+    version_file = os.path.join(project_dir, "version.txt")
+    try:
+        with open(version_file, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    except Exception as e:
+        print(f"Warning: Could not read version from {version_file}: {e}")
+        return "0.1.0"  # fallback version
+
+class BuildContext:
+    """
+    Metadata shared by every stage of a build, each computed at most once.
+    
+    Dates come from the sources rather than the clock, so that building the
+    same sources twice gives identical outputs (and so unchanged outputs keep
+    their ETags). A file was last updated at the time of the last commit that
+    changed it, or at its modification time if it has uncommitted changes or
+    is not in a git checkout. Dates are in UTC.
+    """
+    
+    def __init__(self, readme_path):
+        self.readme_path = os.path.abspath(readme_path)
+        self.project_dir = os.path.dirname(self.readme_path)
+        self.guides_dir = os.path.join(self.project_dir, "guides")
+        self.stats = {}  # absolute path -> os.stat_result
+    
+    @cached_property
+    def version(self):
+        return read_version(self.project_dir)
+    
+    @cached_property
+    def commit_times(self):
+        """The time of the last commit to each file in the project without local changes, by absolute path."""
+        def git(*args):
+            return subprocess.run(["git", "-c", "core.quotePath=false", *args], cwd=self.project_dir,
+                                  capture_output=True, text=True, check=True).stdout
+        try:
+            root = git("rev-parse", "--show-toplevel").strip()
+            shallow = git("rev-parse", "--is-shallow-repository").strip() == "true"
+            log = git("log", "--format=@%ct", "--name-only", "--no-renames", "--", ".")
+            status = git("status", "--porcelain", "-z", "--no-renames", "--untracked-files=all", "--", ".")
+        except (OSError, subprocess.CalledProcessError):
+            return {}
         
-        # Add specialized guides to endpoints
-        for guide_type, guides in guides_by_type.items():
-            api_index["endpoints"][f"{guide_type}_guides"] = guides
+        # In a shallow clone the oldest commit fetched lists every file, so files
+        # last changed before it would all get its date
+        if shallow:
+            print("Warning: the project is a shallow git clone, so the dates of files last changed before its "
+                  "history starts are wrong. Fetch the full history, e.g. with 'fetch-depth: 0' on "
+                  "actions/checkout, for correct lastUpdated dates.")
         
-        # Write the API index
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(api_index, f, indent=2)
-            print("✓ Created api.json")
-            
-    except Exception as e:
-        print(f"Error generating API index: {e}")
+        # The log is newest first, so the first commit listing a file is its last change
+        commit_times = {}
+        commit_time = None
+        for line in log.splitlines():
+            if line.startswith("@"):
+                commit_time = int(line[1:])
+            elif line:
+                commit_times.setdefault(os.path.join(root, line), commit_time)
+        for entry in status.split("\0"):
+            if entry:
+                commit_times.pop(os.path.join(root, entry[3:]), None)
+        return commit_times
+    
+    def stat(self, path):
+        path = os.path.abspath(path)
+        if path not in self.stats:
+            self.stats[path] = os.stat(path)
+        return self.stats[path]
+    
+    def last_updated(self, path):
+        """The date a source file was last updated, as YYYY-MM-DD."""
+        timestamp = self.commit_times.get(os.path.abspath(path))
+        if timestamp is None:
+            timestamp = self.stat(path).st_mtime
+        return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d")
+    
+    @cached_property
+    def updated(self):
+        """The date the site was last updated, which is the latest date of any of its sources."""
+        sources = [self.readme_path] + find_guide_files(self.guides_dir)
+        version_path = os.path.join(self.project_dir, "version.txt")
+        if os.path.exists(version_path):
+            sources.append(version_path)
+        return max(self.last_updated(path) for path in sources)
 
-if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python generate_json.py README_PATH OUTPUT_DIR")
-        sys.exit(1)
+def scan_links(content):
+    """
+    Scan markdown content for links, ignoring any in code blocks or code spans.
+    
+    Returns:
+        Iterator of (text, target) tuples, in the order they appear
+    """
+    for match in LINK_SCAN_PATTERN.finditer(content):
+        if match.group("target") is not None:
+            yield match.group("text"), match.group("target")
+
+def extract_references(content, base_url="api/guides"):
+    """
+    Extract references to specialized guides and add API URLs.
+    
+    Args:
+        content: The markdown content to extract references from
+        base_url: Base URL for API endpoints (no leading slash for local compatibility)
+    
+    Returns:
+        List of reference objects with name, path, type and apiUrl
+    """
+    references = []
+    
+    # Links to guides look like [Python Guide](./guides/python.md)
+    for name, path in scan_links(content):
+        # Only include links to guide documents
+        if 'guides' in path and path.endswith('.md'):
+            guide_type = infer_guide_type(path)
+            filename = os.path.basename(path).replace('.md', '.json')
+            api_url = f"{base_url}/{guide_type}s/{filename}"
+            
+            references.append({
+                "name": name,
+                "path": path,
+                "type": guide_type,
+                "apiUrl": api_url
+            })
+    
+    return references
+
+def load_guide_type_rules(config_path):
+    """
+    Load the rules used to classify guides.
+    
+    The config has an ordered list of rules, each with a type and the keywords
+    which identify it, and a default type. A guide has the type of the first
+    rule with a keyword in its filename.
+    
+    Returns:
+        A tuple of the rules, as (type, keywords) tuples, and the default type
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    rules = tuple((rule["type"], tuple(keyword.lower() for keyword in rule["keywords"]))
+                  for rule in config["rules"])
+    return rules, config.get("default", "other")
+
+GUIDE_TYPE_RULES, DEFAULT_GUIDE_TYPE = load_guide_type_rules(GUIDE_TYPES_CONFIG_PATH)
+
+# Guide types are shown in the order of the classifier's rules, then any others
+GUIDE_TYPE_ORDER = tuple(dict.fromkeys([guide_type for guide_type, _ in GUIDE_TYPE_RULES] + [DEFAULT_GUIDE_TYPE]))
+
+def create_corpus(guides):
+    """Create the corpus of guides, from the guides in source order."""
+    return Corpus(guides, GUIDE_TYPE_ORDER)
+
+@lru_cache(maxsize=None)
+def infer_guide_type(path):
+    """Infer the type of guide from its filename, using the configured rules."""
+    filename = os.path.basename(path).lower()
+    for guide_type, keywords in GUIDE_TYPE_RULES:
+        if any(keyword in filename for keyword in keywords):
+            return guide_type
+    return DEFAULT_GUIDE_TYPE
+
+class CommentStripper:
+    """
+    Removes HTML comments from text which is fed to it in chunks.
+    
+    The result is the same as removing every '<!--.*?-->' match from the whole
+    text. Only the end of a chunk which could be the start of a comment marker
+    is held back, along with the text of a comment until it is closed. A
+    comment which is never closed is kept, as the pattern would not match it.
+    """
+    
+    def __init__(self):
+        self.pending = ""  # the end of the last chunk, which may start a marker
+        self.comment = None  # the text of the open comment, if there is one
+    
+    def feed(self, chunk):
+        """Add a chunk of text, returning the text with comments removed that is ready."""
+        text = self.pending + chunk
+        output = []
+        position = 0
+        while True:
+            if self.comment is not None:
+                end = text.find("-->", position)
+                if end == -1:
+                    keep = max(position, len(text) - 2)
+                    self.comment.append(text[position:keep])
+                    self.pending = text[keep:]
+                    break
+                self.comment = None
+                position = end + 3
+            else:
+                start = text.find("<!--", position)
+                if start == -1:
+                    keep = max(position, len(text) - 3)
+                    output.append(text[position:keep])
+                    self.pending = text[keep:]
+                    break
+                output.append(text[position:start])
+                self.comment = [text[start:start + 4]]
+                position = start + 4
+        return "".join(output)
+    
+    def flush(self):
+        """Return the rest of the text, including a comment which was never closed."""
+        rest = "".join(self.comment or []) + self.pending
+        self.comment = None
+        self.pending = ""
+        return rest
+
+def stream_guide_markdown(file_path, chunk_size=STREAM_CHUNK_SIZE):
+    """Read a guide markdown file in chunks, with HTML comments removed."""
+    stripper = CommentStripper()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        while True:
+            with span("read"):
+                chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            with span("strip_comments"):
+                text = stripper.feed(chunk)
+            if text:
+                yield text
+    rest = stripper.flush()
+    if rest:
+        yield rest
+
+def iter_lines(chunks):
+    """
+    Split chunks of text into lines, as str.splitlines(keepends=True) would split the whole text.
+    
+    The last line of a chunk is held back if it has no line break, or if it
+    ends with a carriage return, as the next chunk may start with the line
+    feed of a CRLF which is split across the two.
+    """
+    pending = []
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if pending and pending[-1].endswith("\r"):
+            # The held back line ends here, with the line feed of a CRLF if one follows
+            if chunk.startswith("\n"):
+                pending.append("\n")
+                chunk = chunk[1:]
+            yield "".join(pending)
+            pending = []
+        lines = chunk.splitlines(keepends=True)
+        if not lines:
+            continue
+        tail = lines.pop() if lines[-1][-1] not in LINE_BREAKS or lines[-1].endswith("\r") else None
+        if lines:
+            if pending:
+                lines[0] = "".join(pending) + lines[0]
+                pending = []
+            yield from lines
+        if tail is not None:
+            pending.append(tail)
+    if pending:
+        yield "".join(pending)
+
+def find_title(chunks):
+    """Find the text of the first '# ' heading in chunks of markdown, or None if there is not one."""
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            if line.startswith('# '):
+                return line[2:]
+        # Only the start of a long line is needed to tell that it is not a heading
+        if len(pending) > 2 and not pending.startswith('# '):
+            pending = pending[:2]
+    if pending.startswith('# '):
+        return pending[2:]
+    return None
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in some text, without needing a tokenizer."""
+    return len(TOKEN_ESTIMATE_PATTERN.findall(text))
+
+def slugify_heading(title):
+    """Create a GitHub style anchor for a heading."""
+    slug = re.sub(r'[^\w\- ]', '', title.strip().lower()).replace(' ', '-')
+    return slug or "section"
+
+def split_sections(content, default_title):
+    """
+    Split markdown content into sections at each heading.
+    
+    Headings inside fenced code blocks are ignored. Any content before the
+    first heading becomes an 'introduction' section titled with the default
+    title. Anchors are made unique by suffixing repeats, as GitHub does.
+    
+    Args:
+        content: The markdown content to split
+        default_title: The title to use for content before the first heading
+    
+    Returns:
+        List of section objects with title, anchor, level, byte offset and
+        length (within the UTF-8 encoded content), estimated tokens and content
+    """
+    return list(iter_sections(content.splitlines(keepends=True), default_title))
+
+def iter_sections(lines, default_title):
+    """
+    Split lines of markdown into sections, as split_sections does.
+    
+    Sections are yielded as soon as the next heading is reached, so only the
+    lines of the current section are held in memory.
+    """
+    anchor_counts = {}
+    byte_offset = 0
+    heading = None  # the (level, title) of the current section
+    section_lines = []
+    in_fence = False
+    
+    def create_section(level, title, section_content):
+        anchor = slugify_heading(title) if level else "introduction"
+        count = anchor_counts.get(anchor, 0)
+        anchor_counts[anchor] = count + 1
+        if count:
+            anchor = f"{anchor}-{count}"
+        return {
+            "title": title,
+            "anchor": anchor,
+            "level": level,
+            "offset": byte_offset,
+            "length": len(section_content.encode('utf-8')),
+            "tokens": estimate_tokens(section_content),
+            "content": section_content
+        }
+    
+    for line in lines:
+        match = None
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            match = HEADING_PATTERN.match(line.rstrip('\r\n'))
+            if match and len(match.group(1)) > SECTION_MAX_LEVEL:
+                match = None
+        if not match:
+            section_lines.append(line)
+            continue
+        
+        section_content = "".join(section_lines)
+        if heading:
+            section = create_section(heading[0], heading[1], section_content)
+            byte_offset += section["length"]
+            yield section
+        elif section_content.strip():
+            # Content before the first heading is the introduction
+            section = create_section(0, default_title, section_content)
+            byte_offset += section["length"]
+            yield section
+        else:
+            byte_offset += len(section_content.encode('utf-8'))
+        heading = (len(match.group(1)), match.group(2))
+        section_lines = [line]
+    
+    if heading:
+        yield create_section(heading[0], heading[1], "".join(section_lines))
+    else:
+        yield create_section(0, default_title, "".join(section_lines))
+
+def write_sections(output_dir, guide_path, sections_dir, name, sections, minify=False):
+    """
+    Write a guide's section index and an endpoint for each section.
+    
+    Section endpoints which no longer exist are removed afterwards, and
+    endpoints whose content is unchanged are left untouched.
+    
+    Args:
+        output_dir: Directory to output the generated files
+        guide_path: Path of the guide's JSON, relative to the output directory
+        sections_dir: Directory for the sections, relative to the output directory
+        name: The name of the guide
+        sections: The sections from split_sections or iter_sections, which
+            are written one at a time as they are read
+    """
+    endpoints_dir = os.path.join(output_dir, sections_dir, "sections")
+    
+    index = []
+    for section in sections:
+        section_path = section_path_for(sections_dir, section['anchor'])
+        summary = {key: section[key] for key in ("title", "anchor", "level", "offset", "length", "tokens")}
+        index.append(dict(summary, path=section_path, hash=content_hash([section["content"]])))
+        with write_output(os.path.join(output_dir, section_path)) as f:
+            dump_json(dict(summary, guide=guide_path, content=section["content"]), f, minify)
+    
+    # Remove the endpoints of sections which no longer exist
+    current = {posixpath.basename(entry["path"]) for entry in index}
+    for filename in os.listdir(endpoints_dir):
+        endpoint = filename[:-3] if filename.endswith(COMPRESSED_EXTENSIONS) else filename
+        if endpoint not in current and not filename.startswith('.'):
+            remove_output(os.path.join(endpoints_dir, filename))
+    
+    with write_output(os.path.join(output_dir, sections_dir, "sections.json")) as f:
+        dump_json({
+            "guide": guide_path,
+            "name": name,
+            "tokens": sum(section["tokens"] for section in index),
+            "sections": index
+        }, f, minify)
+
+def remove_guide_outputs(output_dir, guide_path):
+    """Remove a guide's JSON and its sections. Returns True if anything was removed."""
+    removed = remove_output(os.path.join(output_dir, guide_path))
+    return remove_output(os.path.join(output_dir, sections_dir_for(guide_path))) or removed
+
+def guide_output_path(guide_file):
+    """The path of a guide's JSON, relative to the output directory."""
+    output_filename = os.path.basename(guide_file).replace('.md', '.json')
+    output_subdir = f"{infer_guide_type(guide_file)}s"  # pluralize
+    return f"api/guides/{output_subdir}/{output_filename}"  # No leading slash for local compatibility
+
+def build_guide(guide_file, output_dir, version, last_updated, minify=False, related=None):
+    """
+    Process a guide markdown file and write its JSON endpoint.
+    
+    This runs in worker processes when building with multiple jobs, so it only
+    takes picklable arguments and returns the Guide record for the corpus (or
+    None if the guide could not be processed). The related guides are found
+    once every guide has been built, so those from the previous build are
+    written, and updated by create_related_guides if they have changed.
+    """
+    filename = os.path.basename(guide_file)
+    with span("build_guide", file=filename):
+        # Determine the guide type and output path
+        guide_type = infer_guide_type(guide_file)
+        guide_path = guide_output_path(guide_file)
+        output_path = os.path.join(output_dir, guide_path)
+        sections_dir = sections_dir_for(guide_path)
+        
+        # The guide is streamed from the source to its outputs in chunks, so
+        # the memory used is bounded by the chunk size and the largest section
+        # rather than by the size of the guide. The title is found first, as
+        # it is written before the content.
+        try:
+            with span("extract_title"):
+                with contextlib.closing(stream_guide_markdown(guide_file)) as chunks:
+                    title = find_title(chunks)
+                if title is None:
+                    title = filename.replace('.md', '')
+            
+            # Create guide JSON structure
+            specific_guide = {
+                "metadata": {
+                    "name": title,
+                    "type": guide_type,
+                    "version": version,
+                    "lastUpdated": last_updated,
+                    "source": f"https://github.com/dwmkerr/ai-developer-guide/guides/{filename}",
+                    "sectionIndex": f"{sections_dir}/sections.json",
+                    "related": related or []
+                },
+                "content": None
+            }
+            
+            # Write the guide JSON file, and the section index and endpoints
+            # alongside it, from a single pass over the source
+            with write_output(output_path) as f:
+                with stream_json(f, specific_guide, "content", minify) as write_content:
+                    def content_chunks():
+                        for chunk in stream_guide_markdown(guide_file):
+                            write_content(chunk)
+                            yield chunk
+                    
+                    with span("write_sections"):
+                        sections = iter_sections(iter_lines(content_chunks()), title)
+                        write_sections(output_dir, guide_path, sections_dir, title, sections, minify)
+        except Exception as e:
+            print(f"Error processing guide {guide_file}: {e}")
+            remove_guide_outputs(output_dir, guide_path)
+            return None
+        
+        return Guide(title, guide_type, guide_path)
+
+def update_guide_metadata(output_dir, guide_path, updates, minify=False):
+    """
+    Update fields of a guide's metadata without loading its content.
+    
+    build_guide writes the metadata first and the content last, and JSON is
+    written as ASCII, so the metadata is read from the start of the file and
+    the rest of the file is copied across in chunks. Returns True if the guide
+    was rewritten, or False if the metadata already had the updated values.
+    """
+    path = os.path.join(output_dir, guide_path)
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        # Read until the head holds the whole metadata and the start of the content
+        head = ""
+        while True:
+            chunk = f.read(STREAM_CHUNK_SIZE)
+            head += chunk
+            key = head.find('"metadata":')
+            if key != -1:
+                value_start = len(head) - len(head[key + len('"metadata":'):].lstrip())
+                try:
+                    metadata, _ = decoder.raw_decode(head, value_start)
+                    prefix, _ = split_json({"metadata": metadata, "content": None}, "content", minify)
+                    if len(head) >= len(prefix):
+                        break
+                except ValueError:
+                    pass
+            if not chunk:
+                raise ValueError(f"Could not read the metadata of {guide_path}")
+        if not head.startswith(prefix):
+            raise ValueError(f"Unexpected layout of {guide_path}, it should be rebuilt")
+        
+        updated = dict(metadata, **updates)
+        if updated == metadata:
+            return False
+        with write_output(path) as output:
+            output.write(split_json({"metadata": updated, "content": None}, "content", minify)[0])
+            output.write(head[len(prefix):])
+            shutil.copyfileobj(f, output, STREAM_CHUNK_SIZE)
+    return True
+
+def create_guide_json(readme_path, output_dir, incremental=False, jobs=1, precompress=False,
+                      minify=False, bundle=False, verbose=False, index_page_size=0):
+    """
+    Create guide JSON files from markdown files.
+    
+    Args:
+        readme_path: Path to the main README.md file
+        output_dir: Directory to output the generated files
+        incremental: Only regenerate outputs whose inputs have changed since the
+            build recorded in the output directory's manifest
+        jobs: Number of processes to use for processing guides
+        precompress: Write .gz/.br siblings of each output and an ETag map
+        minify: Write JSON without indentation or whitespace
+        bundle: Also write all of the API outputs into a single bundle file
+        verbose: Show each guide created and list every output file
+        index_page_size: If set, split the index.html guides table into pages
+            of this many guides
+    """
+    # Get the project root directory
+    project_dir = os.path.dirname(os.path.abspath(readme_path))
+    guides_dir = os.path.join(project_dir, "guides")
+    print(f"Looking for guides in: {guides_dir}")
+    output_counts.clear()
+    
+    # Ensure output directories exist
+    api_dir = os.path.join(output_dir, "api")
+    api_guides_dir = os.path.join(api_dir, "guides")
+    os.makedirs(api_dir, exist_ok=True)
+    os.makedirs(api_guides_dir, exist_ok=True)
+    
+    # Create subdirectories for different guide types
+    guide_types = ["languages", "patterns", "platforms", "other"]
+    for guide_type in guide_types:
+        os.makedirs(os.path.join(api_guides_dir, guide_type), exist_ok=True)
+    
+    # Work out what we can reuse from the previous build. Any change to the
+    # generator itself or to the version means every output is stale.
+    context = BuildContext(readme_path)
+    with span("load_manifest"):
+        manifest = {
+            "generator": compute_generator_version(),
+            "version": context.version,
+            "updated": context.updated,
+            "readme": file_hash(readme_path),
+            "readmeUpdated": context.last_updated(readme_path),
+            "options": {"minify": minify, "indexPageSize": index_page_size},
+            "guides": {}
+        }
+        previous = load_manifest(output_dir) if incremental else None
+    if previous and (previous.get("generator") != manifest["generator"]
+                     or previous.get("version") != manifest["version"]
+                     or previous.get("options") != manifest["options"]):
+        print("Generator, version or options have changed, running a full rebuild.")
+        previous = None
+    previous_guides = previous.get("guides", {}) if previous else {}
+    
+    # Track whether any guide content has changed, for the stages which
+    # cover the whole corpus
+    corpus_changed = False
+    
+    guide_json_path = os.path.join(api_dir, "guide.json")
+    if (previous and previous.get("readme") == manifest["readme"]
+            and previous.get("readmeUpdated") == manifest["readmeUpdated"] and os.path.exists(guide_json_path)):
+        print("✓ Unchanged api/guide.json")
+    else:
+        with span("main_guide"):
+            create_main_guide_json(readme_path, guide_json_path, context, minify)
+        corpus_changed = True
+    
+    # Collect specific guide files
+    generated_guides = []
+    skipped_count = 0
+    
+    # Find all markdown files in the guides directory
+    guide_files = find_guide_files(guides_dir)
+    
+    # Work out which guides need to be rebuilt, reusing the previous output
+    # if the source has not changed
+    guide_entries = {}
+    pending_files = []
+    source_hashes = {}
+    last_updated = {}
+    for guide_file in guide_files:
+        filename = os.path.basename(guide_file)
+        with span("hash_source"):
+            source_hash = file_hash(guide_file)
+        source_hashes[filename] = source_hash
+        last_updated[filename] = context.last_updated(guide_file)
+        previous_entry = previous_guides.get(filename)
+        if (previous_entry and previous_entry["hash"] == source_hash
+                and previous_entry.get("lastUpdated") == last_updated[filename]
+                and os.path.exists(os.path.join(output_dir, previous_entry["path"]))):
+            guide_entries[filename] = Guide.from_entry(previous_entry)
+            skipped_count += 1
+        else:
+            pending_files.append(guide_file)
+    
+    # Process each guide file, optionally across a pool of processes. The
+    # results are returned in order, so the output matches a serial run.
+    previous_related = load_related_guides(output_dir)
+    build_args = (repeat(output_dir), repeat(context.version),
+                  [last_updated[os.path.basename(guide_file)] for guide_file in pending_files], repeat(minify),
+                  [previous_related.get(guide_output_path(guide_file)) for guide_file in pending_files])
+    if jobs > 1 and len(pending_files) > 1:
+        chunksize = max(1, len(pending_files) // (jobs * 4))
+        # Collect the output counts (and spans, if tracing) from the workers, to merge into our own
+        calls = (repeat(traced_call), repeat(build_guide)) if is_active() else (repeat(build_guide),)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            outcomes = list(executor.map(count_outputs, *calls, pending_files, *build_args, chunksize=chunksize))
+        results = []
+        for result, counts in outcomes:
+            output_counts.update(counts)
+            if is_active():
+                result, events = result
+                merge_events(events)
+            results.append(result)
+    else:
+        results = list(map(build_guide, pending_files, *build_args))
+    
+    corpus_changed = corpus_changed or bool(pending_files)
+    created_count = 0
+    for guide_file, generated_guide in zip(pending_files, results):
+        if generated_guide:
+            if verbose:
+                print(f"✓ Created {generated_guide.path}")
+            guide_entries[os.path.basename(guide_file)] = generated_guide
+            created_count += 1
+    if created_count:
+        print(f"✓ Created {created_count} guide(s)")
+    
+    # Aggregate the guides in source order
+    for guide_file in guide_files:
+        filename = os.path.basename(guide_file)
+        if filename in guide_entries:
+            generated_guides.append(guide_entries[filename])
+            manifest["guides"][filename] = dict(guide_entries[filename].to_entry(), hash=source_hashes[filename],
+                                                lastUpdated=last_updated[filename])
+    
+    if skipped_count:
+        print(f"✓ Unchanged {skipped_count} guide(s)")
+    
+    # Every stage from here reads the guides from the corpus
+    corpus = create_corpus(generated_guides)
+    
+    # Remove the outputs of guides which no longer exist, or which have moved
+    for guide_path in prune_guide_outputs(output_dir, corpus):
+        print(f"✓ Removed {guide_path}")
+        corpus_changed = True
+    
+    # The index, API index and badge only depend on the list of guides, the
+    # version and the date the site was updated, so only regenerate them if
+    # those have changed.
+    previous_listing = tuple(Guide.from_entry(entry) for entry in previous_guides.values())
+    aggregate_paths = [os.path.join(output_dir, name) for name in ("index.html", "api.json", "version-badge.json")]
+    if (previous and previous_listing == corpus.guides and previous.get("updated") == manifest["updated"]
+            and all(os.path.exists(path) for path in aggregate_paths)):
+        print("✓ Unchanged index.html, api.json and version-badge.json")
+    else:
+        write_site_index(output_dir, corpus, context, minify, index_page_size)
+    
+    # The search index and reference graph cover every guide
+    if corpus_changed or not os.path.exists(os.path.join(output_dir, SEARCH_DIR, "index.json")):
+        with span("search_index"):
+            create_search_index(output_dir, corpus)
+    else:
+        print("✓ Unchanged search index")
+    if corpus_changed or not os.path.exists(os.path.join(output_dir, GRAPH_PATH)):
+        with span("reference_graph"):
+            create_reference_graph(output_dir, corpus, minify)
+    else:
+        print("✓ Unchanged reference graph")
+    
+    if corpus_changed or not os.path.exists(os.path.join(output_dir, RELATED_PATH)):
+        with span("related_guides"):
+            create_related_guides(output_dir, corpus, minify)
+    else:
+        print("✓ Unchanged related guides")
+    
+    if corpus_changed or not os.path.isdir(os.path.join(output_dir, PACKS_DIR)):
+        with span("context_packs"):
+            create_context_packs(output_dir, corpus, minify)
+    else:
+        print("✓ Unchanged context packs")
+    
+    # The change feed compares the content of this version with the previous one,
+    # whose snapshot is kept with the diffs
+    if (corpus_changed or not os.path.exists(os.path.join(output_dir, CHANGES_PATH))
+            or not os.path.isdir(os.path.join(output_dir, CHANGES_DIR))):
+        with span("change_feed"):
+            create_change_feed(output_dir, corpus, context, minify)
+    else:
+        print("✓ Unchanged change feed")
+    
+    with span("save_manifest"):
+        save_manifest(output_dir, manifest)
+    
+    if bundle:
+        with span("bundle"):
+            create_bundle(output_dir, corpus)
+    
+    if precompress:
+        with span("precompress"):
+            precompress_outputs(output_dir)
+    
+    print(f"✓ Outputs: {format_counts()}")
+    print("Successfully generated JSON API files.")
+    
+    # List all created files for verification
+    if verbose:
+        print(f"\nGenerated files in {output_dir}:")
+        for root, dirs, files in os.walk(output_dir):
+            for file in files:
+                print(f"  - {os.path.relpath(os.path.join(root, file), output_dir)}")
+
+def prune_guide_outputs(output_dir, corpus):
+    """
+    Remove the outputs of guides which are not in the corpus.
+    
+    The guide outputs directory is compared against the corpus rather than
+    the previous build's manifest, so stale outputs are removed by full builds
+    too, including outputs of guides deleted before the manifest existed.
+    
+    Returns:
+        The paths of the guides whose outputs were removed
+    """
+    api_guides_dir = os.path.join(output_dir, "api", "guides")
+    expected = set()
+    for guide in corpus:
+        expected.add(guide.path)
+        expected.add(guide.sections_dir)
+    
+    removed = []
+    for type_dir in sorted(os.listdir(api_guides_dir)) if os.path.isdir(api_guides_dir) else []:
+        if not os.path.isdir(os.path.join(api_guides_dir, type_dir)):
+            continue
+        for name in sorted(os.listdir(os.path.join(api_guides_dir, type_dir))):
+            relative_path = f"api/guides/{type_dir}/{name}"
+            # Compressed siblings go with the output they were compressed from
+            source_path = relative_path[:-3] if name.endswith(COMPRESSED_EXTENSIONS) else relative_path
+            if source_path in expected or name.startswith('.'):
+                continue
+            remove_output(os.path.join(output_dir, relative_path))
+            if source_path == relative_path and name.endswith('.json'):
+                removed.append(relative_path)
+    return removed
+
+def content_etag(data):
+    """Return a strong ETag for some content, based on its hash."""
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+def file_etag(path):
+    """Return the ETag of a file, as content_etag() of its content, reading it in chunks."""
+    digest = hashlib.sha256()
+    for chunk in read_chunks(path):
+        digest.update(chunk)
+    return '"' + digest.hexdigest()[:32] + '"'
+
+def list_output_files(output_dir, directory):
+    """
+    List the files in a directory of the output, relative to the output directory.
+    
+    Compressed siblings of outputs which no longer exist are removed.
+    """
+    relative_paths = []
+    for root, dirs, files in os.walk(directory):
+        for file in files:
+            path = os.path.join(root, file)
+            if file.endswith(COMPRESSED_EXTENSIONS) and not os.path.exists(path[:-3]):
+                remove_output(path)
+                continue
+            relative_paths.append(os.path.relpath(path, output_dir).replace(os.sep, '/'))
+    return relative_paths
+
+def precompress_outputs(output_dir, relative_paths=None):
+    """
+    Write gzip (and brotli, if available) siblings of the outputs and update the ETag map.
+    
+    Outputs whose ETag has not changed since the last run keep their existing
+    compressed siblings, and siblings of outputs which no longer exist are removed.
+    
+    Args:
+        output_dir: Directory containing the generated site
+        relative_paths: Paths of the outputs (or directories of outputs) to
+            update, relative to the output directory, or None to update every output
+    """
+    etags_path = os.path.join(output_dir, ETAGS_FILENAME)
+    try:
+        with open(etags_path, 'r', encoding='utf-8') as f:
+            etags = json.load(f)
+    except (FileNotFoundError, ValueError):
+        etags = {}
+    
+    if relative_paths is None:
+        relative_paths = list_output_files(output_dir, output_dir)
+        # Forget outputs that have been removed since the last run
+        etags = {path: etag for path, etag in etags.items() if path in relative_paths}
+    else:
+        # Expand directories (such as a guide's sections) into the files within
+        # them, including files which have been removed since the last run
+        expanded = set()
+        for relative_path in relative_paths:
+            directory = os.path.join(output_dir, relative_path)
+            if os.path.isdir(directory):
+                expanded.update(list_output_files(output_dir, directory))
+            expanded.update(path for path in etags if path.startswith(relative_path.rstrip('/') + '/'))
+            expanded.add(relative_path)
+        relative_paths = expanded
+    
+    compressed_count = 0
+    for relative_path in sorted(relative_paths):
+        if (not relative_path.endswith(PRECOMPRESS_EXTENSIONS) or relative_path == ETAGS_FILENAME
+                or os.path.basename(relative_path).startswith('.')):
+            continue
+        path = os.path.join(output_dir, relative_path)
+        if not os.path.isfile(path):
+            etags.pop(relative_path, None)
+            for extension in COMPRESSED_EXTENSIONS:
+                remove_output(path + extension)
+            continue
+        
+        etag = file_etag(path)
+        up_to_date = etags.get(relative_path) == etag and os.path.exists(path + ".gz") and (
+            brotli is None or os.path.exists(path + ".br"))
+        etags[relative_path] = etag
+        if up_to_date:
+            continue
+        
+        # Outputs are compressed a chunk at a time. zlib's gzip container
+        # (wbits=31) has no mtime or filename, which keeps the output deterministic
+        with write_output(path + ".gz", 'wb') as f:
+            compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+            for chunk in read_chunks(path):
+                f.write(compressor.compress(chunk))
+            f.write(compressor.flush())
+        if brotli is not None:
+            with write_output(path + ".br", 'wb') as f:
+                compressor = brotli.Compressor()
+                for chunk in read_chunks(path):
+                    f.write(compressor.process(chunk))
+                f.write(compressor.finish())
+        compressed_count += 1
+    
+    with write_output(etags_path) as f:
+        json.dump(dict(sorted(etags.items())), f, indent=2)
+    print(f"✓ Precompressed {compressed_count} file(s), created {ETAGS_FILENAME}")
+
+def find_guide_files(guides_dir):
+    """Find all markdown files in the guides directory, sorted so that outputs are deterministic."""
+    if not os.path.exists(guides_dir):
+        return []
+    return [os.path.join(guides_dir, f) for f in sorted(os.listdir(guides_dir))
+            if f.endswith('.md') and os.path.isfile(os.path.join(guides_dir, f))]
+
+def write_site_index(output_dir, corpus, context, minify=False, index_page_size=0):
+    """Write the outputs which list all of the guides: index.html, api.json and the badge."""
+    # Create index.html with links to all guides
+    with span("index_html"):
+        create_index_html(output_dir, corpus, context, index_page_size)
+    
+    # Generate API index
+    with span("api_index"):
+        generate_api_index(context, output_dir, corpus, minify)
+    
+    # Create version badge for shields.io
+    with span("version_badge"):
+        create_version_badge(output_dir, context, minify)
+
+def iter_guide_sections(output_dir, guide_path):
+    """
+    Load the sections of a generated guide, one at a time, from its section endpoints.
+    
+    Only one section is held in memory at a time, rather than the whole guide.
+    """
+    sections_dir = sections_dir_for(guide_path)
+    with open(os.path.join(output_dir, sections_dir, "sections.json"), 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    for entry in index["sections"]:
+        with open(os.path.join(output_dir, entry["path"]), 'r', encoding='utf-8') as f:
+            yield json.load(f)
+
+def create_search_index(output_dir, corpus):
+    """Build the full-text search index over the sections of the main guide and every guide."""
+    # Sections are read as they are indexed, rather than all loaded up front
+    def documents():
+        for guide in corpus.all_guides:
+            sections_dir = guide.sections_dir
+            for section in iter_guide_sections(output_dir, guide.path):
+                document = {
+                    "guide": guide.path,
+                    "name": guide.name,
+                    "title": section["title"],
+                    "anchor": section["anchor"],
+                    "path": section_path_for(sections_dir, section["anchor"])
+                }
+                yield document, section["content"]
+    
+    document_count, term_count = build_search_index(documents(), output_dir)
+    print(f"✓ Created {SEARCH_DIR}/index.json ({document_count} sections, {term_count} terms)")
+
+def guide_term_signature(output_dir, guide_path):
+    """
+    A hash of what the search index, reference graph and related guides read from a generated guide.
+    
+    They depend on the titles and terms of its sections and the links in
+    them, rather than their exact text, so an edit which keeps the signature
+    (such as to punctuation or formatting) leaves them unchanged.
+    """
+    parts = []
+    for section in iter_guide_sections(output_dir, guide_path):
+        parts.append(f"{section['title']}\t{section['anchor']}")
+        parts.append(" ".join(tokenize_terms(section["content"])))
+        parts.append(" ".join(target for _, target in scan_links(section["content"])))
+    return content_hash(parts)
+
+def resolve_guide_link(target, source_dir):
+    """
+    Resolve a link target to the filename of the guide it links to, if any.
+    
+    Args:
+        target: The link target, such as './guides/python.md#testing'
+        source_dir: The directory the linking document is in, relative to the
+            project root ('' for the README, 'guides' for a guide)
+    
+    Returns:
+        The guide's source filename, or None if the link is not to a guide
+    """
+    path = target.split('#', 1)[0]
+    if not path.endswith('.md') or '://' in path or path.startswith('/'):
+        return None
+    resolved = posixpath.normpath(posixpath.join(source_dir, path))
+    if posixpath.dirname(resolved) != "guides":
+        return None
+    return posixpath.basename(resolved)
+
+def create_reference_graph(output_dir, corpus, minify=False):
+    """
+    Write the cross-reference graph of links between the main guide and every guide.
+    
+    Each edge is a link from one guide to another (counting repeated links
+    once), and the backlinks map each guide to the guides which link to it.
+    """
+    edges = []
+    backlinks = {guide.path: [] for guide in corpus.all_guides}
+    for guide in corpus.all_guides:
+        source_dir = "" if guide is corpus.main_guide else "guides"
+        # Links and code blocks never span sections, so each section is scanned in turn
+        targets = []
+        for section in iter_guide_sections(output_dir, guide.path):
+            for _, target in scan_links(section["content"]):
+                # Guides are listed under their filename, without the extension
+                linked_file = resolve_guide_link(target, source_dir)
+                linked = corpus.by_name.get(linked_file[:-len('.md')]) if linked_file else None
+                if linked and linked.path != guide.path and linked.path not in targets:
+                    targets.append(linked.path)
+        for target_path in targets:
+            edges.append({"source": guide.path, "target": target_path})
+            backlinks[target_path].append(guide.path)
+    
+    graph = {
+        "nodes": [{"path": guide.path, "name": guide.name, "type": guide.type} for guide in corpus.all_guides],
+        "edges": edges,
+        "backlinks": backlinks
+    }
+    with write_output(os.path.join(output_dir, GRAPH_PATH)) as f:
+        dump_json(graph, f, minify)
+    print(f"✓ Created {GRAPH_PATH} ({len(graph['nodes'])} guides, {len(edges)} links)")
+
+def create_related_guides(output_dir, corpus, minify=False):
+    """
+    Find the guides and sections most similar to each guide and section.
+    
+    The related guides are added to the metadata of each guide, and the
+    related guides and sections are written to a single file.
+    
+    Returns:
+        The paths of the guides whose metadata was updated
+    """
+    def guide_sections(guide):
+        sections_dir = guide.sections_dir
+        for section in iter_guide_sections(output_dir, guide.path):
+            yield section_path_for(sections_dir, section["anchor"]), section["content"]
+    
+    related = build_related(((guide, guide_sections(guide)) for guide in corpus), output_dir)
+    updated_paths = [guide.path for guide, related_guides in zip(corpus, related)
+                     if update_guide_metadata(output_dir, guide.path, {"related": related_guides}, minify)]
+    print(f"✓ Created {RELATED_PATH} ({len(corpus)} guides), "
+          f"updated the related guides of {len(updated_paths)} guide(s)")
+    return updated_paths
+
+def create_context_packs(output_dir, corpus, minify=False):
+    """Write the token-budgeted context packs for each guide and guide type, using the related guides."""
+    pack_count = build_context_packs(output_dir, corpus, load_related_guides(output_dir), minify)
+    budgets = ", ".join(budget_label(budget) for budget in PACK_BUDGETS)
+    print(f"✓ Created {pack_count} context packs in {PACKS_DIR} ({budgets} tokens)")
+
+def create_change_feed(output_dir, corpus, context, minify=False):
+    """Update the change feed with the guides and sections changed since the previous version."""
+    guides = {}
+    for guide in corpus.all_guides:
+        sections = {section.anchor: section.hash for section in load_sections(output_dir, guide)}
+        guides[guide.path] = {
+            "name": guide.name,
+            "hash": content_hash(f"{anchor}:{section_hash}" for anchor, section_hash in sections.items()),
+            "sectionsDir": guide.sections_dir,
+            "sections": sections
+        }
+    
+    entry = build_change_feed(output_dir, context.version, context.updated, guides, minify)
+    if entry["from"] is None:
+        print(f"✓ Created {CHANGES_PATH} (first version recorded, {len(guides)} guides)")
+    else:
+        print(f"✓ Created {CHANGES_PATH} ({entry['from']} to {entry['version']}: {len(entry['added'])} added, "
+              f"{len(entry['modified'])} modified, {len(entry['removed'])} removed)")
+
+def create_bundle(output_dir, corpus):
+    """Write the API index, main guide and all guides into a single bundle file."""
+    keys = ["api.json", corpus.main_guide.path] + [guide.path for guide in corpus]
+    records = [(key, os.path.join(output_dir, key)) for key in keys]
+    write_bundle(os.path.join(output_dir, BUNDLE_PATH), records)
+    print(f"✓ Created {BUNDLE_PATH} ({len(records)} records)")
+
+def create_main_guide_json(readme_path, guide_json_path, context, minify=False):
+    """Create the main guide.json from the README, starting at the Golden Rules."""
+    # Process the main README.md
+    try:
+        with open(readme_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except Exception as e:
+        print(f"Error reading README: {e}")
+        sys.exit(1)
+    
+    # Skip the HTML header and introduction sections
+    content = re.sub(r'<!--.*?-->', '', content, flags=re.DOTALL)
+    
+    # Find where the actual guide begins
+    guide_start_idx = content.find('## The Golden Rules')
+    if guide_start_idx == -1:
+        print("Error: Could not find the beginning of the guide.")
+        sys.exit(1)
+    
+    # Get the main content from the guide start point onwards
+    guide_content = content[guide_start_idx:]
+    
+    # Extract references to guides
+    with span("extract_references"):
+        references = extract_references(guide_content)
+    
+    # Create the main guide.json structure
+    guide_data = {
+        "metadata": {
+            "name": "AI Developer Guide",
+            "version": context.version,
+            "lastUpdated": context.last_updated(readme_path),
+            "source": "https://github.com/dwmkerr/ai-developer-guide",
+            "sectionIndex": f"{MAIN_GUIDE_SECTIONS_DIR}/sections.json"
+        },
+        "content": guide_content,
+        "references": references
+    }
+    
+    # Write the main guide.json
+    with write_output(guide_json_path) as f:
+        dump_json(guide_data, f, minify)
+        print(f"✓ Created api/guide.json")
+    
+    # Write the section index and endpoints for the main guide
+    output_dir = os.path.dirname(os.path.dirname(os.path.abspath(guide_json_path)))
+    sections = split_sections(guide_content, guide_data["metadata"]["name"])
+    write_sections(output_dir, "api/guide.json", MAIN_GUIDE_SECTIONS_DIR, guide_data["metadata"]["name"],
+                   sections, minify)
+
+def create_index_html(output_dir, corpus, context, page_size=0):
+    """
+    Create a simple index.html file for the AI Developer Guide API.
+    
+    Args:
+        output_dir: Directory to output the generated files
+        corpus: The Corpus of guides
+        context: The BuildContext, for the version and the date updated
+        page_size: If set, split the guides table over pages of this many
+            guides, written as index.html, index-2.html and so on
+    """
+    
+    version = context.version
+    updated = context.updated
+    
+    # The corpus orders the guides by type, then by name within each type
+    ordered_guides = corpus.index_order
+    
+    pages = [ordered_guides[start:start + page_size] for start in range(0, len(ordered_guides), page_size)] \
+        if page_size else [ordered_guides]
+    pages = pages or [[]]
+    
+    written = set()
+    for page_number, guides in enumerate(pages, start=1):
+        filename = index_page_filename(page_number)
+        pagination = render_pagination(page_number, len(pages)) if len(pages) > 1 else ""
+        with write_output(os.path.join(output_dir, filename)) as f:
+            f.write(INDEX_HTML_HEAD.substitute(version=version, updated=updated))
+            f.writelines(render_guide_row(guide.type, guide.name, guide.path) for guide in guides)
+            f.write(INDEX_HTML_TAIL.substitute(pagination=pagination))
+        written.add(filename)
+    
+    # Remove pages left over from a build with more pages
+    for filename in os.listdir(output_dir):
+        if INDEX_PAGE_PATTERN.match(filename) and filename not in written:
+            remove_output(os.path.join(output_dir, filename))
+    
+    if len(pages) > 1:
+        print(f"✓ Created index.html ({len(pages)} pages)")
+    else:
+        print(f"✓ Created index.html")
+
+def index_page_filename(page_number):
+    """The filename of a page of the index, e.g. index.html or index-2.html."""
+    return "index.html" if page_number == 1 else f"index-{page_number}.html"
+
+@lru_cache(maxsize=65536)
+def render_guide_row(guide_type, name, path):
+    """
+    Render the index table row for a guide.
+    
+    Rows are cached by the guide's metadata, so a long running process (such
+    as the dev server) only re-renders the rows of guides which have changed.
+    """
+    return GUIDE_ROW_TEMPLATE(type=escape_html(guide_type.capitalize()), name=escape_html(name),
+                              path=escape_html(path))
+
+def escape_html(text):
+    """Escape text for HTML, skipping the (slow) escape for the common case of text with nothing to escape."""
+    return html.escape(text) if HTML_SPECIAL_PATTERN.search(text) else text
+
+def render_pagination(page_number, page_count):
+    """Render the previous and next page links for a page of the index."""
+    previous_link = (f'<li class="page-item"><a class="page-link" href="{index_page_filename(page_number - 1)}">'
+                     f'Previous</a></li>' if page_number > 1 else
+                     '<li class="page-item disabled"><span class="page-link">Previous</span></li>')
+    next_link = (f'<li class="page-item"><a class="page-link" href="{index_page_filename(page_number + 1)}">'
+                 f'Next</a></li>' if page_number < page_count else
+                 '<li class="page-item disabled"><span class="page-link">Next</span></li>')
+    return PAGINATION_TEMPLATE.substitute(previous=previous_link, next=next_link,
+                                          page=page_number, pages=page_count)
+
+def create_version_badge(output_dir, context, minify=False):
+    """Create a shields.io compatible version badge JSON file."""
+    version = context.version
+    
+    badge_data = {
+        "schemaVersion": 1,
+        "label": "version",
+        "message": version,
+        "color": "blue"
+    }
+    
+    badge_path = os.path.join(output_dir, "version-badge.json")
+    with write_output(badge_path) as f:
+        dump_json(badge_data, f, minify)
+        print(f"✓ Created version-badge.json")
+
+def generate_api_index(context, output_dir, corpus, minify=False):
+    """Generate a simple API index file."""
+    output_path = os.path.join(output_dir, "api.json")
+    
+    try:
+        version = context.version
+        
+        # Create a simple API index
+        api_index = {
+            "name": "AI Developer Guide API",
+            "description": "JSON API providing standards, patterns and principles for effective AI-assisted development",
+            "version": version,
+            "source": "https://github.com/dwmkerr/ai-developer-guide",
+            "lastUpdated": context.updated,
+            "endpoints": {
+                "main_guide": {
+                    "path": "/api/guide.json",
+                    "description": "Complete AI Developer Guide with core rules and Plan/Implement/Review approach",
+                    "sections": f"/{MAIN_GUIDE_SECTIONS_DIR}/sections.json"
+                },
+                "search": {
+                    "path": f"/{SEARCH_DIR}/index.json",
+                    "description": "Full-text search index over guide sections, with BM25 statistics"
+                },
+                "graph": {
+                    "path": f"/{GRAPH_PATH}",
+                    "description": "Links between guides, as edges and backlinks"
+                },
+                "related": {
+                    "path": f"/{RELATED_PATH}",
+                    "description": "The most similar guides to each guide and sections to each section"
+                },
+                "context_packs": {
+                    "description": "The most relevant guidance for each guide and guide type that fits in a "
+                                   "token budget, starting with the Golden Rules",
+                    "budgets": list(PACK_BUDGETS),
+                    "types": {}
+                },
+                "changes": {
+                    "path": f"/{CHANGES_PATH}",
+                    "description": "Guides and sections changed in each version, with diffs between versions"
+                }
+            }
+        }
+        
+        # Add specialized guides to endpoints by type, and the context packs of each type
+        for guide_type, guides in corpus.by_type.items():
+            api_index["endpoints"][f"{guide_type}_guides"] = {
+                guide.key: {
+                    "path": f"/{guide.path}",
+                    "description": f"{guide.name} guide",
+                    "sections": f"/{guide.section_index}",
+                    "packs": {budget_label(budget): f"/{guide_pack_path(guide.path, budget)}"
+                              for budget in PACK_BUDGETS}
+                }
+                for guide in guides
+            }
+            api_index["endpoints"]["context_packs"]["types"][guide_type] = {
+                budget_label(budget): f"/{type_pack_path(guide_type, budget)}" for budget in PACK_BUDGETS
+            }
+        
+        # Write the API index
+        with write_output(output_path) as f:
+            dump_json(api_index, f, minify)
+            print("✓ Created api.json")
+            
+    except Exception as e:
+        print(f"Error generating API index: {e}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the JSON API for the AI Developer Guide.")
+    parser.add_argument("readme_path", metavar="README_PATH", help="path to the main README.md")
+    parser.add_argument("output_dir", metavar="OUTPUT_DIR", help="directory to write the site to")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only regenerate outputs whose inputs changed since the last build")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="number of processes used to process guides (0 for one per CPU)")
+    parser.add_argument("--precompress", action="store_true",
+                        help="write .gz/.br siblings of each output and an ETag map")
+    parser.add_argument("--minify", action="store_true",
+                        help="write JSON without indentation or whitespace")
+    parser.add_argument("--bundle", action="store_true",
+                        help=f"also write all API outputs into a single {BUNDLE_PATH} file")
+    parser.add_argument("--index-page-size", type=int, default=0, metavar="N",
+                        help="split the index.html guides table into pages of N guides (default: one page)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="write a Chrome trace of each build stage and print a per-stage summary")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="profile the build with cProfile and tracemalloc, writing the reports to DIR")
+    parser.add_argument("--verbose", "-v", action="store_true",
+                        help="list each guide created and every output file")
+    args = parser.parse_args()
+    
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    
+    def build():
+        create_guide_json(args.readme_path, args.output_dir, incremental=args.incremental, jobs=jobs,
+                          precompress=args.precompress, minify=args.minify, bundle=args.bundle,
+                          verbose=args.verbose, index_page_size=args.index_page_size)
+    
+    trace = BuildTrace() if args.trace else None
+    with activate(trace):
+        with span("build"):
+            if args.profile:
+                profile_call(build, args.profile)
+            else:
+                build()
     
-    readme_path = sys.argv[1]
-    output_dir = sys.argv[2]
-    create_guide_json(readme_path, output_dir)
+    if trace:
+        trace.write(args.trace)
+        print(f"\n⏱️  Build stages (trace written to {args.trace}):")
+        for name, (total, count) in trace.summary():
+            print(f"   {name:<24} {total / 1000:10.1f}ms  x{count}")
+    if args.profile:
+        print(f"📈 Profile written to {args.profile}")
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Check the links in the project's markdown files.
+
+Links are found with the site generator's link scanner, so links shown as
+code are ignored, just as they are when the site is generated. Internal links
+are resolved against the local tree, with no network access:
+
+    ./guides/python.md            the file must exist
+    ./guides/python.md#testing    and have a heading (or anchor tag) 'testing'
+    #testing                      the linking file must have the heading
+    /docs/about.md                paths starting with '/' are from the project root
+
+Links to guides from the README and the guides also become the 'apiUrl' of
+references in the generated API, so each must resolve to a file in guides/
+for its apiUrl to exist.
+
+External links are checked concurrently with asyncio, with a limit on the
+requests to each host at once. Links found alive are cached (by default in
+.link-cache.json in the project root) and not checked again until their time
+to live has passed; broken links are always checked again. The ignore
+patterns, timeout, retries and alive status codes are read from the
+markdown-link-check config.
+
+Requests are made by a transport from the registry below, so that tests can
+swap in a transport of their own: 'urllib' uses the standard library with a
+thread per request, and 'aiohttp' pools connections, if it is installed.
+
+Usage: python link_check.py [PATHS...] [--offline] [--transport NAME]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+# The site generator's link scanner and heading anchors are reused, so that
+# links are found and resolved as they are in the generated API
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from generate_json import (FENCE_PATTERN, HEADING_PATTERN, extract_references, guide_output_path,  # noqa: E402
+                           resolve_guide_link, scan_links, slugify_heading)
+
+try:
+    import aiohttp
+except ImportError:
+    # aiohttp is optional, without it requests are made with urllib in threads
+    aiohttp = None
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_CONFIG_PATH = os.path.join(BASE_DIR, ".github", "markdown-link-check-config.json")
+
+# The results of external links are cached by URL, so live links aren't checked on every run
+DEFAULT_CACHE_FILENAME = ".link-cache.json"
+DEFAULT_TTL_HOURS = 24
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PER_HOST = 4
+
+# Directories which never contain the project's documentation
+SKIP_DIRS = {".git", "node_modules", "site", "artifacts", "__pycache__", ".venv", "venv"}
+
+# Anchors set with HTML, such as <a name="setup"></a>
+ANCHOR_TAG_PATTERN = re.compile(r'<a\s+(?:name|id)="([^"]+)"', re.IGNORECASE)
+
+DURATION_PATTERN = re.compile(r'^(\d+(?:\.\d+)?)(ms|s|m)?$')
+
+USER_AGENT = "ai-developer-guide-link-check"
+
+# Transports, by name. Each is a function which takes the maximum number of
+# connections and returns a transport object, with an async 'request' method
+# (which takes a method, URL and timeout, returns the status code and any
+# Retry-After header, and raises OSError if there is no response) and an
+# async 'close' method.
+TRANSPORTS = {}
+
+def register_transport(name):
+    """Register a transport factory under a name."""
+    def decorator(factory):
+        TRANSPORTS[name] = factory
+        return factory
+    return decorator
+
+class UrllibTransport:
+    """Makes requests with urllib, each in a thread of a pool."""
+
+    def __init__(self, max_connections):
+        self.executor = ThreadPoolExecutor(max_connections)
+
+    async def request(self, method, url, timeout):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.fetch, method, url, timeout)
+
+    def fetch(self, method, url, timeout):
+        request = urllib.request.Request(url, method=method, headers={"User-Agent": USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return response.status, response.headers.get("Retry-After")
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get("Retry-After")
+
+    async def close(self):
+        self.executor.shutdown(wait=False)
+
+class AiohttpTransport:
+    """Makes requests with aiohttp, reusing connections to each host."""
+
+    def __init__(self, max_connections):
+        self.max_connections = max_connections
+        self.session = None
+
+    async def request(self, method, url, timeout):
+        if self.session is None:
+            # Per-host limits are applied by the checker, so the connector only limits the total
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_connections),
+                                                 headers={"User-Agent": USER_AGENT})
+        try:
+            async with self.session.request(method, url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                return response.status, response.headers.get("Retry-After")
+        except aiohttp.ClientError as e:
+            raise OSError(str(e) or type(e).__name__) from e
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+@register_transport("urllib")
+def create_urllib_transport(max_connections):
+    return UrllibTransport(max_connections)
+
+@register_transport("aiohttp")
+def create_aiohttp_transport(max_connections):
+    if aiohttp is None:
+        raise RuntimeError("the 'aiohttp' package is not installed")
+    return AiohttpTransport(max_connections)
+
+DEFAULT_TRANSPORT = "aiohttp" if aiohttp is not None else "urllib"
+
+def parse_duration(value, default):
+    """Parse a duration from the link check config, such as '30s' or 500, in seconds."""
+    if value is None:
+        return default
+    match = DURATION_PATTERN.match(str(value).strip())
+    if not match:
+        raise ValueError(f"Invalid duration '{value}'")
+    number, unit = float(match.group(1)), match.group(2) or "ms"
+    return number * {"ms": 0.001, "s": 1, "m": 60}[unit]
+
+def load_config(config_path):
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_link_cache(cache_path):
+    """Load the cached results of external links, keyed by URL."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_link_cache(cache_path, cache):
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+def find_markdown_files(base_dir):
+    """Find the markdown files in the project, sorted so that the report is deterministic."""
+    found = []
+    for root, dirs, files in os.walk(base_dir):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+        found.extend(os.path.join(root, f) for f in sorted(files) if f.endswith('.md'))
+    return found
+
+def heading_anchors(content):
+    """
+    The anchors of the headings in markdown content, at every level, as GitHub creates them.
+
+    Anchors set with HTML anchor tags are included too.
+    """
+    anchors = set(anchor.lower() for anchor in ANCHOR_TAG_PATTERN.findall(content))
+    anchor_counts = {}
+    in_fence = False
+    for line in content.splitlines():
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+            continue
+        match = None if in_fence else HEADING_PATTERN.match(line)
+        if match:
+            anchor = slugify_heading(match.group(2))
+            count = anchor_counts.get(anchor, 0)
+            anchor_counts[anchor] = count + 1
+            anchors.add(f"{anchor}-{count}" if count else anchor)
+    return anchors
+
+class LinkChecker:
+    """
+    Checks internal links against the local tree and external links with a transport.
+
+    Args:
+        base_dir: The project root, which root-relative links are resolved from
+        config: The markdown-link-check config
+        transport: The transport used for external links, or None to skip them
+        cache: Cached results of external links, by URL, which is updated
+        ttl: The seconds a live link is cached for
+        per_host: The maximum number of requests to each host at once
+    """
+
+    def __init__(self, base_dir, config, transport=None, cache=None, ttl=DEFAULT_TTL_HOURS * 3600,
+                 per_host=DEFAULT_PER_HOST):
+        self.base_dir = os.path.abspath(base_dir)
+        self.transport = transport
+        self.cache = {} if cache is None else cache
+        self.ttl = ttl
+        self.per_host = per_host
+        self.ignore_patterns = [re.compile(rule["pattern"]) for rule in config.get("ignorePatterns", [])]
+        self.timeout = parse_duration(config.get("timeout"), 10)
+        self.retry_on_429 = config.get("retryOn429", False)
+        self.retry_count = config.get("retryCount", 2)
+        self.retry_delay = parse_duration(config.get("fallbackRetryDelay"), 60)
+        self.alive_codes = set(config.get("aliveStatusCodes", [200]))
+        self.anchors = {}  # path -> heading anchors, loaded as they are needed
+        self.cached_count = 0
+
+    def is_ignored(self, target):
+        return any(pattern.search(target) for pattern in self.ignore_patterns)
+
+    def file_anchors(self, path):
+        if path not in self.anchors:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.anchors[path] = heading_anchors(f.read())
+        return self.anchors[path]
+
+    def check_internal(self, source_path, target):
+        """Check a link to a file or anchor in the project, returning an error or None."""
+        path, _, anchor = target.partition('#')
+        path = unquote(path)
+        if not path:
+            resolved = source_path
+        elif path.startswith('/'):
+            resolved = os.path.join(self.base_dir, path.lstrip('/'))
+        else:
+            resolved = os.path.join(os.path.dirname(source_path), path)
+        resolved = os.path.normpath(resolved)
+        if not os.path.exists(resolved):
+            return "file not found"
+        if anchor and resolved.endswith('.md') and unquote(anchor).lower() not in self.file_anchors(resolved):
+            return f"no heading with the anchor '#{anchor}'"
+        return None
+
+    def check_references(self, source_path, content):
+        """Check that the apiUrl of each reference the generator extracts points to a guide."""
+        source_dir = os.path.relpath(os.path.dirname(source_path), self.base_dir).replace(os.sep, '/')
+        source_dir = "" if source_dir == "." else source_dir
+        errors = []
+        for reference in extract_references(content):
+            guide_file = resolve_guide_link(reference["path"], source_dir)
+            if (guide_file is None or not os.path.isfile(os.path.join(self.base_dir, "guides", guide_file))
+                    or guide_output_path(guide_file) != reference["apiUrl"]):
+                errors.append((reference["path"], f"apiUrl '{reference['apiUrl']}' is not a generated guide"))
+        return errors
+
+    async def check_external(self, urls):
+        """Check external URLs concurrently, returning the error for each broken URL."""
+        host_limits = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        now = time.time()
+
+        async def check(url):
+            cached = self.cache.get(url)
+            if cached and now - cached["checked"] < self.ttl:
+                self.cached_count += 1
+                return url, None
+            status, error = await self.fetch_status(url, host_limits[urlsplit(url).netloc.lower()])
+            if error is None:
+                self.cache[url] = {"status": status, "checked": now}
+            else:
+                self.cache.pop(url, None)
+            return url, error
+
+        results = await asyncio.gather(*(check(url) for url in urls))
+        return {url: error for url, error in results if error}
+
+    async def fetch_status(self, url, host_limit):
+        """Request a URL, retrying when rate limited, and return its status and any error."""
+        method = "HEAD"
+        attempt = 0
+        while True:
+            try:
+                # The host limit is only held for the request, not while waiting to retry
+                async with host_limit:
+                    status, retry_after = await self.transport.request(method, url, self.timeout)
+            except OSError as e:
+                return None, str(e) or type(e).__name__
+            if status in self.alive_codes:
+                return status, None
+            if status == 429 and self.retry_on_429 and attempt < self.retry_count:
+                attempt += 1
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else self.retry_delay
+                await asyncio.sleep(delay)
+                continue
+            if method == "HEAD" and status != 429:
+                # Some servers don't support HEAD requests, so they get one more chance with GET
+                method = "GET"
+                continue
+            return status, f"status {status}"
+
+    def check_files(self, paths):
+        """
+        Check the links in markdown files.
+
+        Returns:
+            A tuple of the broken links, as (path, target, error) tuples, and
+            the number of internal and external links checked
+        """
+        broken = []
+        external = defaultdict(list)  # url -> the files linking to it
+        internal_count = 0
+        for path in paths:
+            path = os.path.abspath(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            for _, target in scan_links(content):
+                if not target or self.is_ignored(target):
+                    continue
+                scheme = urlsplit(target).scheme.lower()
+                if scheme in ("http", "https"):
+                    if path not in external[target]:
+                        external[target].append(path)
+                elif not scheme:
+                    internal_count += 1
+                    error = self.check_internal(path, target)
+                    if error:
+                        broken.append((path, target, error))
+            # Only the README and the guides are turned into guides by the generator
+            if os.path.dirname(path) in (self.base_dir, os.path.join(self.base_dir, "guides")):
+                broken.extend((path, target, error) for target, error in self.check_references(path, content))
+
+        if self.transport is not None and external:
+            errors = asyncio.run(self.check_external_and_close(list(external)))
+            broken.extend((path, url, error) for url, error in errors.items() for path in external[url])
+        return broken, internal_count, len(external)
+
+    async def check_external_and_close(self, urls):
+        try:
+            return await self.check_external(urls)
+        finally:
+            await self.transport.close()
+
+def main():
+    """Check the links in the project's markdown files, or the files given."""
+    parser = argparse.ArgumentParser(description="Check the links in markdown files.")
+    parser.add_argument("paths", nargs="*", metavar="PATH",
+                        help="markdown files to check (default: every markdown file in the project)")
+    parser.add_argument("--offline", action="store_true", help="only check internal links")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, metavar="PATH",
+                        help="markdown-link-check config (default: .github/markdown-link-check-config.json)")
+    parser.add_argument("--cache", default=None, metavar="PATH",
+                        help=f"link result cache file (default: {DEFAULT_CACHE_FILENAME} in the project root)")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL_HOURS, metavar="HOURS",
+                        help=f"hours to cache live links for (default: {DEFAULT_TTL_HOURS})")
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS), default=DEFAULT_TRANSPORT,
+                        help=f"how external links are requested (default: {DEFAULT_TRANSPORT})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, metavar="N",
+                        help=f"maximum requests at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, metavar="N",
+                        help=f"maximum requests to each host at once (default: {DEFAULT_PER_HOST})")
+    args = parser.parse_args()
+
+    paths = args.paths or find_markdown_files(BASE_DIR)
+    cache_path = args.cache or os.path.join(BASE_DIR, DEFAULT_CACHE_FILENAME)
+    cache = load_link_cache(cache_path)
+    transport = None
+    if not args.offline:
+        try:
+            transport = TRANSPORTS[args.transport](args.concurrency)
+        except RuntimeError as e:
+            parser.error(f"cannot use the '{args.transport}' transport: {e}")
+
+    checker = LinkChecker(BASE_DIR, load_config(args.config), transport, cache, args.ttl * 3600, args.per_host)
+    start = time.perf_counter()
+    broken, internal_count, external_count = checker.check_files(paths)
+    elapsed = time.perf_counter() - start
+    if transport is not None:
+        save_link_cache(cache_path, cache)
+
+    external_summary = ("external links skipped" if transport is None
+                        else f"{external_count} external link(s), {checker.cached_count} cached")
+    print(f"🔗 Checked {internal_count} internal link(s) and {external_summary} "
+          f"in {len(paths)} file(s) in {elapsed:.2f}s")
+
+    if broken:
+        print("\n❌ Broken links:")
+        for path, target, error in sorted(broken):
+            print(f"   {os.path.relpath(path, BASE_DIR)}: {target} ({error})")
+        sys.exit(1)
+    print("\n✅ All links are valid.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Atomic, skip-if-unchanged writes of the generated site.
+
+Every output is written to a temporary file alongside it and then swapped
+in with os.replace, so a reader (the dev server, or a deploy step syncing the
+site) never sees a partially written file. If the new content is identical
+to the existing file the temporary file is discarded instead, so the
+existing file and its modification time are left untouched and tools such
+as rsync see nothing to do.
+
+The number of outputs written, skipped (unchanged) and removed are counted in
+output_counts. Work done in worker processes is counted with count_outputs()
+and merged into the parent's counts.
+"""
+
+import contextlib
+import filecmp
+import os
+import shutil
+from collections import Counter
+
+output_counts = Counter()
+
+# Outputs are read in chunks of this size when they are copied or compressed,
+# so that a large output is never held in memory at once
+CHUNK_SIZE = 1 << 20
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yield the content of a file as chunks of bytes."""
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+@contextlib.contextmanager
+def write_output(path, mode='w'):
+    """
+    Open an output for writing, replacing the existing file atomically once it is written.
+
+    Args:
+        path: Path of the output
+        mode: 'w' to write text (as UTF-8) or 'wb' to write bytes
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory or '.', exist_ok=True)
+    # Temporary files are dotfiles, which are not served or precompressed
+    temp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            yield f
+        if os.path.isfile(path) and filecmp.cmp(temp_path, path, shallow=False):
+            os.remove(temp_path)
+            output_counts["skipped"] += 1
+        else:
+            os.replace(temp_path, path)
+            output_counts["written"] += 1
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def remove_output(path):
+    """Remove an output file, or a directory of outputs. Returns True if anything was removed."""
+    if os.path.isdir(path):
+        output_counts["removed"] += sum(len(files) for _, _, files in os.walk(path))
+        shutil.rmtree(path)
+        return True
+    if os.path.exists(path):
+        os.remove(path)
+        output_counts["removed"] += 1
+        return True
+    return False
+
+def count_outputs(function, *args):
+    """
+    Call a function, returning its result and the counts of the outputs it wrote, skipped and removed.
+
+    This is used to run a function in a worker process and merge its counts
+    into the parent's.
+    """
+    before = Counter(output_counts)
+    result = function(*args)
+    return result, output_counts - before
+
+def format_counts():
+    """Summarise the output counts, e.g. '12 written, 340 unchanged, 2 removed'."""
+    return (f"{output_counts['written']} written, {output_counts['skipped']} unchanged, "
+            f"{output_counts['removed']} removed")
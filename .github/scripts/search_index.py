@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Full-text search index over guide sections.
+
+The generator builds an inverted index at build time and writes it next to
+api.json, so that consumers can search without fetching the whole corpus:
+
+    api/search/index.json        documents, BM25 statistics and shard count
+    api/search/shards/NN.json    term -> document frequency and postings
+
+Each posting is [document id, term frequency, [positions]]. Terms are assigned
+to shards by a stable hash, so a query only loads the shards for its terms.
+The index files are always written compactly, as they are not meant to be read
+by people.
+
+Usage: python search_index.py SITE_DIR QUERY
+"""
+
+import json
+import math
+import os
+import re
+import sys
+import zlib
+
+from output_writer import write_output
+
+SEARCH_DIR = "api/search"
+SHARD_COUNT = 16
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TERM_PATTERN = re.compile(r'\w+')
+
+def tokenize_terms(text):
+    """Split text into lowercase search terms."""
+    return TERM_PATTERN.findall(text.lower())
+
+def shard_for_term(term, shard_count):
+    """The shard number for a term, stable across runs and platforms."""
+    return zlib.crc32(term.encode('utf-8')) % shard_count
+
+def write_compact_json(path, data):
+    with write_output(path) as f:
+        json.dump(data, f, separators=(',', ':'))
+
+def build_search_index(documents, output_dir, shard_count=SHARD_COUNT):
+    """
+    Build the search index and write it to the output directory.
+
+    Args:
+        documents: Iterable of (document, text) tuples, where document is a
+            dict describing the section (guide, name, title, anchor, path)
+            that is returned in search results. Each text is only used while
+            it is indexed, so the documents can be read as they are indexed.
+        output_dir: Directory to output the generated files
+        shard_count: Number of shards to split the terms over
+    
+    Returns:
+        A tuple of the number of documents and the number of terms indexed
+    """
+    search_dir = os.path.join(output_dir, SEARCH_DIR)
+    shards_dir = os.path.join(search_dir, "shards")
+    os.makedirs(shards_dir, exist_ok=True)
+
+    postings = {}
+    indexed_documents = []
+    total_length = 0
+    for doc_id, (document, text) in enumerate(documents):
+        positions_by_term = {}
+        terms = tokenize_terms(text)
+        for position, term in enumerate(terms):
+            positions_by_term.setdefault(term, []).append(position)
+        for term, positions in positions_by_term.items():
+            postings.setdefault(term, []).append([doc_id, len(positions), positions])
+        indexed_documents.append(dict(document, length=len(terms)))
+        total_length += len(terms)
+
+    shards = [{} for _ in range(shard_count)]
+    for term in sorted(postings):
+        shards[shard_for_term(term, shard_count)][term] = {
+            "df": len(postings[term]),
+            "postings": postings[term]
+        }
+
+    for shard_number, shard in enumerate(shards):
+        write_compact_json(os.path.join(shards_dir, f"{shard_number:02d}.json"), shard)
+
+    write_compact_json(os.path.join(search_dir, "index.json"), {
+        "documentCount": len(indexed_documents),
+        "averageLength": total_length / len(indexed_documents) if indexed_documents else 0,
+        "shardCount": shard_count,
+        "k1": BM25_K1,
+        "b": BM25_B,
+        "documents": indexed_documents
+    })
+
+    return len(indexed_documents), len(postings)
+
+class SearchIndex:
+    """Queries a search index written by build_search_index, loading shards on demand."""
+
+    def __init__(self, site_dir):
+        self.search_dir = os.path.join(site_dir, SEARCH_DIR)
+        with open(os.path.join(self.search_dir, "index.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.documents = meta["documents"]
+        self.document_count = meta["documentCount"]
+        self.average_length = meta["averageLength"] or 1
+        self.shard_count = meta["shardCount"]
+        self.k1 = meta["k1"]
+        self.b = meta["b"]
+        self.shards = {}
+
+    def lookup(self, term):
+        """Return the index entry (df and postings) for a term, or None."""
+        shard_number = shard_for_term(term, self.shard_count)
+        if shard_number not in self.shards:
+            shard_path = os.path.join(self.search_dir, "shards", f"{shard_number:02d}.json")
+            with open(shard_path, 'r', encoding='utf-8') as f:
+                self.shards[shard_number] = json.load(f)
+        return self.shards[shard_number].get(term)
+
+    def search(self, query, limit=10):
+        """
+        Score the documents matching a query with BM25.
+
+        Returns:
+            List of result objects, highest score first, each with the
+            document fields (guide, name, title, anchor, path) and a score
+        """
+        scores = {}
+        for term in set(tokenize_terms(query)):
+            entry = self.lookup(term)
+            if not entry:
+                continue
+            df = entry["df"]
+            idf = math.log((self.document_count - df + 0.5) / (df + 0.5) + 1)
+            for doc_id, tf, _ in entry["postings"]:
+                length = self.documents[doc_id]["length"]
+                norm = self.k1 * (1 - self.b + self.b * length / self.average_length)
+                scores[doc_id] = scores.get(doc_id, 0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [dict(self.documents[doc_id], score=round(score, 4)) for doc_id, score in ranked]
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python search_index.py SITE_DIR QUERY")
+        sys.exit(1)
+
+    index = SearchIndex(sys.argv[1])
+    for result in index.search(" ".join(sys.argv[2:])):
+        print(f"{result['score']:8.3f}  {result['name']} > {result['title']}  ({result['path']})")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Seed the change feed's history from the published site.
+
+Each build's change feed compares it with the snapshot the previous build
+wrote (see change_feed.py), so a build in a fresh checkout needs the history
+of the site that was last published. This downloads it into the output
+directory before the build:
+
+    api/changes.json             the feed
+    api/changes/snapshot.json    the snapshot the next version is compared with
+    api/changes/FROM..TO.json    the diff of each version in the feed
+
+The published site is the only history trusted: anything already in the
+output directory (such as a cached copy from another branch) is replaced.
+If the published site predates the change feed, its api.json does not list
+the 'changes' endpoint, and there is no history to seed, so the feed starts
+with this build. Otherwise any file which cannot be downloaded is an error,
+which fails the seed with --required (as the main branch's builds are
+published) and is only a warning without it.
+
+Usage: python seed_change_feed.py SITE_URL OUTPUT_DIR [--required]
+"""
+
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+
+from change_feed import CHANGES_PATH, SNAPSHOT_PATH
+from output_writer import write_output
+
+TIMEOUT = 30
+
+class HistoryMissingError(Exception):
+    """Raised when the published site lists a change feed which cannot be downloaded."""
+
+def fetch(url):
+    """Download a file, returning None if it is not found."""
+    try:
+        with urllib.request.urlopen(url, timeout=TIMEOUT) as response:
+            return response.read()
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+
+def seed_change_feed(site_url, output_dir, fetch=fetch):
+    """
+    Download the change feed, its snapshot and diffs from the published site.
+
+    Returns:
+        The paths downloaded, or None if the published site has no change feed
+
+    Raises:
+        HistoryMissingError: if the published site lists a change feed but
+            a file of it cannot be downloaded
+    """
+    site_url = site_url.rstrip('/') + '/'
+
+    def download(path):
+        try:
+            data = fetch(site_url + path)
+        except OSError as e:
+            raise HistoryMissingError(f"could not download {site_url}{path} ({e})") from e
+        if data is None:
+            raise HistoryMissingError(f"{site_url}{path} was not found")
+        return data
+
+    api_index = json.loads(download("api.json"))
+    if "changes" not in api_index.get("endpoints", {}):
+        return None
+
+    files = {CHANGES_PATH: download(CHANGES_PATH), SNAPSHOT_PATH: download(SNAPSHOT_PATH)}
+    for entry in json.loads(files[CHANGES_PATH])["versions"]:
+        if entry["diff"]:
+            files[entry["diff"]] = download(entry["diff"])
+    for path, data in files.items():
+        with write_output(os.path.join(output_dir, path), 'wb') as f:
+            f.write(data)
+    return list(files)
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the change feed's history from the published site.")
+    parser.add_argument("site_url", metavar="SITE_URL", help="URL the site is published at")
+    parser.add_argument("output_dir", metavar="OUTPUT_DIR", help="directory the site will be generated into")
+    parser.add_argument("--required", action="store_true",
+                        help="fail if the published history cannot be downloaded, rather than warning")
+    args = parser.parse_args()
+
+    try:
+        paths = seed_change_feed(args.site_url, args.output_dir)
+    except HistoryMissingError as e:
+        if args.required:
+            print(f"❌ The change feed history is missing: {e}")
+            print("   Building without it would restart the published feed, so the build is stopped.")
+            sys.exit(1)
+        print(f"⚠️  The change feed history is missing ({e}), the feed will start again from this build.")
+        return
+    if paths is None:
+        print(f"ℹ️  {args.site_url} has no change feed yet, the feed will start with this build.")
+    else:
+        print(f"✓ Seeded the change feed from {args.site_url} ({len(paths)} files)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Related guides and sections, from the similarity of their TF-IDF vectors.
+
+Each guide and each section is weighted with TF-IDF and then hashed into a
+fixed number of features (with a hashed sign, so collisions tend to cancel
+out), so every vector has the same length however large the vocabulary is.
+Similarity is the cosine of the angle between two vectors.
+
+Every guide is compared with every other guide. Each section is compared with
+the sections of its guide's related guides, rather than with every section,
+so the number of comparisons grows with the number of sections rather than
+its square. With NumPy installed vectors are compared in batches of matrix
+products. Without it they are compared in pure Python, which is only
+practical for small corpora, so beyond PYTHON_GUIDE_LIMIT guides nothing is
+related and a warning is printed. Scores are rounded, so both give the same
+related lists other than for near ties.
+
+The results are written compactly to api/related.json, as they are not meant
+to be read by people:
+
+    guides            the path and name of each guide
+    related           for each guide, [guide index, score] of its related guides
+    sections          the path of each section
+    relatedSections   for each section, [section index, score] of its related sections
+"""
+
+import itertools
+import json
+import math
+import os
+import zlib
+from collections import Counter, defaultdict
+
+from output_writer import write_output
+from search_index import tokenize_terms
+
+try:
+    import numpy
+except ImportError:
+    # NumPy is optional, without it similarities are computed in pure Python
+    numpy = None
+
+RELATED_PATH = "api/related.json"
+
+# The number of features vectors are hashed into, a power of two
+HASH_FEATURES = 512
+
+# The number of related guides and sections kept for each guide and section
+RELATED_COUNT = 5
+
+# Documents are compared in batches of this many rows when using NumPy
+BATCH_SIZE = 256
+
+# Scores are rounded before ties are broken, so NumPy keeps candidates within
+# this much of the lowest score it keeps, rather than choosing between ties
+TIE_MARGIN = 1e-3
+
+# The most guides compared without NumPy, as every guide is compared with
+# every other in pure Python (a few seconds for this many guides)
+PYTHON_GUIDE_LIMIT = 250
+
+def hash_terms(terms, document_frequencies, document_count):
+    """The feature index and the signed inverse document frequency of each term."""
+    features = []
+    weights = []
+    for term, frequency in zip(terms, document_frequencies):
+        digest = zlib.crc32(term.encode('utf-8'))
+        features.append(digest & (HASH_FEATURES - 1))
+        sign = 1 if digest & 0x80000000 else -1
+        weights.append(sign * (math.log((1 + document_count) / (1 + frequency)) + 1))
+    return features, weights
+
+def tfidf_vectors(documents):
+    """
+    Weight the term counts of each document with TF-IDF and hash them into unit vectors.
+
+    Args:
+        documents: List of term counts, one for each document
+
+    Returns:
+        A list of sparse vectors, each a dict of feature index to weight
+    """
+    document_frequency = Counter()
+    for counts in documents:
+        document_frequency.update(counts.keys())
+    terms = list(document_frequency)
+    features = dict(zip(terms, zip(*hash_terms(terms, document_frequency.values(), len(documents)))))
+
+    vectors = []
+    for counts in documents:
+        vector = {}
+        for term, count in counts.items():
+            feature, weight = features[term]
+            vector[feature] = vector.get(feature, 0.0) + (1 + math.log(count)) * weight
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        vectors.append({feature: weight / norm for feature, weight in vector.items()} if norm else {})
+    return vectors
+
+def tfidf_rows(documents):
+    """
+    Weight the term counts of each document with TF-IDF, as compressed sparse rows of hashed features.
+
+    This is the NumPy equivalent of tfidf_vectors. The rows are normalized
+    to unit vectors when they are made dense.
+
+    Returns:
+        A tuple of NumPy arrays: the offset of each row, and the feature and
+        weight of each term in the rows
+    """
+    # Each new term is given the next id as it is looked up
+    vocabulary = defaultdict(itertools.count().__next__)
+    term_ids = []
+    counts = []
+    offsets = [0]
+    for document in documents:
+        term_ids.extend(map(vocabulary.__getitem__, document))
+        counts.extend(document.values())
+        offsets.append(len(term_ids))
+    term_ids = numpy.array(term_ids, dtype=numpy.int64)
+    # Each document's terms are distinct, so counting the term ids counts the documents with each term
+    document_frequencies = numpy.bincount(term_ids, minlength=len(vocabulary)).tolist()
+    features, weights = hash_terms(vocabulary, document_frequencies, len(documents))
+    term_weights = (1 + numpy.log(numpy.array(counts, dtype=numpy.float64))) * numpy.array(weights)[term_ids]
+    return numpy.array(offsets, dtype=numpy.int64), numpy.array(features, dtype=numpy.int64)[term_ids], term_weights
+
+def dense_rows(rows, indexes):
+    """Make some of the rows from tfidf_rows into a dense matrix of unit vectors."""
+    offsets, features, weights = rows
+    indexes = numpy.asarray(indexes, dtype=numpy.int64)
+    starts = offsets[indexes]
+    lengths = offsets[indexes + 1] - starts
+    row_numbers = numpy.repeat(numpy.arange(len(indexes)), lengths)
+    entries = numpy.arange(lengths.sum()) + numpy.repeat(starts - numpy.cumsum(lengths) + lengths, lengths)
+    # Summing by row and feature also combines the terms hashed to the same feature
+    matrix = numpy.bincount(row_numbers * HASH_FEATURES + features[entries], weights=weights[entries],
+                            minlength=len(indexes) * HASH_FEATURES).reshape(len(indexes), HASH_FEATURES)
+    norms = numpy.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return (matrix / norms).astype(numpy.float32)
+
+def top_related(documents, groups=None, count=RELATED_COUNT):
+    """
+    Find the most similar documents to each document, by the cosine similarity of their TF-IDF vectors.
+
+    Args:
+        documents: List of term counts, one for each document
+        groups: Iterable of (queries, candidates) lists of document indexes,
+            where each query is compared with each candidate. By default every
+            document is compared with every other document.
+        count: The number of related documents to keep for each document
+
+    Returns:
+        For each document, a list of [index, score] of the most similar
+        documents, highest score first. Documents with no terms in common are
+        never related.
+    """
+    if numpy is not None:
+        compared = compare_numpy(tfidf_rows(documents), len(documents), groups, count)
+    else:
+        compared = compare_python(tfidf_vectors(documents), groups)
+    related = [[] for _ in documents]
+    for query, scores in compared:
+        ranked = sorted(((round(score, 4), candidate) for candidate, score in scores
+                         if candidate != query and score > 0), key=lambda item: (-item[0], item[1]))
+        related[query] = [[candidate, score] for score, candidate in ranked[:count]]
+    return related
+
+def compare_python(vectors, groups):
+    """Yield each query and its (candidate, score) pairs, from an inverted index of the candidates."""
+    if groups is None:
+        everything = list(range(len(vectors)))
+        groups = [(everything, everything)]
+    for queries, candidates in groups:
+        postings = {}
+        for candidate in candidates:
+            for feature, weight in vectors[candidate].items():
+                postings.setdefault(feature, []).append((candidate, weight))
+        for query in queries:
+            scores = {}
+            for feature, weight in vectors[query].items():
+                for candidate, candidate_weight in postings.get(feature, ()):
+                    scores[candidate] = scores.get(candidate, 0.0) + weight * candidate_weight
+            yield query, scores.items()
+
+def compare_numpy(rows, row_count, groups, count):
+    """Yield each query and its (candidate, score) pairs, keeping only the best few of each row of products."""
+    if groups is None:
+        # Every row is a candidate, so the rows are only made dense once
+        everything = list(range(row_count))
+        matrix = dense_rows(rows, everything)
+        blocks = ((everything[start:start + BATCH_SIZE], matrix[start:start + BATCH_SIZE], everything, matrix)
+                  for start in range(0, row_count, BATCH_SIZE))
+    else:
+        blocks = ((queries, dense_rows(rows, queries), candidates, dense_rows(rows, candidates))
+                  for queries, candidates in groups if queries and candidates)
+    for queries, query_matrix, candidates, candidate_matrix in blocks:
+        similarity = query_matrix @ candidate_matrix.T
+        # One more than needed is kept, in case the query is one of its own candidates
+        keep = min(count + 1, len(candidates))
+        lowest = -numpy.partition(-similarity, keep - 1, axis=1)[:, keep - 1]
+        for row, threshold in enumerate((lowest - TIE_MARGIN).tolist()):
+            scores = similarity[row]
+            columns = numpy.flatnonzero((scores >= threshold) & (scores > 0))
+            yield queries[row], [(candidates[column], float(scores[column])) for column in columns.tolist()]
+
+def load_related_guides(output_dir):
+    """Load the related guides of each guide from a previous build, as build_related returns them, by path."""
+    try:
+        with open(os.path.join(output_dir, RELATED_PATH), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    listing = data["guides"]
+    return {guide["path"]: [dict(listing[other], score=score) for other, score in related]
+            for guide, related in zip(listing, data["related"])}
+
+def build_related(guides, output_dir):
+    """
+    Find the related guides and sections, and write them to the output directory.
+
+    Args:
+        guides: List of (guide, sections) tuples, where guide is a Guide from
+            the corpus, and sections is an iterable of
+            (path, text) tuples. Sections are read one guide at a time.
+        output_dir: Directory to output the generated files
+
+    Returns:
+        For each guide, a list of the related guides, each a dict with the
+        path, name and score of the guide
+    """
+    listing = []
+    guide_terms = []
+    section_paths = []
+    section_terms = []
+    guide_sections = []
+    for guide, sections in guides:
+        listing.append({"path": guide.path, "name": guide.name})
+        start = len(section_paths)
+        counts = Counter()
+        for path, text in sections:
+            terms = tokenize_terms(text)
+            section_paths.append(path)
+            section_terms.append(Counter(terms))
+            counts.update(terms)
+        guide_sections.append(range(start, len(section_paths)))
+        guide_terms.append(counts)
+
+    if numpy is None and len(listing) > PYTHON_GUIDE_LIMIT:
+        print(f"Warning: NumPy is not installed, so related guides are not found for more than "
+              f"{PYTHON_GUIDE_LIMIT} guides. Install numpy to find them.")
+        related_guides = [[] for _ in listing]
+        related_sections = [[] for _ in section_paths]
+    else:
+        related_guides = top_related(guide_terms)
+        del guide_terms
+
+        # Sections are only compared with the sections of their guide's related guides
+        groups = ((list(guide_sections[index]), [section for other, _ in related
+                                                 for section in guide_sections[other]])
+                  for index, related in enumerate(related_guides))
+        related_sections = top_related(section_terms, groups)
+
+    # Serialized in one go, as json.dump encodes incrementally in pure Python
+    with write_output(os.path.join(output_dir, RELATED_PATH)) as f:
+        f.write(json.dumps({
+            "features": HASH_FEATURES,
+            "guides": listing,
+            "related": related_guides,
+            "sections": section_paths,
+            "relatedSections": related_sections
+        }, separators=(',', ':')))
+
+    return [[dict(listing[other], score=score) for other, score in related] for related in related_guides]
@@ -0,0 +1,63 @@
+"""
+Shared fixtures for the generator's tests.
+
+The scripts are not a package, so their directory is put on the path as it
+is when they are run directly.
+"""
+
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+README = """# AI Developer Guide
+
+<!-- The introduction is not part of the guide -->
+
+## The Golden Rules
+
+Always write a plan before you write code, and test each change.
+
+## Language Specific Guides
+
+- [Python](./guides/python.md)
+- [Make](./guides/make.md)
+"""
+
+GUIDES = {
+    "python.md": """# Python
+
+Use virtual environments and pin dependencies.
+
+## Testing
+
+Run the tests with pytest before every commit.
+""",
+    "make.md": """# Make
+
+Use a makefile as the entry point for common tasks, see [Python](./python.md).
+
+## Help
+
+Every target should have a help comment.
+""",
+}
+
+@pytest.fixture
+def project(tmp_path):
+    """A small project with a README, two guides and a version, returning the path of the README."""
+    project_dir = tmp_path / "project"
+    guides_dir = project_dir / "guides"
+    guides_dir.mkdir(parents=True)
+    (project_dir / "README.md").write_text(README, encoding="utf-8")
+    (project_dir / "version.txt").write_text("1.0.0\n", encoding="utf-8")
+    for filename, content in GUIDES.items():
+        (guides_dir / filename).write_text(content, encoding="utf-8")
+    return str(project_dir / "README.md")
+
+@pytest.fixture
+def output_dir(tmp_path):
+    return str(tmp_path / "site")
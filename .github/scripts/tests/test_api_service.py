@@ -0,0 +1,88 @@
+"""Tests for the query service over a generated site."""
+
+import http.client
+import json
+import os
+import shutil
+import threading
+
+import pytest
+
+import api_service
+import generate_json
+
+@pytest.fixture
+def site(project, output_dir):
+    generate_json.create_guide_json(project, output_dir)
+    return output_dir
+
+@pytest.fixture
+def server(site):
+    server = api_service.ApiHTTPServer((api_service.DEFAULT_HOST, 0), api_service.ApiService(site))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def get(server, path):
+    connection = http.client.HTTPConnection(*server.server_address)
+    try:
+        connection.request("GET", path)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+def rebuild(project, output_dir, guide_name, content):
+    """Write a guide and rebuild the site."""
+    with open(os.path.join(os.path.dirname(project), "guides", guide_name), "w", encoding="utf-8") as f:
+        f.write(content)
+    generate_json.create_guide_json(project, output_dir)
+    # File times can be coarser than the time between builds, so the outputs
+    # the service checks are moved forward to be sure they look changed
+    for path in ("api.json", "api/search/index.json", "api/guides/languages/python.json"):
+        path = os.path.join(output_dir, path)
+        mtime = os.stat(path).st_mtime_ns + 1_000_000_000
+        os.utime(path, ns=(mtime, mtime))
+
+def test_search_limit_must_be_positive(server):
+    assert get(server, "/search?q=pytest&limit=1")[0] == 200
+    for limit in ("0", "-1", "ten"):
+        status, body = get(server, f"/search?q=pytest&limit={limit}")
+        assert status == 400
+        assert "limit" in body["error"]
+
+def test_listens_on_localhost_by_default():
+    assert api_service.DEFAULT_HOST == "127.0.0.1"
+
+def test_rebuilt_site_is_served_without_restarting(project, site, server):
+    assert get(server, "/guides/python")[0] == 200
+    assert get(server, "/guides/docker")[0] == 404
+    assert get(server, "/search?q=containers")[1] == []
+
+    rebuild(project, site, "docker.md", "# Docker\n\nRun containers with a health check.\n")
+    assert get(server, "/guides/docker")[0] == 200
+    assert get(server, "/search?q=containers")[1][0]["name"] == "Docker"
+
+def test_changed_guides_are_not_served_from_the_cache(project, site):
+    service = api_service.ApiService(site)
+    assert "virtual environments" in service.get_guide("python")["content"]
+    rebuild(project, site, "python.md", "# Python\n\nUse uv to manage projects.\n")
+    assert "Use uv" in service.get_guide("python")["content"]
+
+def test_missing_documents_are_not_found(site, server):
+    assert get(server, "/guides/python/sections/testing")[0] == 200
+    os.remove(os.path.join(site, "api/guides/languages/python/sections/testing.json"))
+    os.remove(os.path.join(site, "api/guides/patterns/make.json"))
+    status, body = get(server, "/guides/python/sections/testing")
+    assert status == 404 and "testing" in body["error"]
+    assert get(server, "/guides/make")[0] == 404
+    # The server keeps serving after the errors
+    assert get(server, "/guides/python")[0] == 200
+
+def test_missing_search_index_is_unavailable(site, server):
+    shutil.rmtree(os.path.join(site, "api/search"))
+    status, body = get(server, "/search?q=pytest")
+    assert status == 503
+    assert "search index" in body["error"]
@@ -0,0 +1,39 @@
+"""Tests for the benchmark harness, run against tiny synthetic corpora."""
+
+import json
+import sys
+
+import benchmark
+
+STAGES = ["extract_references", "build_guide", "create_guide_json", "create_guide_json_incremental_noop",
+          "create_index_html", "generate_api_index", "create_search_index", "create_reference_graph",
+          "create_related_guides", "create_context_packs", "create_change_feed"]
+
+def run_benchmark(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["benchmark.py", *args])
+    benchmark.main()
+
+def test_every_stage_is_measured_for_each_size(monkeypatch, tmp_path, capsys):
+    results_path = tmp_path / "results" / "benchmark.json"
+    run_benchmark(monkeypatch, "--sizes", "2,5", "--output", str(results_path))
+    with open(results_path, encoding="utf-8") as f:
+        results = json.load(f)
+    assert list(results["corpora"]) == ["2", "5"]
+    for stages in results["corpora"].values():
+        assert list(stages) == STAGES
+        assert all(stage["seconds"] >= 0 and stage["peakBytes"] > 0 for stage in stages.values())
+    assert "Synthesized 5 guides" in capsys.readouterr().out
+
+    run_benchmark(monkeypatch, "--sizes", "2", "--output", str(tmp_path / "again.json"),
+                  "--compare", str(results_path))
+    output = capsys.readouterr().out
+    assert "📈 Compared with" in output
+    assert sum("create_search_index" in line and "time" in line for line in output.splitlines()) == 1
+
+def test_synthetic_corpus_is_reproducible(tmp_path):
+    benchmark.synthesize_corpus(str(tmp_path / "first"), 4)
+    benchmark.synthesize_corpus(str(tmp_path / "second"), 4)
+    first = sorted(path.relative_to(tmp_path / "first") for path in (tmp_path / "first").rglob("*.md"))
+    assert len(first) == 5
+    for path in first:
+        assert (tmp_path / "first" / path).read_bytes() == (tmp_path / "second" / path).read_bytes()
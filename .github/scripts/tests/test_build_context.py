@@ -0,0 +1,43 @@
+"""Tests for the dates the BuildContext takes from git history."""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+import generate_json
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+def git(cwd, *args, date=None):
+    env = dict(os.environ, GIT_AUTHOR_NAME="Test", GIT_AUTHOR_EMAIL="test@example.com",
+               GIT_COMMITTER_NAME="Test", GIT_COMMITTER_EMAIL="test@example.com")
+    if date:
+        env.update(GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+    subprocess.run(["git", *args], cwd=cwd, env=env, check=True, capture_output=True)
+
+@pytest.fixture
+def repository(project):
+    """The project committed in two commits: the README and python.md, then make.md."""
+    project_dir = os.path.dirname(project)
+    git(project_dir, "init", "-q")
+    git(project_dir, "add", "README.md", "version.txt", "guides/python.md")
+    git(project_dir, "commit", "-q", "-m", "first", date="2024-01-01T12:00:00Z")
+    git(project_dir, "add", "guides/make.md")
+    git(project_dir, "commit", "-q", "-m", "second", date="2026-05-05T12:00:00Z")
+    return project_dir
+
+def test_dates_are_from_the_last_commit_to_each_file(repository, capsys):
+    context = generate_json.BuildContext(os.path.join(repository, "README.md"))
+    assert context.last_updated(os.path.join(repository, "guides", "python.md")) == "2024-01-01"
+    assert context.last_updated(os.path.join(repository, "guides", "make.md")) == "2026-05-05"
+    assert context.updated == "2026-05-05"
+    assert "shallow" not in capsys.readouterr().out
+
+def test_shallow_clone_is_warned_about(repository, tmp_path, capsys):
+    clone_dir = tmp_path / "clone"
+    git(tmp_path, "clone", "-q", "--depth", "1", f"file://{repository}", str(clone_dir))
+    context = generate_json.BuildContext(str(clone_dir / "README.md"))
+    context.last_updated(str(clone_dir / "guides" / "python.md"))
+    assert "shallow git clone" in capsys.readouterr().out
@@ -0,0 +1,57 @@
+"""Tests for the build's timing spans and Chrome trace output."""
+
+import json
+import os
+
+import pytest
+
+import build_trace
+import generate_json
+from build_trace import BuildTrace, activate, span
+
+def test_spans_nest_within_their_parents():
+    trace = BuildTrace()
+    with activate(trace):
+        with span("build", guides=2):
+            with span("build_guide", guide="python"):
+                pass
+            with pytest.raises(ValueError), span("build_guide", guide="make"):
+                raise ValueError("failed spans are still recorded")
+    # Spans are recorded as they end, so children come before their parent
+    inner, failed, outer = trace.events
+    assert [event["name"] for event in trace.events] == ["build_guide", "build_guide", "build"]
+    assert (inner["args"], failed["args"], outer["args"]) == ({"guide": "python"}, {"guide": "make"}, {"guides": 2})
+    for child in (inner, failed):
+        assert outer["ts"] <= child["ts"]
+        assert child["ts"] + child["dur"] <= outer["ts"] + outer["dur"]
+    assert inner["ts"] + inner["dur"] <= failed["ts"]
+    assert dict(trace.summary())["build_guide"][1] == 2
+
+def test_spans_are_not_recorded_without_a_trace():
+    assert not build_trace.is_active()
+    with span("build"):
+        pass
+    trace = BuildTrace()
+    with activate(trace):
+        assert build_trace.is_active()
+    assert not build_trace.is_active()
+    assert trace.events == []
+
+def test_trace_is_written_as_chrome_trace_events(project, output_dir, tmp_path):
+    trace = BuildTrace()
+    with activate(trace):
+        generate_json.create_guide_json(project, output_dir, jobs=2)
+    trace_path = tmp_path / "trace.json"
+    trace.write(str(trace_path))
+
+    with open(trace_path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["displayTimeUnit"] == "ms"
+    events = data["traceEvents"]
+    assert all(event["ph"] == "X" and isinstance(event["ts"], int) and isinstance(event["dur"], int)
+               and {"name", "pid", "tid", "args"} <= set(event) for event in events)
+    # Guides are built in worker processes, whose spans are merged into the trace
+    guide_events = [event for event in events if event["name"] == "build_guide"]
+    assert len(guide_events) == 2
+    assert all(event["pid"] != os.getpid() for event in guide_events)
+    assert {"search_index", "change_feed"} <= {event["name"] for event in events}
@@ -0,0 +1,44 @@
+"""Tests for the bundle of the generated API, and the precompressed siblings of the outputs."""
+
+import gzip
+import json
+import os
+
+import generate_json
+from bundle import BundleReader, write_bundle
+
+def test_bundle_round_trip(tmp_path):
+    records = {"api.json": b'{"guides": {}}', "empty.json": b"", "large.json": os.urandom(3 << 20)}
+    for key, data in records.items():
+        (tmp_path / key).write_bytes(data)
+    bundle_path = str(tmp_path / "bundle.bin")
+    write_bundle(bundle_path, [(key, str(tmp_path / key)) for key in records])
+    with BundleReader(bundle_path) as reader:
+        assert reader.keys() == list(records)
+        for key, data in records.items():
+            assert reader.get(key) == data
+        assert reader.get_json("api.json") == {"guides": {}}
+
+def test_bundle_holds_the_generated_guides(project, output_dir):
+    generate_json.create_guide_json(project, output_dir, bundle=True)
+    with BundleReader(os.path.join(output_dir, generate_json.BUNDLE_PATH)) as reader:
+        # The guides follow the API index and the main guide, in source order
+        assert reader.keys() == ["api.json", "api/guide.json", "api/guides/patterns/make.json",
+                                 "api/guides/languages/python.json"]
+        for key in reader.keys():
+            with open(os.path.join(output_dir, key), "rb") as f:
+                assert reader.get(key) == f.read()
+
+def test_precompressed_outputs_match_the_outputs(tmp_path):
+    data = os.urandom(3 << 20)
+    (tmp_path / "large.json").write_bytes(data)
+    generate_json.precompress_outputs(str(tmp_path))
+    compressed = (tmp_path / "large.json.gz").read_bytes()
+    assert gzip.decompress(compressed) == data
+    # The header has no timestamp, so compressing the same output again gives the same bytes
+    assert compressed[4:8] == b"\x00\x00\x00\x00"
+    os.remove(tmp_path / "large.json.gz")
+    generate_json.precompress_outputs(str(tmp_path))
+    assert (tmp_path / "large.json.gz").read_bytes() == compressed
+    etags = json.loads((tmp_path / generate_json.ETAGS_FILENAME).read_text(encoding="utf-8"))
+    assert etags == {"large.json": generate_json.content_etag(data)}
@@ -0,0 +1,62 @@
+"""Tests for the change feed of the guides added, modified and removed in each version."""
+
+import json
+import os
+
+import generate_json
+
+def read_json(output_dir, path):
+    with open(os.path.join(output_dir, path), encoding="utf-8") as f:
+        return json.load(f)
+
+def release(project, version):
+    with open(os.path.join(os.path.dirname(project), "version.txt"), "w", encoding="utf-8") as f:
+        f.write(f"{version}\n")
+
+def test_first_build_records_every_guide(project, output_dir):
+    generate_json.create_guide_json(project, output_dir)
+    feed = read_json(output_dir, generate_json.CHANGES_PATH)
+    assert feed["latest"] == "1.0.0"
+    [entry] = feed["versions"]
+    assert entry["from"] is None and entry["diff"] is None
+    assert entry["added"] == ["api/guide.json", "api/guides/languages/python.json", "api/guides/patterns/make.json"]
+
+def test_new_version_diffs_the_sections_changed(project, output_dir):
+    generate_json.create_guide_json(project, output_dir)
+    guides_dir = os.path.join(os.path.dirname(project), "guides")
+    with open(os.path.join(guides_dir, "python.md"), "a", encoding="utf-8") as f:
+        f.write("Use coverage reports.\n\n## Typing\n\nAdd type hints.\n")
+    os.remove(os.path.join(guides_dir, "make.md"))
+    with open(os.path.join(guides_dir, "docker.md"), "w", encoding="utf-8") as f:
+        f.write("# Docker\n\nPin base images.\n")
+    release(project, "1.1.0")
+    generate_json.create_guide_json(project, output_dir)
+
+    feed = read_json(output_dir, generate_json.CHANGES_PATH)
+    entry = feed["versions"][0]
+    assert [version["version"] for version in feed["versions"]] == ["1.1.0", "1.0.0"]
+    assert entry["from"] == "1.0.0"
+    assert entry["added"] == ["api/guides/others/docker.json"]
+    # The README is unchanged, so the main guide is too
+    assert entry["modified"] == ["api/guides/languages/python.json"]
+    assert entry["removed"] == ["api/guides/patterns/make.json"]
+    assert entry["sections"]["api/guides/languages/python.json"] == {
+        "added": ["typing"], "modified": ["testing"], "removed": []}
+
+    diff = read_json(output_dir, entry["diff"])
+    assert (diff["from"], diff["to"]) == ("1.0.0", "1.1.0")
+    assert diff["removed"] == ["api/guides/patterns/make.json"]
+    python = diff["guides"]["api/guides/languages/python.json"]
+    assert [section["anchor"] for section in python["sections"]] == ["typing", "testing"]
+    assert "coverage reports" in python["sections"][1]["content"]
+    assert diff["guides"]["api/guides/others/docker.json"]["sections"][0]["content"].startswith("# Docker")
+
+def test_unchanged_rebuild_of_a_version_reports_no_changes(project, output_dir):
+    generate_json.create_guide_json(project, output_dir)
+    release(project, "1.1.0")
+    generate_json.create_guide_json(project, output_dir)
+    generate_json.create_guide_json(project, output_dir)
+    feed = read_json(output_dir, generate_json.CHANGES_PATH)
+    entry = feed["versions"][0]
+    assert [version["version"] for version in feed["versions"]] == ["1.1.0", "1.0.0"]
+    assert (entry["added"], entry["modified"], entry["removed"]) == ([], [], [])
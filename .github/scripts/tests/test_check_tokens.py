@@ -0,0 +1,140 @@
+"""Tests for the token check: its tokenizer backends, report and budgets."""
+
+import json
+import sys
+
+import pytest
+
+import check_tokens
+
+def write_config(path, models, budgets=None):
+    path.write_text(json.dumps({"models": models, "budgets": budgets or {}}), encoding="utf-8")
+    return str(path)
+
+class CountingTokenizer:
+    """Counts characters, recording each batch it is asked to tokenize."""
+
+    id = "counting"
+
+    def __init__(self):
+        self.batches = []
+
+    def count_batch(self, contents):
+        self.batches.append(list(contents))
+        return [len(content) for content in contents]
+
+def write_word_tokenizer(path):
+    """Save a tokenizer.json which splits on whitespace and knows a few words."""
+    tokenizers = pytest.importorskip("tokenizers")
+    vocab = {"[UNK]": 0, "use": 1, "the": 2, "tests": 3}
+    tokenizer = tokenizers.Tokenizer(tokenizers.models.WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    tokenizer.save(str(path))
+    return str(path)
+
+def test_backends_are_registered_by_name(monkeypatch, tmp_path):
+    monkeypatch.setitem(check_tokens.TOKENIZER_BACKENDS, "fixed", None)
+
+    @check_tokens.register_backend("fixed")
+    def load_fixed(model_config, config_dir):
+        return check_tokens.ApproximateTokenizer(model_config["scale"])
+
+    tokenizer, is_fallback = check_tokens.load_tokenizer("model", {"backend": "fixed", "scale": 2}, str(tmp_path))
+    assert not is_fallback
+    assert tokenizer.count_batch(["one two three"]) == [check_tokens.estimate_tokens("one two three") * 2]
+    with pytest.raises(ValueError, match="Unknown tokenizer backend 'missing'"):
+        check_tokens.load_tokenizer("model", {"backend": "missing"}, str(tmp_path))
+
+def test_huggingface_backend_counts_exactly(tmp_path):
+    write_word_tokenizer(tmp_path / "words.json")
+    tokenizer, is_fallback = check_tokens.load_tokenizer(
+        "words", {"backend": "huggingface", "path": "words.json"}, str(tmp_path))
+    assert not is_fallback
+    assert tokenizer.count_batch(["use the tests", "unknown", ""]) == [3, 1, 0]
+    assert tokenizer.id.startswith("huggingface:")
+
+def test_missing_vocabulary_falls_back_to_the_estimator(tmp_path, capsys):
+    tokenizer, is_fallback = check_tokens.load_tokenizer(
+        "gpt2", {"backend": "huggingface", "path": "tokenizers/missing.json", "scale": 1.5}, str(tmp_path))
+    assert is_fallback
+    assert isinstance(tokenizer, check_tokens.ApproximateTokenizer) and tokenizer.scale == 1.5
+    assert "using the approximate estimator" in capsys.readouterr().out
+
+def test_cached_counts_are_not_tokenized_again():
+    tokenizer = CountingTokenizer()
+    cache = {}
+    assert check_tokens.count_tokens(tokenizer, ["one", "three"], cache) == ([3, 5], 2)
+    assert check_tokens.count_tokens(tokenizer, ["three", "seven", "one"], cache) == ([5, 5, 3], 1)
+    assert tokenizer.batches == [["one", "three"], ["seven"]]
+    assert check_tokens.count_tokens(tokenizer, ["one"], cache) == ([3], 0)
+    assert len(tokenizer.batches) == 2
+
+def test_table_is_drawn_without_tabulate(monkeypatch):
+    # A None entry makes the import fail, as if tabulate was not installed
+    monkeypatch.setitem(sys.modules, "tabulate", None)
+    table = check_tokens.format_table([["README.md", 120, 8000], ["TOTAL", 120, None]],
+                                      ["File", "gpt2", "Budget"])
+    assert table.splitlines() == [
+        "+-----------+------+--------+",
+        "| File      | gpt2 | Budget |",
+        "+===========+======+========+",
+        "| README.md | 120  | 8000   |",
+        "| TOTAL     | 120  |        |",
+        "+-----------+------+--------+",
+    ]
+
+def run_check(monkeypatch, project_dir, config_path, *args):
+    monkeypatch.setattr(check_tokens, "BASE_DIR", str(project_dir))
+    monkeypatch.setattr(sys, "argv", ["check_tokens.py", "--config", config_path,
+                                      "--cache", str(project_dir / "cache.json"), *args])
+    check_tokens.main()
+
+def test_files_over_budget_fail_the_check(monkeypatch, tmp_path, capsys):
+    (tmp_path / "guides").mkdir()
+    (tmp_path / "README.md").write_text("# Guide\n\nShort.\n", encoding="utf-8")
+    long_guide = "# Long\n\n" + "word " * 100
+    (tmp_path / "guides" / "long.md").write_text(long_guide, encoding="utf-8")
+    config = write_config(tmp_path / "models.json", {"estimate": {"backend": "approximate"}},
+                          {"README.md": 100, "guides/*.md": 50})
+    with pytest.raises(SystemExit) as exit_info:
+        run_check(monkeypatch, tmp_path, config)
+    assert exit_info.value.code == 1
+    output = capsys.readouterr().out
+    assert f"guides/long.md: {check_tokens.estimate_tokens(long_guide)} tokens, budget is 50" in output
+    assert "README.md:" not in output.split("over their token budget")[1]
+
+def test_files_within_budget_pass_the_check(monkeypatch, tmp_path, capsys):
+    (tmp_path / "README.md").write_text("# Guide\n\nShort.\n", encoding="utf-8")
+    config = write_config(tmp_path / "models.json", {"estimate": {"backend": "approximate"}}, {"README.md": 100})
+    run_check(monkeypatch, tmp_path, config)
+    assert "All files are within their token budgets" in capsys.readouterr().out
+
+def test_models_are_reported_side_by_side(monkeypatch, tmp_path, capsys):
+    (tmp_path / "README.md").write_text("use the tests\n", encoding="utf-8")
+    write_word_tokenizer(tmp_path / "words.json")
+    config = write_config(tmp_path / "models.json", {
+        "words": {"backend": "huggingface", "path": "words.json"},
+        "estimate": {"backend": "approximate"},
+        "gpt2": {"backend": "huggingface", "path": "missing.json"}})
+    run_check(monkeypatch, tmp_path, config)
+    output = capsys.readouterr().out
+    header = next(line for line in output.splitlines() if line.startswith("| File"))
+    assert [cell.strip() for cell in header.strip("|").split("|")] == [
+        "File", "words", "estimate", "gpt2 (approx)", "Budget"]
+
+def test_unused_counts_are_pruned_from_the_cache(monkeypatch, tmp_path, capsys):
+    (tmp_path / "README.md").write_text("# Guide\n\nShort.\n\n## Usage\n\nRun it.\n", encoding="utf-8")
+    config = write_config(tmp_path / "models.json", {"estimate": {"backend": "approximate"}})
+    stale = {"approximate:1.0": {"old-content": 10}, "removed-model": {"old-content": 10}}
+    (tmp_path / "cache.json").write_text(json.dumps(stale), encoding="utf-8")
+    run_check(monkeypatch, tmp_path, config, "--sections")
+    cache = json.loads((tmp_path / "cache.json").read_text(encoding="utf-8"))
+    # The file and its two sections are cached, and nothing else
+    assert list(cache) == ["approximate:1.0"]
+    assert len(cache["approximate:1.0"]) == 3 and "old-content" not in cache["approximate:1.0"]
+    assert "tokenized 3 of 3" in capsys.readouterr().out
+
+    run_check(monkeypatch, tmp_path, config, "--sections")
+    output = capsys.readouterr().out
+    assert "tokenized 0 of 3" in output
+    assert "  README.md#usage" in output
@@ -0,0 +1,31 @@
+"""Tests for the in-memory model of the guides in a build."""
+
+import json
+import os
+
+import generate_json
+from corpus import Corpus, load_sections
+
+def test_corpus_from_manifest_entries(project, output_dir):
+    generate_json.create_guide_json(project, output_dir, incremental=True)
+    manifest = generate_json.load_manifest(output_dir)
+    corpus = Corpus.from_entries(manifest["guides"].values(), generate_json.GUIDE_TYPE_ORDER)
+    # Manifest entries also hold the hash and date of each guide's source
+    assert [guide.to_entry() for guide in corpus] == [
+        {key: entry[key] for key in ("name", "type", "path")} for entry in manifest["guides"].values()]
+    assert set(corpus.by_name) == {"make", "python"}
+    # Languages are listed before patterns in the site index
+    assert [guide.key for guide in corpus.index_order] == ["python", "make"]
+    assert corpus.all_guides[0] is corpus.main_guide
+
+def test_sections_are_loaded_from_the_section_index(project, output_dir):
+    generate_json.create_guide_json(project, output_dir)
+    corpus = Corpus.from_entries(generate_json.load_manifest(output_dir)["guides"].values(),
+                                 generate_json.GUIDE_TYPE_ORDER)
+    guide = corpus.by_name["python"]
+    with open(os.path.join(output_dir, guide.section_index), encoding="utf-8") as f:
+        index = json.load(f)
+    sections = load_sections(output_dir, guide)
+    assert [(section.anchor, section.hash) for section in sections] == [
+        (entry["anchor"], entry["hash"]) for entry in index["sections"]]
+    assert all(section.guide == guide.path for section in sections)
@@ -0,0 +1,323 @@
+"""Tests for the dev server's in-process rebuilds and its HTTP server."""
+
+import functools
+import gzip
+import http.client
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("watchdog")
+
+import dev_server  # noqa: E402
+
+def script_modules():
+    """The imported modules of the generator, by name."""
+    return {name: module for name, module in sys.modules.items()
+            if getattr(module, "__file__", None)
+            and os.path.dirname(os.path.abspath(module.__file__)) == dev_server.generate_json.SCRIPTS_DIR}
+
+@pytest.fixture
+def regenerator(project, output_dir):
+    # The generator modules are re-imported by some rebuilds, so the originals
+    # are put back for the other tests
+    modules = script_modules()
+    regenerator = dev_server.SiteRegenerator(project, output_dir)
+    regenerator.rebuild_site()
+    yield regenerator
+    for name in script_modules():
+        del sys.modules[name]
+    sys.modules.update(modules)
+
+def test_guide_change_only_rebuilds_that_guide(regenerator, project, capsys):
+    capsys.readouterr()
+    guide_path = os.path.join(os.path.dirname(project), "guides", "python.md")
+    regenerator.rebuild_site({guide_path})
+    output = capsys.readouterr().out
+    assert "✓ Created api/guides/languages/python.json" in output
+    assert "make.json" not in output
+
+def test_helper_module_change_reloads_the_generator(regenerator, capsys):
+    capsys.readouterr()
+    search_index = sys.modules["search_index"]
+    regenerator.rebuild_site({os.path.join(regenerator.scripts_dir, "search_index.py")})
+    output = capsys.readouterr().out
+    assert "Reloading the generator, search_index.py changed" in output
+    assert "Nothing to rebuild" not in output
+    # The helper is imported afresh, and every guide is rebuilt with it
+    assert sys.modules["search_index"] is not search_index
+    assert regenerator.generator.build_search_index is sys.modules["search_index"].build_search_index
+    assert "✓ Created api/guides/languages/python.json" in output
+    assert "✓ Created api/guides/patterns/make.json" in output
+
+def test_site_build_after_dev_edits_is_not_stale(project, output_dir, capsys):
+    # A dev server edit that is later reverted must not survive an incremental site build
+    generate_json = dev_server.generate_json
+    generate_json.create_guide_json(project, output_dir, incremental=True)
+    guide_path = os.path.join(os.path.dirname(project), "guides", "python.md")
+    with open(guide_path, encoding="utf-8") as f:
+        original = f.read()
+    regenerator = dev_server.SiteRegenerator(project, output_dir)
+    with open(guide_path, "a", encoding="utf-8") as f:
+        f.write("\nDEV EDIT\n")
+    regenerator.rebuild_site({guide_path})
+    assert not os.path.exists(os.path.join(output_dir, generate_json.MANIFEST_FILENAME))
+
+    with open(guide_path, "w", encoding="utf-8") as f:
+        f.write(original)
+    generate_json.create_guide_json(project, output_dir, incremental=True)
+    with open(os.path.join(output_dir, "api/guides/languages/python.json"), encoding="utf-8") as f:
+        assert "DEV EDIT" not in f.read()
+
+def test_full_build_removes_guides_deleted_while_stopped(project, output_dir, capsys):
+    dev_server.generate_json.create_guide_json(project, output_dir)
+    os.remove(os.path.join(os.path.dirname(project), "guides", "make.md"))
+    capsys.readouterr()
+    dev_server.SiteRegenerator(project, output_dir).rebuild_site()
+    assert "✓ Removed api/guides/patterns/make.json" in capsys.readouterr().out
+    assert not os.path.exists(os.path.join(output_dir, "api/guides/patterns/make.json"))
+    assert not os.path.exists(os.path.join(output_dir, "api/guides/patterns/make"))
+    assert os.path.exists(os.path.join(output_dir, "api/guides/languages/python.json"))
+
+def edit_guide(project, old, new):
+    guide_path = os.path.join(os.path.dirname(project), "guides", "python.md")
+    with open(guide_path, encoding="utf-8") as f:
+        content = f.read()
+    assert old in content
+    with open(guide_path, "w", encoding="utf-8") as f:
+        f.write(content.replace(old, new, 1))
+    return guide_path
+
+def test_whole_corpus_stages_are_deferred(regenerator, project, output_dir, capsys):
+    search_path = os.path.join(output_dir, regenerator.generator.SEARCH_DIR)
+    search_mtime = os.path.getmtime(search_path)
+    capsys.readouterr()
+    guide_path = edit_guide(project, "pin dependencies.", "pin dependencies with zebra.")
+    regenerator.rebuild_site({guide_path})
+    assert "Site rebuilt successfully" in capsys.readouterr().out
+    assert regenerator.stale_stages == set(dev_server.AGGREGATE_STAGES)
+
+    regenerator.rebuild_aggregates()
+    assert "Updated the search index, reference graph, related guides" in capsys.readouterr().out
+    assert not regenerator.stale_stages
+    with open(os.path.join(output_dir, "api/changes.json"), encoding="utf-8") as f:
+        assert "python" in f.read()
+    assert os.path.getmtime(search_path) >= search_mtime
+
+def test_edit_keeping_the_terms_skips_the_term_stages(regenerator, project, capsys):
+    guide_path = edit_guide(project, "pin dependencies.", "pin *dependencies*!")
+    regenerator.rebuild_site({guide_path})
+    assert regenerator.stale_stages == {"context_packs", "change_feed"}
+    capsys.readouterr()
+    regenerator.rebuild_aggregates()
+    assert "Updated the context packs, change feed" in capsys.readouterr().out
+
+def test_worker_defers_the_whole_corpus_stages_until_changes_settle(regenerator, project, output_dir):
+    search_dir = os.path.join(output_dir, regenerator.generator.SEARCH_DIR)
+    rebuilds = queue.Queue()
+
+    def on_rebuilt():
+        # The terms of the search index, which is sharded over several files
+        index = ""
+        for root, _, files in os.walk(search_dir):
+            for filename in sorted(name for name in files if name.endswith(".json")):
+                with open(os.path.join(root, filename), encoding="utf-8") as f:
+                    index += f.read()
+        rebuilds.put((time.monotonic(), index))
+
+    regenerator.on_rebuilt = on_rebuilt
+    regenerator.debounce_delay = 0.05
+    regenerator.aggregate_delay = 0.5
+    regenerator.start()
+    try:
+        regenerator.queue_change(edit_guide(project, "pin dependencies.", "pin dependencies with zebra."))
+        _, index = rebuilds.get(timeout=10)
+        assert "zebra" not in index
+        # A change while the stages wait postpones them again
+        time.sleep(0.1)
+        regenerator.queue_change(edit_guide(project, "zebra", "zebra and yak"))
+        changed = time.monotonic()
+        _, index = rebuilds.get(timeout=10)
+        assert "yak" not in index
+        rebuilt, index = rebuilds.get(timeout=10)
+        assert "zebra" in index and "yak" in index
+        assert rebuilt - changed >= regenerator.aggregate_delay
+        assert not regenerator.stale_stages
+        time.sleep(0.3)
+        assert rebuilds.empty()
+    finally:
+        regenerator.stop()
+
+@pytest.fixture
+def http_server(monkeypatch, output_dir):
+    """The dev server's HTTP server over the output directory, with its asset cache as 'asset_cache'."""
+    # Each test gets its own reload channel and request statistics
+    handler_class = dev_server.LiveReloadHTTPRequestHandler
+    monkeypatch.setattr(handler_class, "reload_channel", dev_server.ReloadChannel())
+    monkeypatch.setattr(handler_class, "request_stats", dev_server.RequestStats())
+    os.makedirs(output_dir, exist_ok=True)
+    asset_cache = dev_server.AssetCache(output_dir)
+    handler = functools.partial(handler_class, directory=output_dir, asset_cache=asset_cache)
+    server = dev_server.DevHTTPServer(("127.0.0.1", 0), handler)
+    server.asset_cache = asset_cache
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def connect(server):
+    return http.client.HTTPConnection(*server.server_address, timeout=5)
+
+def read_event(response):
+    """Read the lines of the next server-sent event or comment."""
+    lines = []
+    while (line := response.fp.readline().decode()) != "\n":
+        lines.append(line.rstrip("\n"))
+    return lines
+
+def test_rebuilds_are_broadcast_to_every_client(http_server, monkeypatch):
+    monkeypatch.setattr(dev_server.LiveReloadHTTPRequestHandler, "keep_alive_interval", 0.1)
+    clients = [connect(http_server) for _ in range(2)]
+    responses = []
+    for client in clients:
+        client.request("GET", "/live-reload")
+        response = client.getresponse()
+        assert response.getheader("Content-Type") == "text/event-stream"
+        # Each client is sent the current generation on connect
+        assert read_event(response) == ["event: reload", "data: 0"]
+        responses.append(response)
+
+    # Idle streams are kept open with comments
+    assert all(read_event(response) == [": keep-alive"] for response in responses)
+    dev_server.LiveReloadHTTPRequestHandler.reload_channel.publish()
+    for response in responses:
+        while (event := read_event(response)) == [": keep-alive"]:
+            pass
+        assert event == ["event: reload", "data: 1"]
+    for client in clients:
+        client.close()
+
+@pytest.fixture
+def site(http_server, project, output_dir):
+    """The HTTP server over a site built with precompressed outputs, each with a .br sibling."""
+    dev_server.generate_json.create_guide_json(project, output_dir, precompress=True)
+    # The brotli siblings are stand-ins, so the choice of encoding doesn't depend on brotli
+    for root, _, files in os.walk(output_dir):
+        for filename in files:
+            if filename.endswith(".gz"):
+                with open(os.path.join(root, filename[:-3] + ".br"), "wb") as f:
+                    f.write(b"brotli " + filename[:-3].encode())
+    http_server.asset_cache.refresh()
+    return http_server
+
+def get(server, path, **headers):
+    connection = connect(server)
+    try:
+        connection.request("GET", path, headers={name.replace("_", "-"): value for name, value in headers.items()})
+        response = connection.getresponse()
+        return response, response.read()
+    finally:
+        connection.close()
+
+def read_output(output_dir, path):
+    with open(os.path.join(output_dir, path), "rb") as f:
+        return f.read()
+
+def test_preferred_accepted_encoding_is_served(site, output_dir):
+    original = read_output(output_dir, "api.json")
+    response, body = get(site, "/api.json", Accept_Encoding="gzip")
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert gzip.decompress(body) == original
+
+    response, body = get(site, "/api.json", Accept_Encoding="gzip, br")
+    assert (response.getheader("Content-Encoding"), body) == ("br", b"brotli api.json")
+    response, _ = get(site, "/api.json", Accept_Encoding="br;q=0, gzip;q=0.5")
+    assert response.getheader("Content-Encoding") == "gzip"
+    response, _ = get(site, "/api.json", Accept_Encoding="*")
+    assert response.getheader("Content-Encoding") == "br"
+    for accept_encoding in ("identity", "gzip;q=0, br;q=0.0"):
+        response, body = get(site, "/api.json", Accept_Encoding=accept_encoding)
+        assert response.getheader("Content-Encoding") is None
+        assert body == original
+
+def test_each_encoding_has_its_own_etag(site):
+    etags = set()
+    for accept_encoding in ("identity", "gzip", "br"):
+        response, _ = get(site, "/api.json", Accept_Encoding=accept_encoding)
+        assert response.getheader("Vary") == "Accept-Encoding"
+        etags.add(response.getheader("ETag"))
+    assert len(etags) == 3
+
+def test_matching_etag_is_not_modified(site):
+    response, _ = get(site, "/api.json", Accept_Encoding="gzip")
+    etag = response.getheader("ETag")
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response, body = get(site, "/api.json", Accept_Encoding="gzip", If_None_Match=if_none_match)
+        assert (response.status, body) == (304, b"")
+        assert response.getheader("ETag") == etag
+        assert response.getheader("Vary") == "Accept-Encoding"
+    # The ETag of the gzip representation doesn't match the uncompressed one
+    response, body = get(site, "/api.json", If_None_Match=etag)
+    assert response.status == 200 and body
+
+def test_html_pages_are_served_uncompressed_with_live_reload(site):
+    response, body = get(site, "/", Accept_Encoding="gzip, br")
+    assert response.status == 200
+    assert response.getheader("Content-Encoding") is None
+    assert b"new EventSource('/live-reload')" in body
+
+def test_byte_ranges_are_served(site, output_dir):
+    original = read_output(output_dir, "api.json")
+    size = len(original)
+    for range_header, start, end in (("bytes=0-9", 0, 9), ("bytes=10-", 10, size - 1),
+                                     ("bytes=-5", size - 5, size - 1), (f"bytes=5-{size + 100}", 5, size - 1)):
+        response, body = get(site, "/api.json", Range=range_header)
+        assert response.status == 206
+        assert response.getheader("Content-Range") == f"bytes {start}-{end}/{size}"
+        assert body == original[start:end + 1]
+        assert response.getheader("Content-Length") == str(len(body))
+
+    # Ranges apply to the representation that is sent
+    compressed = read_output(output_dir, "api.json.gz")
+    response, body = get(site, "/api.json", Range="bytes=0-1", Accept_Encoding="gzip")
+    assert response.status == 206 and body == compressed[:2]
+    assert response.getheader("Content-Range") == f"bytes 0-1/{len(compressed)}"
+
+def test_unsatisfiable_and_unsupported_ranges(site, output_dir):
+    original = read_output(output_dir, "api.json")
+    size = len(original)
+    for range_header in (f"bytes={size}-", "bytes=9-5"):
+        response, body = get(site, "/api.json", Range=range_header)
+        assert (response.status, body) == (416, b"")
+        assert response.getheader("Content-Range") == f"bytes */{size}"
+    # Multiple or malformed ranges get the whole body
+    for range_header in ("bytes=0-1,4-5", "bytes=-", "lines=0-1"):
+        response, body = get(site, "/api.json", Range=range_header)
+        assert (response.status, body) == (200, original)
+
+def test_if_range_only_serves_ranges_of_the_same_representation(site, output_dir):
+    original = read_output(output_dir, "api.json")
+    etag = get(site, "/api.json")[0].getheader("ETag")
+    response, body = get(site, "/api.json", Range="bytes=0-9", If_Range=etag)
+    assert (response.status, body) == (206, original[:10])
+    response, body = get(site, "/api.json", Range="bytes=0-9", If_Range='"stale"')
+    assert (response.status, body) == (200, original)
+
+def test_request_stats_are_served(site):
+    for _ in range(3):
+        get(site, "/api.json")
+    get(site, "/missing.json")
+    response, body = get(site, dev_server.STATS_PATH)
+    assert response.getheader("Content-Type") == "application/json"
+    stats = json.loads(body)
+    # Requests for the statistics themselves are not counted
+    assert stats["requests"] == 4
+    assert 0 <= stats["p50Ms"] <= stats["p95Ms"] <= stats["p99Ms"] <= stats["maxMs"]
+    assert stats["maxMs"] > 0
+    assert json.loads(get(site, dev_server.STATS_PATH)[1])["requests"] == 4
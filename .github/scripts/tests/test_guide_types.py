@@ -0,0 +1,44 @@
+"""Tests for classifying guides by the rules in guide-types.json."""
+
+import json
+
+import pytest
+
+import generate_json
+
+@pytest.fixture
+def rules(tmp_path, monkeypatch):
+    """Classify guides with the rules of a config written by the test."""
+    def configure(config):
+        config_path = tmp_path / "guide-types.json"
+        config_path.write_text(json.dumps(config), encoding="utf-8")
+        guide_type_rules, default_type = generate_json.load_guide_type_rules(str(config_path))
+        monkeypatch.setattr(generate_json, "GUIDE_TYPE_RULES", guide_type_rules)
+        monkeypatch.setattr(generate_json, "DEFAULT_GUIDE_TYPE", default_type)
+        generate_json.infer_guide_type.cache_clear()
+        return guide_type_rules, default_type
+    yield configure
+    generate_json.infer_guide_type.cache_clear()
+
+def test_first_matching_rule_wins(rules):
+    guide_type_rules, default_type = rules({
+        "rules": [{"type": "language", "keywords": ["Python"]},
+                  {"type": "platform", "keywords": ["postgres", "python-on"]}],
+        "default": "misc"})
+    assert guide_type_rules == (("language", ("python",)), ("platform", ("postgres", "python-on")))
+    assert generate_json.infer_guide_type("guides/python-on-postgres.md") == "language"
+    assert generate_json.infer_guide_type("guides/Postgres.md") == "platform"
+    assert generate_json.infer_guide_type("guides/docker.md") == "misc"
+
+def test_default_type_is_other(rules):
+    _, default_type = rules({"rules": []})
+    assert default_type == "other"
+    assert generate_json.infer_guide_type("guides/python.md") == "other"
+
+def test_project_rules_classify_the_guides():
+    assert generate_json.infer_guide_type("guides/python.md") == "language"
+    assert generate_json.infer_guide_type("guides/make.md") == "pattern"
+    assert generate_json.infer_guide_type("guides/postgresql.md") == "platform"
+    assert generate_json.infer_guide_type("guides/docker.md") == "other"
+    # Types are listed in the order of the rules, then the default
+    assert generate_json.GUIDE_TYPE_ORDER == ("language", "pattern", "platform", "other")
@@ -0,0 +1,56 @@
+"""Tests for incremental builds: which changes invalidate the outputs of a previous build."""
+
+import os
+import shutil
+
+import generate_json
+
+def build(readme_path, output_dir, capsys, **options):
+    """Run an incremental build and return what it printed."""
+    generate_json.create_guide_json(readme_path, output_dir, incremental=True, **options)
+    return capsys.readouterr().out
+
+def test_unchanged_sources_write_nothing(project, output_dir, capsys):
+    build(project, output_dir, capsys)
+    output = build(project, output_dir, capsys)
+    assert "✓ Unchanged 2 guide(s)" in output
+    assert "✓ Unchanged search index" in output
+    assert "0 written" in output
+
+def test_changed_guide_is_rebuilt(project, output_dir, capsys):
+    build(project, output_dir, capsys)
+    guide_path = os.path.join(os.path.dirname(project), "guides", "python.md")
+    with open(guide_path, "a", encoding="utf-8") as f:
+        f.write("\n## Typing\n\nAdd type hints to public functions.\n")
+    output = build(project, output_dir, capsys)
+    assert "✓ Created 1 guide(s)" in output
+    assert "✓ Unchanged 1 guide(s)" in output
+    with open(os.path.join(output_dir, "api/guides/languages/python.json"), encoding="utf-8") as f:
+        assert "Add type hints" in f.read()
+
+def test_deleted_guide_is_removed(project, output_dir, capsys):
+    build(project, output_dir, capsys)
+    os.remove(os.path.join(os.path.dirname(project), "guides", "make.md"))
+    output = build(project, output_dir, capsys)
+    assert "✓ Removed api/guides/patterns/make.json" in output
+    assert not os.path.exists(os.path.join(output_dir, "api/guides/patterns/make"))
+
+def test_changed_options_force_a_full_rebuild(project, output_dir, capsys):
+    build(project, output_dir, capsys)
+    output = build(project, output_dir, capsys, minify=True)
+    assert "running a full rebuild" in output
+    assert "✓ Created 2 guide(s)" in output
+
+def test_changed_helper_module_forces_a_full_rebuild(project, output_dir, capsys, tmp_path, monkeypatch):
+    # The generator is pointed at a copy of its modules, so one can be edited
+    scripts_dir = tmp_path / "scripts"
+    shutil.copytree(generate_json.SCRIPTS_DIR, scripts_dir, ignore=shutil.ignore_patterns("tests", "__pycache__"))
+    monkeypatch.setattr(generate_json, "SCRIPTS_DIR", str(scripts_dir))
+    build(project, output_dir, capsys)
+
+    with open(scripts_dir / "search_index.py", "a", encoding="utf-8") as f:
+        f.write("\n# A change to the search index\n")
+    output = build(project, output_dir, capsys)
+    assert "running a full rebuild" in output
+    assert "✓ Unchanged search index" not in output
+    assert "✓ Created api/search/index.json" in output
@@ -0,0 +1,67 @@
+"""Tests for the site's index.html page of guides."""
+
+import os
+import re
+
+import generate_json
+from corpus import Corpus
+
+def add_guides(project, guides):
+    guides_dir = os.path.join(os.path.dirname(project), "guides")
+    for filename, title in guides.items():
+        with open(os.path.join(guides_dir, filename), "w", encoding="utf-8") as f:
+            f.write(f"# {title}\n\nSome guidance.\n")
+
+def read_page(output_dir, filename):
+    with open(os.path.join(output_dir, filename), encoding="utf-8") as f:
+        return f.read()
+
+def guide_rows(page):
+    """The path of each guide listed in the guides table."""
+    return re.findall(r'<code>(api/guides/[^<]*)</code>', page)
+
+def page_links(page):
+    """The href of each enabled pagination link, by its label."""
+    return dict((label, href) for href, label in re.findall(r'class="page-link" href="([^"]*)">(\w+)</a>', page))
+
+def test_guides_are_split_over_linked_pages(project, output_dir):
+    add_guides(project, {"shell.md": "Shell", "cicd.md": "CI/CD", "docker.md": "Docker"})
+    generate_json.create_guide_json(project, output_dir, incremental=True, index_page_size=2)
+    pages = [read_page(output_dir, filename) for filename in ("index.html", "index-2.html", "index-3.html")]
+    assert not os.path.exists(os.path.join(output_dir, "index-4.html"))
+
+    assert page_links(pages[0]) == {"Next": "index-2.html"}
+    assert page_links(pages[1]) == {"Previous": "index.html", "Next": "index-3.html"}
+    assert page_links(pages[2]) == {"Previous": "index-2.html"}
+    assert "Page 2 of 3" in pages[1]
+    # Every guide is listed once, by type then name
+    rows = [guide_rows(page) for page in pages]
+    assert [len(page_rows) for page_rows in rows] == [2, 2, 1]
+    corpus = Corpus.from_entries(generate_json.load_manifest(output_dir)["guides"].values(),
+                                 generate_json.GUIDE_TYPE_ORDER)
+    assert sum(rows, []) == [guide.path for guide in corpus.index_order]
+
+def test_leftover_pages_are_removed(project, output_dir, capsys):
+    add_guides(project, {"shell.md": "Shell", "cicd.md": "CI/CD", "docker.md": "Docker"})
+    generate_json.create_guide_json(project, output_dir, incremental=True, index_page_size=2)
+    assert "✓ Created index.html (3 pages)" in capsys.readouterr().out
+
+    generate_json.create_guide_json(project, output_dir, incremental=True, index_page_size=4)
+    assert "✓ Created index.html (2 pages)" in capsys.readouterr().out
+    assert os.path.exists(os.path.join(output_dir, "index-2.html"))
+    assert not os.path.exists(os.path.join(output_dir, "index-3.html"))
+
+    generate_json.create_guide_json(project, output_dir, incremental=True)
+    assert [name for name in os.listdir(output_dir) if name.startswith("index")] == ["index.html"]
+    page = read_page(output_dir, "index.html")
+    assert "pagination" not in page
+    assert len(guide_rows(page)) == 5
+
+def test_guide_names_and_paths_are_escaped(project, output_dir):
+    add_guides(project, {"r&d.md": 'R&D <Notes> "draft"'})
+    generate_json.create_guide_json(project, output_dir)
+    page = read_page(output_dir, "index.html")
+    assert ('<td><a href="api/guides/others/r&amp;d.json">R&amp;D &lt;Notes&gt; &quot;draft&quot;</a></td>'
+            in page)
+    assert "<code>api/guides/others/r&amp;d.json</code>" in page
+    assert "<Notes>" not in page
@@ -0,0 +1,29 @@
+"""Tests for processing guides across a pool of processes."""
+
+import os
+
+import generate_json
+
+def read_outputs(output_dir):
+    """Read every output of a build, by its path in the output directory."""
+    outputs = {}
+    for root, _, files in os.walk(output_dir):
+        for filename in files:
+            path = os.path.join(root, filename)
+            with open(path, 'rb') as f:
+                outputs[os.path.relpath(path, output_dir)] = f.read()
+    return outputs
+
+def test_outputs_do_not_depend_on_the_number_of_jobs(project, tmp_path):
+    guides_dir = os.path.join(os.path.dirname(project), "guides")
+    for name in ("shell", "cicd", "postgresql", "docker", "documentation"):
+        with open(os.path.join(guides_dir, f"{name}.md"), "w", encoding="utf-8") as f:
+            f.write(f"# {name.title()}\n\nPractices for {name}, see [Python](./python.md).\n\n"
+                    f"## Testing\n\nTest {name} changes in CI.\n")
+
+    generate_json.create_guide_json(project, str(tmp_path / "serial"), jobs=1, bundle=True)
+    generate_json.create_guide_json(project, str(tmp_path / "parallel"), jobs=3, bundle=True)
+    serial = read_outputs(tmp_path / "serial")
+    parallel = read_outputs(tmp_path / "parallel")
+    assert sorted(serial) == sorted(parallel)
+    assert [path for path in serial if serial[path] != parallel[path]] == []
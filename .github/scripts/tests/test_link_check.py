@@ -0,0 +1,102 @@
+"""Tests for the link checker's external links, against a stub server on localhost."""
+
+import http.server
+import socket
+import threading
+from collections import Counter
+
+import pytest
+
+import link_check
+
+CONFIG = {"retryOn429": True, "retryCount": 2, "fallbackRetryDelay": "0s", "timeout": "5s",
+          "aliveStatusCodes": [200]}
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """Answers each path with a fixed response, counting the requests to each."""
+
+    requests = Counter()
+
+    def respond(self):
+        self.requests[(self.command, self.path)] += 1
+        if self.path == "/ok":
+            self.send_response(200)
+        elif self.path == "/moved":
+            self.send_response(301)
+            self.send_header("Location", "/ok")
+        elif self.path == "/get-only":
+            self.send_response(405 if self.command == "HEAD" else 200)
+        elif self.path == "/limited":
+            # Rate limited on the first request, then fine
+            limited = self.requests[(self.command, self.path)] == 1
+            self.send_response(429 if limited else 200)
+            if limited:
+                self.send_header("Retry-After", "0")
+        else:
+            self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_HEAD = do_GET = respond
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server(monkeypatch):
+    # Requests to the stub must not go through a proxy
+    monkeypatch.setenv("no_proxy", "*")
+    monkeypatch.setenv("NO_PROXY", "*")
+    StubHandler.requests = Counter()
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture(params=sorted(link_check.TRANSPORTS))
+def transport_name(request):
+    if request.param == "aiohttp" and link_check.aiohttp is None:
+        pytest.skip("aiohttp is not installed")
+    return request.param
+
+def closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def check(tmp_path, links, transport_name, cache):
+    page = tmp_path / "page.md"
+    page.write_text("\n".join(f"- [link]({link})" for link in links), encoding="utf-8")
+    transport = link_check.TRANSPORTS[transport_name](4)
+    checker = link_check.LinkChecker(str(tmp_path), CONFIG, transport, cache)
+    broken, _, _ = checker.check_files([str(page)])
+    return {target: error for _, target, error in broken}, checker.cached_count
+
+def test_external_links_are_checked(tmp_path, server, transport_name):
+    dead = f"http://127.0.0.1:{closed_port()}/"
+    links = [f"{server}/ok", f"{server}/moved", f"{server}/get-only", f"{server}/limited",
+             f"{server}/missing", dead]
+    broken, _ = check(tmp_path, links, transport_name, {})
+    assert set(broken) == {f"{server}/missing", dead}
+    assert broken[f"{server}/missing"] == "status 404"
+    # Redirects are followed, HEAD falls back to GET, and rate limits are retried
+    assert StubHandler.requests[("HEAD", "/moved")] == 1
+    assert StubHandler.requests[("HEAD", "/ok")] + StubHandler.requests[("GET", "/ok")] == 2
+    assert StubHandler.requests[("GET", "/get-only")] == 1
+    assert StubHandler.requests[("HEAD", "/limited")] == 2
+
+def test_live_links_are_cached(tmp_path, server, transport_name):
+    cache = {}
+    links = [f"{server}/ok", f"{server}/missing"]
+    check(tmp_path, links, transport_name, cache)
+    assert set(cache) == {f"{server}/ok"}
+    requests = sum(StubHandler.requests.values())
+
+    # Only the broken link is checked again
+    broken, cached_count = check(tmp_path, links, transport_name, cache)
+    assert set(broken) == {f"{server}/missing"}
+    assert cached_count == 1
+    assert StubHandler.requests[("HEAD", "/ok")] == 1
+    assert sum(StubHandler.requests.values()) > requests
@@ -0,0 +1,53 @@
+"""Tests for atomic, skip-if-unchanged writes of the generated site."""
+
+import os
+
+import pytest
+
+import generate_json
+from output_writer import format_counts, output_counts, remove_output, write_output
+
+@pytest.fixture(autouse=True)
+def counts():
+    output_counts.clear()
+    yield output_counts
+    output_counts.clear()
+
+def write(path, content):
+    with write_output(str(path)) as f:
+        f.write(content)
+
+def test_unchanged_outputs_are_not_replaced(tmp_path, counts):
+    path = tmp_path / "api" / "guide.json"
+    write(path, "{}")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10_000_000_000))
+    before = os.stat(path)
+
+    write(path, "{}")
+    after = os.stat(path)
+    assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+    write(path, '{"changed": true}')
+    assert path.read_text(encoding="utf-8") == '{"changed": true}'
+    assert os.stat(path).st_mtime_ns != before.st_mtime_ns
+    assert remove_output(str(path)) and not remove_output(str(path))
+    assert dict(counts) == {"written": 2, "skipped": 1, "removed": 1}
+    assert format_counts() == "2 written, 1 unchanged, 1 removed"
+
+def test_failed_writes_leave_the_output_untouched(tmp_path, counts):
+    path = tmp_path / "guide.json"
+    write(path, "original")
+    with pytest.raises(RuntimeError), write_output(str(path)) as f:
+        f.write("partial")
+        raise RuntimeError("the build failed")
+    assert path.read_text(encoding="utf-8") == "original"
+    assert os.listdir(tmp_path) == ["guide.json"]
+    assert dict(counts) == {"written": 1}
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_rebuilding_an_unchanged_site_skips_every_output(project, output_dir, capsys, jobs):
+    generate_json.create_guide_json(project, output_dir, jobs=jobs)
+    assert " 0 unchanged, 0 removed" in capsys.readouterr().out
+    outputs = sum(len(files) for _, _, files in os.walk(output_dir))
+    generate_json.create_guide_json(project, output_dir, jobs=jobs)
+    assert f"✓ Outputs: 0 written, {outputs} unchanged, 0 removed" in capsys.readouterr().out
@@ -0,0 +1,34 @@
+"""Tests for building and querying the search index."""
+
+import generate_json
+from search_index import SearchIndex, build_search_index
+
+def document(name):
+    return {"guide": f"api/guides/{name}.json", "name": name, "title": name, "anchor": name,
+            "path": f"api/guides/{name}/sections/{name}.json"}
+
+def search(tmp_path, texts, query, limit=10):
+    build_search_index(((document(name), text) for name, text in texts.items()), str(tmp_path))
+    return [result["name"] for result in SearchIndex(str(tmp_path)).search(query, limit)]
+
+def test_more_frequent_terms_rank_higher(tmp_path):
+    texts = {"once": "docker and some other words here", "twice": "docker docker and other words here"}
+    assert search(tmp_path, texts, "docker") == ["twice", "once"]
+
+def test_rarer_terms_weigh_more(tmp_path):
+    texts = {"common": "shared shared words", "rare": "shared unusual words", "other": "shared more words"}
+    assert search(tmp_path, texts, "shared unusual")[0] == "rare"
+
+def test_shorter_sections_rank_higher(tmp_path):
+    texts = {"long": "kubernetes " + "padding " * 20, "short": "kubernetes padding"}
+    assert search(tmp_path, texts, "kubernetes") == ["short", "long"]
+
+def test_ties_keep_document_order_and_limit(tmp_path):
+    texts = {"first": "helm charts", "second": "helm charts", "third": "helm charts", "none": "nothing"}
+    assert search(tmp_path, texts, "helm", limit=2) == ["first", "second"]
+    assert search(tmp_path, texts, "missing") == []
+
+def test_site_search_finds_the_section(project, output_dir):
+    generate_json.create_guide_json(project, output_dir)
+    results = SearchIndex(output_dir).search("pytest")
+    assert [(result["name"], result["anchor"]) for result in results] == [("Python", "testing")]
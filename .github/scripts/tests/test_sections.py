@@ -0,0 +1,79 @@
+"""Tests for splitting guides into addressable sections."""
+
+import json
+import os
+
+import api_service
+import generate_json
+from corpus import MAX_SECTION_FILENAME_BYTES
+
+MARKDOWN = """Before the first heading, with ünïcödé.
+
+# Guide
+
+Intro — with a dash.\r
+\r
+## Setup
+
+```bash
+# not a heading
+```
+
+#### Too deep to split
+
+## Setup
+
+Repeated headings get suffixed anchors. 日本語
+"""
+
+def test_section_offsets_rebuild_the_source():
+    sections = generate_json.split_sections(MARKDOWN, "Guide")
+    assert [section["anchor"] for section in sections] == ["introduction", "guide", "setup", "setup-1"]
+    source = MARKDOWN.encode("utf-8")
+    position = 0
+    for section in sections:
+        assert section["offset"] == position
+        assert source[position:position + section["length"]].decode("utf-8") == section["content"]
+        position += section["length"]
+    assert position == len(source)
+    assert "# not a heading" in sections[2]["content"]
+    assert "#### Too deep to split" in sections[2]["content"]
+
+def test_section_outputs_index_the_guide_content(project, output_dir):
+    generate_json.create_guide_json(project, output_dir)
+    with open(os.path.join(output_dir, "api/guides/languages/python.json"), encoding="utf-8") as f:
+        content = json.load(f)["content"].encode("utf-8")
+    with open(os.path.join(output_dir, "api/guides/languages/python/sections.json"), encoding="utf-8") as f:
+        index = json.load(f)
+    assert [section["anchor"] for section in index["sections"]] == ["python", "testing"]
+    for entry in index["sections"]:
+        with open(os.path.join(output_dir, entry["path"]), encoding="utf-8") as f:
+            section = json.load(f)
+        assert (section["offset"], section["length"]) == (entry["offset"], entry["length"])
+        assert content[entry["offset"]:entry["offset"] + entry["length"]].decode("utf-8") == section["content"]
+
+def test_long_headings_have_short_unique_filenames(project, output_dir):
+    guide_path = os.path.join(os.path.dirname(project), "guides", "python.md")
+    long_heading = "Why " + "very " * 80 + "long headings"
+    unicode_heading = "Überlänge " * 40
+    with open(guide_path, "a", encoding="utf-8") as f:
+        for heading in (long_heading + " one", long_heading + " two", unicode_heading):
+            f.write(f"\n## {heading}\n\nText under {heading[-3:]}.\n")
+    generate_json.create_guide_json(project, output_dir, precompress=True)
+
+    sections_dir = os.path.join(output_dir, "api/guides/languages/python/sections")
+    filenames = os.listdir(sections_dir)
+    assert all(len(filename.encode("utf-8")) < 255 for filename in filenames)
+    with open(os.path.join(output_dir, "api/guides/languages/python/sections.json"), encoding="utf-8") as f:
+        index = json.load(f)["sections"]
+    long_entries = index[2:]
+    assert len({entry["path"] for entry in long_entries}) == 3
+    for entry in long_entries:
+        filename = os.path.basename(entry["path"])
+        assert len(filename.encode("utf-8")) <= MAX_SECTION_FILENAME_BYTES + len(".json")
+        with open(os.path.join(output_dir, entry["path"]), encoding="utf-8") as f:
+            assert json.load(f)["anchor"] == entry["anchor"]
+
+    # Sections are still found by their full anchors
+    service = api_service.ApiService(output_dir)
+    assert "Text under two" in service.get_section("python", long_entries[1]["anchor"])["content"]
@@ -0,0 +1,94 @@
+"""Tests for seeding the change feed's history from the published site."""
+
+import json
+import os
+import socket
+import sys
+
+import pytest
+
+import generate_json
+import seed_change_feed as seed
+from seed_change_feed import HistoryMissingError, seed_change_feed
+
+SITE_URL = "https://example.com/guide"
+
+def read_json(output_dir, path):
+    with open(os.path.join(output_dir, path), encoding="utf-8") as f:
+        return json.load(f)
+
+def release(project, version):
+    with open(os.path.join(os.path.dirname(project), "version.txt"), "w", encoding="utf-8") as f:
+        f.write(f"{version}\n")
+
+def published(site_dir):
+    """A fetch function which serves a generated site as if it was published."""
+    def fetch(url):
+        assert url.startswith(SITE_URL + "/")
+        path = os.path.join(site_dir, url[len(SITE_URL) + 1:])
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+    return fetch
+
+def test_seeded_build_continues_the_published_feed(project, tmp_path):
+    published_dir = str(tmp_path / "published")
+    generate_json.create_guide_json(project, published_dir)
+    release(project, "1.1.0")
+    generate_json.create_guide_json(project, published_dir)
+
+    # A fresh checkout, with a stale copy of the feed from another branch
+    output_dir = str(tmp_path / "site")
+    os.makedirs(os.path.join(output_dir, "api"))
+    with open(os.path.join(output_dir, generate_json.CHANGES_PATH), "w", encoding="utf-8") as f:
+        json.dump({"latest": "9.9.9", "versions": []}, f)
+    paths = seed_change_feed(SITE_URL, output_dir, published(published_dir))
+    assert sorted(paths) == ["api/changes.json", "api/changes/1.0.0..1.1.0.json", "api/changes/snapshot.json"]
+
+    release(project, "1.2.0")
+    generate_json.create_guide_json(project, output_dir)
+    feed = read_json(output_dir, generate_json.CHANGES_PATH)
+    assert [entry["version"] for entry in feed["versions"]] == ["1.2.0", "1.1.0", "1.0.0"]
+    assert feed["versions"][0]["from"] == "1.1.0"
+    # The diffs of earlier versions are published again
+    assert os.path.isfile(os.path.join(output_dir, "api/changes/1.0.0..1.1.0.json"))
+
+def test_site_without_a_feed_has_nothing_to_seed(project, tmp_path):
+    published_dir = str(tmp_path / "published")
+    generate_json.create_guide_json(project, published_dir)
+    api_index = read_json(published_dir, "api.json")
+    del api_index["endpoints"]["changes"]
+    with open(os.path.join(published_dir, "api.json"), "w", encoding="utf-8") as f:
+        json.dump(api_index, f)
+    output_dir = str(tmp_path / "site")
+    assert seed_change_feed(SITE_URL, output_dir, published(published_dir)) is None
+    assert not os.path.exists(output_dir)
+
+def test_missing_history_is_an_error(project, tmp_path):
+    published_dir = str(tmp_path / "published")
+    generate_json.create_guide_json(project, published_dir)
+    os.remove(os.path.join(published_dir, generate_json.CHANGES_DIR, "snapshot.json"))
+    with pytest.raises(HistoryMissingError, match="snapshot.json was not found"):
+        seed_change_feed(SITE_URL, str(tmp_path / "site"), published(published_dir))
+
+    def unreachable(url):
+        raise OSError("Name or service not known")
+    with pytest.raises(HistoryMissingError, match="could not download"):
+        seed_change_feed(SITE_URL, str(tmp_path / "site"), unreachable)
+
+def test_required_history_fails_the_seed(tmp_path, monkeypatch, capsys):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        closed_port = s.getsockname()[1]
+    monkeypatch.setenv("no_proxy", "*")
+    argv = ["seed_change_feed.py", f"http://127.0.0.1:{closed_port}/", str(tmp_path / "site")]
+    monkeypatch.setattr(sys, "argv", argv)
+    seed.main()
+    assert "the feed will start again" in capsys.readouterr().out
+
+    monkeypatch.setattr(sys, "argv", argv + ["--required"])
+    with pytest.raises(SystemExit) as exit_info:
+        seed.main()
+    assert exit_info.value.code == 1
+    assert "history is missing" in capsys.readouterr().out
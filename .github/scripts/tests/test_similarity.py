@@ -0,0 +1,81 @@
+"""Tests for related guides and sections."""
+
+import json
+import os
+import random
+
+import pytest
+
+import similarity
+from corpus import Guide
+
+TOPICS = {
+    "python": "python virtualenv pytest packaging typing pip",
+    "django": "python django views models templates pytest",
+    "postgres": "postgresql tables indexes queries vacuum schema",
+    "mysql": "mysql tables indexes queries replication schema",
+}
+
+def guides():
+    for name, words in TOPICS.items():
+        guide = Guide(name.capitalize(), "language", f"api/guides/languages/{name}.json")
+        sections = [(f"api/guides/languages/{name}/sections/{index}.json", f"{words} section {index}")
+                    for index in range(2)]
+        yield guide, sections
+
+# Words shared between the guides of a larger corpus, so each guide has more
+# candidates than are kept
+WORDS = ("python testing containers deploy schema queries cache logging review "
+         "shell pipelines secrets docs tables indexes typing errors retries").split()
+
+def random_guides(count, seed=0):
+    rng = random.Random(seed)
+    for index in range(count):
+        guide = Guide(f"Guide {index}", "pattern", f"api/guides/patterns/guide-{index}.json")
+        sections = [(f"api/guides/patterns/guide-{index}/sections/{section}.json",
+                     " ".join(rng.choices(WORDS, k=rng.randint(3, 12))))
+                    for section in range(rng.randint(1, 4))]
+        yield guide, sections
+
+def related_names(related):
+    return [[os.path.basename(entry["path"]) for entry in entries] for entries in related]
+
+def test_related_guides_share_terms(tmp_path):
+    related = related_names(similarity.build_related(guides(), str(tmp_path)))
+    assert related[0][0] == "django.json"
+    assert related[2][0] == "mysql.json"
+    with open(tmp_path / similarity.RELATED_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    assert len(data["sections"]) == 8
+    assert len(data["relatedSections"]) == 8
+
+@pytest.mark.skipif(similarity.numpy is None, reason="NumPy is not installed")
+def test_numpy_and_python_agree(tmp_path, monkeypatch):
+    with_numpy = similarity.build_related(guides(), str(tmp_path / "numpy"))
+    monkeypatch.setattr(similarity, "numpy", None)
+    without_numpy = similarity.build_related(guides(), str(tmp_path / "python"))
+    assert with_numpy == without_numpy
+
+@pytest.mark.skipif(similarity.numpy is None, reason="NumPy is not installed")
+def test_numpy_and_python_find_the_same_neighbours(tmp_path, monkeypatch):
+    def build(name):
+        related = similarity.build_related(random_guides(40), str(tmp_path / name))
+        with open(tmp_path / name / similarity.RELATED_PATH, encoding="utf-8") as f:
+            return related, json.load(f)["relatedSections"]
+
+    with_numpy, numpy_sections = build("numpy")
+    monkeypatch.setattr(similarity, "numpy", None)
+    without_numpy, python_sections = build("python")
+    assert related_names(with_numpy) == related_names(without_numpy)
+    assert all(len(related) == similarity.RELATED_COUNT for related in with_numpy)
+    assert numpy_sections == python_sections
+    for numpy_related, python_related in zip(with_numpy, without_numpy):
+        assert [entry["score"] for entry in numpy_related] == pytest.approx(
+            [entry["score"] for entry in python_related], abs=1e-3)
+
+def test_python_fallback_is_bounded(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(similarity, "numpy", None)
+    monkeypatch.setattr(similarity, "PYTHON_GUIDE_LIMIT", 3)
+    related = similarity.build_related(guides(), str(tmp_path))
+    assert related == [[], [], [], []]
+    assert "NumPy is not installed" in capsys.readouterr().out
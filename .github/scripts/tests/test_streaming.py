@@ -0,0 +1,70 @@
+"""Tests for streaming guides from their source in chunks."""
+
+import random
+import re
+
+import pytest
+
+import generate_json
+from build_trace import BuildTrace, activate
+
+TEXT = "# Title\r\n\r\nA line\rwith\x85breaks\n\n```\r\n# not a heading\r\n```\r\n last"
+
+def chunked(text, sizes):
+    """Split text into chunks of the given sizes, then whatever is left."""
+    chunks = []
+    for size in sizes:
+        chunks.append(text[:size])
+        text = text[size:]
+    return chunks + [text]
+
+# The comment and title patterns the generator used before guides were streamed
+BASELINE_COMMENT_PATTERN = re.compile(r'<!--.*?-->', re.DOTALL)
+BASELINE_TITLE_PATTERN = re.compile(r'^# (.*?)$', re.MULTILINE)
+
+# Fragments which make comment markers and headings likely to span chunks
+FRAGMENTS = ["<!--", "-->", "<!-", "--", "<", "!", "-", ">", "# ", "#", "\n", "\r\n", "text", " "]
+
+def random_markdown(rng):
+    return "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 40)))
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 8])
+def test_streamed_guides_match_the_baseline_patterns(tmp_path, chunk_size):
+    rng = random.Random(chunk_size)
+    path = tmp_path / "guide.md"
+    for _ in range(300):
+        content = random_markdown(rng)
+        path.write_bytes(content.encode("utf-8"))
+        # Read as the generator read guides, translating line endings
+        stripped = BASELINE_COMMENT_PATTERN.sub("", path.read_text(encoding="utf-8"))
+        chunks = list(generate_json.stream_guide_markdown(str(path), chunk_size))
+        assert "".join(chunks) == stripped
+        title = BASELINE_TITLE_PATTERN.search(stripped)
+        assert generate_json.find_title(chunks) == (title.group(1) if title else None)
+
+def test_unclosed_comment_is_kept():
+    stripper = generate_json.CommentStripper()
+    text = stripper.feed("before <!-- never") + stripper.feed(" closed") + stripper.flush()
+    assert text == "before <!-- never closed"
+
+def test_iter_lines_splits_as_splitlines():
+    expected = TEXT.splitlines(keepends=True)
+    for split in range(len(TEXT) + 1):
+        assert list(generate_json.iter_lines(chunked(TEXT, [split]))) == expected
+    rng = random.Random(0)
+    for _ in range(200):
+        sizes = [rng.randint(0, 4) for _ in range(len(TEXT))]
+        assert list(generate_json.iter_lines(chunked(TEXT, sizes))) == expected
+
+def test_crlf_split_across_chunks_is_one_line_break():
+    lines = list(generate_json.iter_lines(["one\r", "", "\ntwo\r", "three"]))
+    assert lines == ["one\r\n", "two\r", "three"]
+
+def test_guide_build_is_traced_by_stage(project, output_dir):
+    guide_file = project.replace("README.md", "guides/python.md")
+    trace = BuildTrace()
+    with activate(trace):
+        generate_json.build_guide(guide_file, output_dir, "1.0.0", None)
+    names = {name for name, _ in trace.summary()}
+    assert {"build_guide", "extract_title", "read", "strip_comments", "serialize", "write",
+            "write_sections"} <= names